@@ -0,0 +1 @@
+(letrec ((loop (lambda (i acc) (if (zero? i) acc (loop (sub1 i) (+ acc (- (+ (* i 3) (add1 i)) (+ (* 2 (sub1 i)) i)))))))) (loop 10000000 0))
@@ -0,0 +1 @@
+(letrec ((build (lambda (n acc) (if (zero? n) acc (build (sub1 n) (cons n acc))))) (loop (lambda (n sum) (if (zero? n) sum (loop (sub1 n) (+ sum (car (build 1000 (quote ()))))))))) (loop 2000 0))
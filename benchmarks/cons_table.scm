@@ -0,0 +1 @@
+(letrec ((build (lambda (n acc) (if (zero? n) acc (build (sub1 n) (cons n acc))))) (loop (lambda (n table sum) (if (zero? n) (+ sum (car table)) (loop (sub1 n) table (+ sum (car (build 1000 (quote ()))))))))) (loop 2000 (build 50000 (quote ())) 0))
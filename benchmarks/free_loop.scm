@@ -0,0 +1 @@
+(let ((a 3) (b 4)) (letrec ((loop (lambda (i acc) (if (zero? i) acc (loop (sub1 i) (+ acc (- (+ a b) (* a (- b a))))))))) (loop 10000000 0)))
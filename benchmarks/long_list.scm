@@ -0,0 +1 @@
+(letrec ((build (lambda (n acc) (if (zero? n) acc (build (sub1 n) (cons n acc))))) (sum (lambda (l acc) (if (null? l) acc (sum (cdr l) (+ acc (car l)))))) (rounds (lambda (r l total) (if (zero? r) total (rounds (sub1 r) l (+ total (sum l 0))))))) (rounds 20 (build 1000000 (quote ())) 0))
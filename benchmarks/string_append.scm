@@ -0,0 +1 @@
+(letrec ((build (lambda (s n) (if (= n 0) s (build (string-append s (string "abcdefgh")) (- n 1)))))) (string-ref (build (string "x") 2000) 8000))
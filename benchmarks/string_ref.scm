@@ -0,0 +1 @@
+(letrec ((build (lambda (s n) (if (= n 0) s (build (string-append s s) (- n 1))))) (count (lambda (s i acc) (if (= i 0) acc (count s (- i 1) (if (= (char->integer (string-ref s (- i 1))) 97) (+ acc 1) acc)))))) (count (build (string "abcdefgh") 18) 2097152 0))
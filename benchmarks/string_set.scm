@@ -0,0 +1 @@
+(letrec ((build (lambda (s n) (if (= n 0) s (build (string-append s s) (- n 1))))) (fill (lambda (s i) (if (= i 0) s (fill (string-set! s (- i 1) #\z) (- i 1)))))) (string-ref (fill (build (string "abcdefgh") 18) 2097152) 0))
@@ -0,0 +1 @@
+(letrec ((tak (lambda (x y z) (if (not (< y x)) z (tak (tak (sub1 x) y z) (tak (sub1 y) z x) (tak (sub1 z) x y)))))) (tak 26 18 9))
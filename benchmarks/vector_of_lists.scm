@@ -0,0 +1 @@
+(letrec ((build (lambda (n acc) (if (zero? n) acc (build (sub1 n) (cons n acc))))) (grow (lambda (v k) (if (zero? k) v (grow (vector-append v v) (sub1 k))))) (fill (lambda (v i n) (if (= i n) v (begin (vector-set! v i (build 1000 (quote ()))) (fill v (add1 i) n))))) (rounds (lambda (v r) (if (zero? r) (car (cdr (vector-ref v 7))) (rounds (fill v 0 1024) (sub1 r)))))) (rounds (grow (vector 0) 10) 8))
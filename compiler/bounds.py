@@ -0,0 +1,590 @@
+# bounds.py -
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+# - Interval analysis over closure converted programs.
+# - Rewrites vector and string accesses whose index is proven to be within range to their unchecked forms.
+# - Loop indices are procedure parameters, so parameter ranges are found by joining the arguments at every call site of a procedure until nothing changes.
+#
+
+from .utils import *
+
+UNCHECKED = {"vector-ref": "unsafe-vector-ref", "vector-set!": "unsafe-vector-set!", "string-ref": "unsafe-string-ref", "string-set!": "unsafe-string-set!"}
+ACCESSES = list(UNCHECKED.keys()) + list(UNCHECKED.values())
+COMPARISONS = ["<", "<=", ">", ">=", "="]
+NEGATIONS = {"<": ">=", "<=": ">", ">": "<=", ">=": "<"}
+PREDICATES = ["null?", "zero?", "not", "integer?", "boolean?", "integer->char", "car", "cdr"]
+FIXNUM_LIMIT = 2**61
+MAX_PASSES = 50
+
+class Info:
+    """
+    Abstract value of an expression.
+
+    Attributes:
+        lo (int | None): Lower bound on integer value, None if unbounded.
+        hi (int | None): Upper bound on integer value, None if unbounded.
+        length (int | None): Length of vector or string value, None if unknown.
+        label (str | None): Code label of closure value, None if not a known closure.
+    """
+
+    def __init__(self, lo = None, hi = None, length = None, label = None):
+        """
+        Initializes the Info object, dropping bounds that could overflow a fixnum.
+        """
+        self.lo = lo if lo is not None and abs(lo) < FIXNUM_LIMIT else None
+        self.hi = hi if hi is not None and abs(hi) < FIXNUM_LIMIT else None
+        self.length = length
+        self.label = label
+
+    def __eq__(self, other):
+        if not isinstance(other, Info):
+            return False
+        return (self.lo, self.hi, self.length, self.label) == (other.lo, other.hi, other.length, other.label)
+
+    def within(self, length) -> bool:
+        """
+        Checks whether every value in the range is a valid index into an object of the given length.
+
+        Args:
+            length (int | None): Length of vector or string.
+
+        Returns:
+            bool: True if the index is proven to be in range.
+        """
+        return length is not None and self.lo is not None and self.hi is not None and self.lo >= 0 and self.hi < length
+
+def join(a: Info, b: Info) -> Info:
+    """
+    Computes an abstract value covering both given values.
+
+    Args:
+        a (Info): First abstract value.
+        b (Info): Second abstract value.
+
+    Returns:
+        Info: Smallest abstract value containing both.
+    """
+    lo = min(a.lo, b.lo) if a.lo is not None and b.lo is not None else None
+    hi = max(a.hi, b.hi) if a.hi is not None and b.hi is not None else None
+    length = a.length if a.length == b.length else None
+    label = a.label if a.label == b.label else None
+
+    return Info(lo, hi, length, label)
+
+def widen(old: Info | None, new: Info) -> Info:
+    """
+    Joins a new abstract value into an old one, dropping any bound that moved so that iteration terminates.
+    A lower bound that moves is first widened to 0 so that counting down loops keep their indices non-negative.
+
+    Args:
+        old (Info | None): Value from previous pass, None if there was none.
+        new (Info): Value from current pass.
+
+    Returns:
+        Info: Widened abstract value.
+    """
+    if old is None:
+        return new
+
+    res = join(old, new)
+
+    if res.lo is not None and (old.lo is None or res.lo < old.lo):
+        res.lo = 0 if res.lo >= 0 else None
+    if res.hi is not None and (old.hi is None or res.hi > old.hi):
+        res.hi = None
+
+    return res
+
+def intersect(info: Info, lo: int | None, hi: int | None) -> Info:
+    """
+    Narrows the integer range of an abstract value.
+
+    Args:
+        info (Info): Abstract value to be narrowed.
+        lo (int | None): New lower bound, None to keep the old one.
+        hi (int | None): New upper bound, None to keep the old one.
+
+    Returns:
+        Info: Narrowed abstract value.
+    """
+    if lo is not None and (info.lo is None or lo > info.lo):
+        info = Info(lo, info.hi, info.length, info.label)
+    if hi is not None and (info.hi is None or hi < info.hi):
+        info = Info(info.lo, hi, info.length, info.label)
+
+    return info
+
+def add(a: int | None, b: int | None) -> int | None:
+    """
+    Adds two bounds, either of which may be unbounded.
+    """
+    return a + b if a is not None and b is not None else None
+
+def var_key(expr) -> tuple | None:
+    """
+    Maps a variable reference to its key in an environment.
+
+    Args:
+        expr: Expression to be checked.
+
+    Returns:
+        tuple | None: Environment key, None if the expression is not a variable.
+    """
+    if type(expr) is Local:
+        return ("local", expr.get_name())
+    elif type(expr) is Bound:
+        return ("bound", expr.get_name())
+    elif type(expr) is Free:
+        return ("free", expr.get_name())
+    return None
+
+class RangeAnalysis:
+    """
+    Class to compute integer ranges and object lengths over a closure converted program.
+
+    Attributes:
+        codes (dict): Maps code labels to their (bound, free, body) triples.
+        constants (dict): Maps constant labels to the abstract values of their data.
+        params (dict): Maps code labels to the abstract values of their parameters.
+        captures (dict): Maps code labels to the abstract values of their free variables.
+        escaped (set): Code labels whose closures may be called from unknown call sites.
+    """
+
+    def __init__(self):
+        """
+        Initializes the RangeAnalysis object.
+        """
+        self.codes = {}
+        self.constants = {}
+        self.params = {}
+        self.captures = {}
+        self.escaped = set()
+
+    def run(self, ast):
+        """
+        Iterates the analysis to a fixed point and rewrites the accesses proven to be safe.
+
+        Args:
+            ast: Closure converted program.
+
+        Returns:
+            Program with unchecked accesses.
+        """
+        match ast:
+            case ["labels", labels, body]:
+                pass
+            case _:
+                labels, body = [], ast
+
+        for name, form in labels:
+            if form[0] == "code":
+                self.codes[name] = (form[1], form[2], form[3])
+            elif form[0] == "constant-init":
+                self.constants[name] = self.datum(form[1])
+
+        for _ in range(MAX_PASSES):
+            state = (dict(self.params), dict(self.captures), set(self.escaped))
+            self.calls = {}
+            self.new_captures = {}
+
+            new_body, info = self.analyze(body, {})
+            self.escape(info)
+            new_labels = []
+            for name, form in labels:
+                if form[0] == "code":
+                    new_labels.append((name, ["code", form[1], form[2], self.analyze_code(name)]))
+                else:
+                    new_labels.append((name, form))
+
+            for label, infos in self.calls.items():
+                old = self.params.get(label, [None] * len(infos))
+                self.params[label] = [widen(o, n) for o, n in zip(old, infos)]
+            self.captures = self.new_captures
+
+            if state == (self.params, self.captures, self.escaped):
+                if len(labels) == 0:
+                    return new_body
+                return ["labels", new_labels, new_body]
+
+        return ast
+
+    def analyze_code(self, label: str):
+        """
+        Analyzes the body of a procedure using the ranges of its parameters and free variables.
+
+        Args:
+            label (str): Code label of the procedure.
+
+        Returns:
+            Rewritten procedure body.
+        """
+        bounds, frees, body = self.codes[label]
+        env = {}
+
+        params = self.params.get(label) if label not in self.escaped else None
+        captures = self.captures.get(label)
+
+        for i, name in enumerate(bounds):
+            env[("bound", name)] = params[i] if params is not None else Info()
+        for i, name in enumerate(frees):
+            env[("free", name)] = captures[i] if captures is not None else Info()
+
+        new_body, info = self.analyze(body, env)
+
+        # Values returned from procedures are not tracked.
+        self.escape(info)
+
+        return new_body
+
+    def escape(self, info: Info):
+        """
+        Records that a value flows somewhere the analysis does not follow.
+
+        Args:
+            info (Info): Abstract value that escapes.
+        """
+        if info.label is not None:
+            self.escaped.add(info.label)
+
+    def merge(self, a: Info, b: Info) -> Info:
+        """
+        Joins the abstract values of two control flow paths.
+
+        Args:
+            a (Info): Value from first path.
+            b (Info): Value from second path.
+
+        Returns:
+            Info: Joined value.
+        """
+        if a.label != b.label:
+            self.escape(a)
+            self.escape(b)
+        return join(a, b)
+
+    def operands(self, exprs: list, env: dict) -> tuple:
+        """
+        Analyzes operands to a primitive.
+
+        Args:
+            exprs (list): Operand expressions.
+            env (dict): Abstract values of variables in scope.
+
+        Returns:
+            tuple: Rewritten operands and their abstract values.
+        """
+        new_exprs = []
+        infos = []
+        for expr in exprs:
+            new_expr, info = self.analyze(expr, env)
+            new_exprs.append(new_expr)
+            infos.append(info)
+
+        return new_exprs, infos
+
+    def analyze(self, expr, env: dict) -> tuple:
+        """
+        Computes the abstract value of an expression and rewrites its safe accesses.
+
+        Args:
+            expr: Expression to be analyzed.
+            env (dict): Abstract values of variables in scope.
+
+        Returns:
+            tuple: Rewritten expression and its abstract value.
+        """
+        match expr:
+            case bool(_):
+                return expr, Info()
+            case int(_):
+                return expr, Info(expr, expr)
+            case _ if var_key(expr) is not None:
+                return expr, env.get(var_key(expr), Info())
+            case str(_) | []:
+                return expr, Info()
+            case [first, *rest] if type(first) is str and first in ["vector", "string"]:
+                new_rest, infos = self.operands(rest, env)
+                for info in infos:
+                    self.escape(info)
+                return [first, *new_rest], Info(length = len(rest))
+            case [first, *rest] if type(first) is str and first in ["vector-append", "string-append"]:
+                new_rest, infos = self.operands(rest, env)
+                return [first, *new_rest], Info(length = add(infos[0].length, infos[1].length))
+            case [first, obj, ind, *rest] if type(first) is str and first in ACCESSES:
+                new_rest, infos = self.operands([obj, ind, *rest], env)
+                for info in infos[2:]:
+                    self.escape(info)
+                name = first
+                if first in UNCHECKED and infos[1].within(infos[0].length):
+                    name = UNCHECKED[first]
+                # Setters return the object they were given.
+                if first[-1] == "!":
+                    return [name, *new_rest], Info(length = infos[0].length)
+                return [name, *new_rest], Info()
+            case ["add1", arg]:
+                new_arg, info = self.analyze(arg, env)
+                return ["add1", new_arg], Info(add(info.lo, 1), add(info.hi, 1))
+            case ["sub1", arg]:
+                new_arg, info = self.analyze(arg, env)
+                return ["sub1", new_arg], Info(add(info.lo, -1), add(info.hi, -1))
+            case ["char->integer", arg]:
+                new_arg, _ = self.analyze(arg, env)
+                return ["char->integer", new_arg], Info(0, None)
+            case [first, *rest] if type(first) is str and first in ["+", "-", "*"] and len(rest) > 0:
+                new_rest, infos = self.operands(rest, env)
+                return [first, *new_rest], self.arithmetic(first, infos)
+            case [first, *rest] if type(first) is str and first in COMPARISONS + PREDICATES + ["+", "-", "*", "cons"]:
+                new_rest, infos = self.operands(rest, env)
+                for info in infos:
+                    self.escape(info)
+                return [first, *new_rest], Info()
+            case ["if", test, conseq, alt]:
+                new_test, _ = self.analyze(test, env)
+                new_conseq, conseq_info = self.analyze(conseq, self.refine(test, env, True))
+                new_alt, alt_info = self.analyze(alt, self.refine(test, env, False))
+                return ["if", new_test, new_conseq, new_alt], self.merge(conseq_info, alt_info)
+            case [first, *rest] if type(first) is str and first in ["and", "or"]:
+                new_rest = []
+                for element in rest:
+                    new_element, info = self.analyze(element, env)
+                    self.escape(info)
+                    new_rest.append(new_element)
+                    env = self.refine(element, env, first == "and")
+                return [first, *new_rest], Info()
+            case ["begin", *rest]:
+                new_rest, infos = self.operands(rest, env)
+                return ["begin", *new_rest], infos[-1] if len(infos) > 0 else Info()
+            case [first, bindings, body] if type(first) is str and first in ["let", "let*", "letrec"]:
+                env = dict(env)
+                if first == "letrec":
+                    for name, value in bindings:
+                        env[("local", name)] = self.peek_closure(value)
+                # Bindings become visible to the bindings after them as they are compiled.
+                new_bindings = []
+                for name, value in bindings:
+                    new_value, info = self.analyze(value, env)
+                    env[("local", name)] = info
+                    new_bindings.append((name, new_value))
+                new_body, info = self.analyze(body, env)
+                return [first, new_bindings, new_body], info
+            case ["closure", label, *rest]:
+                new_rest, infos = self.operands(rest, env)
+                if label in self.new_captures:
+                    infos = [self.merge(a, b) for a, b in zip(self.new_captures[label], infos)]
+                self.new_captures[label] = infos
+                return ["closure", label, *new_rest], Info(label = label)
+            case ["constant-ref", label]:
+                return expr, self.constants.get(label, Info())
+            case ["symbol", *_]:
+                return expr, Info()
+            case [first, *rest]:
+                new_first, first_info = self.analyze(first, env)
+                new_rest, infos = self.operands(rest, env)
+                self.call(first_info, infos)
+                return [new_first, *new_rest], Info()
+
+        return expr, Info()
+
+    def call(self, callee: Info, args: list):
+        """
+        Records the arguments passed at a call site.
+
+        Args:
+            callee (Info): Abstract value of the procedure being called.
+            args (list): Abstract values of the arguments.
+        """
+        label = callee.label
+
+        if label is None or label not in self.codes or len(self.codes[label][0]) != len(args):
+            self.escape(callee)
+            for arg in args:
+                self.escape(arg)
+            return
+
+        if label in self.calls:
+            self.calls[label] = [self.merge(a, b) for a, b in zip(self.calls[label], args)]
+        else:
+            self.calls[label] = args
+
+    def arithmetic(self, op: str, infos: list) -> Info:
+        """
+        Computes the range of an arithmetic expression.
+
+        Args:
+            op (str): One of "+", "-" or "*".
+            infos (list): Abstract values of the operands.
+
+        Returns:
+            Info: Range of the result.
+        """
+        res = infos[0]
+
+        for info in infos[1:]:
+            match op:
+                case "+":
+                    res = Info(add(res.lo, info.lo), add(res.hi, info.hi))
+                case "-":
+                    res = Info(add(res.lo, -info.hi if info.hi is not None else None), add(res.hi, -info.lo if info.lo is not None else None))
+                case "*":
+                    if res.lo is not None and info.lo is not None and res.lo >= 0 and info.lo >= 0:
+                        hi = res.hi * info.hi if res.hi is not None and info.hi is not None else None
+                        res = Info(res.lo * info.lo, hi)
+                    else:
+                        res = Info()
+
+        return Info(res.lo, res.hi)
+
+    def peek(self, expr, env: dict) -> Info:
+        """
+        Computes the range of a simple expression without recording anything.
+
+        Args:
+            expr: Expression to be checked.
+            env (dict): Abstract values of variables in scope.
+
+        Returns:
+            Info: Range of the expression.
+        """
+        match expr:
+            case bool(_):
+                return Info()
+            case int(_):
+                return Info(expr, expr)
+            case _ if var_key(expr) is not None:
+                return env.get(var_key(expr), Info())
+            case ["add1", arg]:
+                info = self.peek(arg, env)
+                return Info(add(info.lo, 1), add(info.hi, 1))
+            case ["sub1", arg]:
+                info = self.peek(arg, env)
+                return Info(add(info.lo, -1), add(info.hi, -1))
+            case [op, *rest] if type(op) is str and op in ["+", "-", "*"] and len(rest) > 0:
+                return self.arithmetic(op, [self.peek(e, env) for e in rest])
+
+        return Info()
+
+    def peek_closure(self, expr) -> Info:
+        """
+        Finds the code label of a closure expression before it is analyzed.
+
+        Args:
+            expr: Expression to be checked.
+
+        Returns:
+            Info: Closure value, or an unknown value.
+        """
+        match expr:
+            case ["closure", label, *_]:
+                return Info(label = label)
+
+        return Info()
+
+    def refine(self, test, env: dict, truth: bool) -> dict:
+        """
+        Narrows the ranges of variables compared in a test.
+
+        Args:
+            test: Test expression.
+            env (dict): Abstract values of variables in scope.
+            truth (bool): Whether the test is known to have passed.
+
+        Returns:
+            dict: Environment holding the narrowed ranges.
+        """
+        match test:
+            case ["not", arg]:
+                return self.refine(arg, env, not truth)
+            case ["and", *rest] if truth:
+                for element in rest:
+                    env = self.refine(element, env, True)
+                return env
+            case ["or", *rest] if not truth:
+                for element in rest:
+                    env = self.refine(element, env, False)
+                return env
+            case ["zero?", arg] if var_key(arg) is not None:
+                key = var_key(arg)
+                info = env.get(key, Info())
+                env = dict(env)
+                if truth:
+                    env[key] = intersect(info, 0, 0)
+                elif info.lo == 0:
+                    env[key] = intersect(info, 1, None)
+                return env
+            case [op, x, y] if type(op) is str and op in COMPARISONS:
+                if not truth:
+                    if op not in NEGATIONS:
+                        return env
+                    op = NEGATIONS[op]
+                # Rewrite as x <= y + diff and/or y <= x - diff.
+                match op:
+                    case "<":
+                        return self.bound(env, x, y, -1)
+                    case "<=":
+                        return self.bound(env, x, y, 0)
+                    case ">":
+                        return self.bound(env, y, x, -1)
+                    case ">=":
+                        return self.bound(env, y, x, 0)
+                    case "=":
+                        return self.bound(self.bound(env, x, y, 0), y, x, 0)
+
+        return env
+
+    def bound(self, env: dict, x, y, diff: int) -> dict:
+        """
+        Narrows ranges given that x <= y + diff.
+
+        Args:
+            env (dict): Abstract values of variables in scope.
+            x: Smaller expression.
+            y: Larger expression.
+            diff (int): Constant offset.
+
+        Returns:
+            dict: Environment holding the narrowed ranges.
+        """
+        x_info = self.peek(x, env)
+        y_info = self.peek(y, env)
+        env = dict(env)
+
+        if var_key(x) is not None:
+            env[var_key(x)] = intersect(env.get(var_key(x), Info()), None, add(y_info.hi, diff))
+        if var_key(y) is not None:
+            env[var_key(y)] = intersect(env.get(var_key(y), Info()), add(x_info.lo, -diff), None)
+
+        return env
+
+    def datum(self, expr) -> Info:
+        """
+        Computes the abstract value of constant data.
+
+        Args:
+            expr: Quoted datum.
+
+        Returns:
+            Info: Abstract value of the datum.
+        """
+        match expr:
+            case bool(_):
+                return Info()
+            case int(_):
+                return Info(expr, expr)
+            case [first, *rest] if type(first) is str and first in ["vector", "string"]:
+                return Info(length = len(rest))
+
+        return Info()
+
+def elide_bounds_checks(ast):
+    """
+    Wrapper around RangeAnalysis class and run() function.
+
+    Args:
+        ast: Closure converted program.
+
+    Returns:
+        Program in which provably safe vector and string accesses are unchecked.
+    """
+    return RangeAnalysis().run(ast)
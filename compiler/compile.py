@@ -11,10 +11,30 @@ from io import StringIO
 from typing import BinaryIO
 from .compiler import Compiler
 from .parser import *
+from .escape import scalar_replace
+from .bounds import elide_bounds_checks
 from .utils import *
 
 ARGC = [1, 2, 3]
 
+def compile_source(source: str) -> Compiler:
+    """
+    Parses, optimizes and compiles a Scheme program.
+
+    Args:
+        source (str): Scheme source code.
+
+    Returns:
+        Compiler: Compiler holding the program's bytecode.
+    """
+    program = scheme_parse(source)
+    program = scalar_replace(program)
+    program = elide_bounds_checks(program)
+    compiler = Compiler()
+    compiler.compile_function(program)
+
+    return compiler
+
 def compile_program(input: StringIO, output: BinaryIO):
     """
     Compiles a Scheme program and writes bytecode to output file.
@@ -28,10 +48,7 @@ def compile_program(input: StringIO, output: BinaryIO):
         source = input.readline()
     else:
         source = input.read()
-    program = scheme_parse(source)
-    compiler = Compiler()
-    compiler.compile_function(program)
-    compiler.write_to_stream(output)
+    compile_source(source).write_to_stream(output)
 
 if __name__ == "__main__":
     # Parse arguments.
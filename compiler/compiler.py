@@ -24,6 +24,9 @@ CHAR_MASK = 255
 EMPTY_LIST_SHIFT = 8
 EMPTY_LIST_TAG = 47
 EMPTY_LIST_MASK = 255
+PAIR_SHIFT = 3
+PAIR_TAG = 1
+PAIR_MASK = 7
 VECTOR_SHIFT = 3
 VECTOR_TAG = 2
 VECTOR_MASK = 7
@@ -37,9 +40,22 @@ CLOSURE_SHIFT = 3
 CLOSURE_TAG = 6
 CLOSURE_MASK = 7
 
+# "SCHEMEBC" read as a little endian word. Never a valid opcode, so headerless streams can still be told apart.
+BYTECODE_MAGIC = 0x4342454D45484353
+FORMAT_VERSION = 2
+COMPILER_VERSION = 1
+FLAG_DEBUG_INFO = 1
+# Sections start on cache line boundaries of the file so they can be used in place once mapped.
+SECTION_ALIGN = 64
+HEADER_LEN = 7
+SECTION_ENTRY_LEN = 3
+FRAME_LINKAGE = 2
+# Below this many elements pushing each one is cheaper than keeping an image in the constant pool.
+BULK_LITERAL_MIN = 8
+
 UNARY_OPS = ["add1", "sub1", "integer->char", "char->integer", "null?", "zero?", "not", "integer?", "boolean?", "car", "cdr"]
-BINARY_OPS = ["string-ref", "string-append", "vector-ref", "vector-append"]
-TERNARY_OPS = ["string-set!", "vector-set!"]
+BINARY_OPS = ["string-ref", "string-append", "vector-ref", "vector-append", "unsafe-string-ref", "unsafe-vector-ref"]
+TERNARY_OPS = ["string-set!", "vector-set!", "unsafe-string-set!", "unsafe-vector-set!"]
 VARIADIC_OPS = ["+", "*", "-", "<", "<=", ">", ">=", "="]
 
 class Compiler:
@@ -50,7 +66,15 @@ class Compiler:
     
     Attributes:
         code (list): represents the current state of the stack
-        max_locals_count (int):
+        stack_ind (int): Depth of the operand stack in the frame being compiled.
+        max_stack_depth (int): Greatest depth reached by the frame being compiled.
+        procedures (list): Entry point, number of bound variables, number of free variables and stack depth of each procedure, in the order of their code labels.
+        procedure_names (list): Label of each procedure, in the same order.
+        pool (list): Heap image of quoted constants, loaded at the base of the heap.
+        constants (dict): Printed form of each quoted constant laid out in the pool, mapped to its tagged value.
+        symbols (dict): Tagged value of each interned symbol in the pool, mapped to its index in the symbol table.
+        in_code (bool): Whether a procedure's code is being compiled.
+        last_call (int): Location of the last call instruction emitted, which takes the number of arguments passed.
     """
 
     def __init__(self):
@@ -58,12 +82,19 @@ class Compiler:
         Initializes the Compiler object.
         """
         self.code = []
-        self.max_locals_count = 0
         self.stack_ind = 0
+        self.max_stack_depth = 0
+        self.procedures = []
+        self.procedure_names = []
+        self.pool = []
+        self.constants = {}
+        self.symbols = {}
         self.bindings = []
         self.labels = []
         self.frees = []
         self.bounds = []
+        self.in_code = False
+        self.last_call = None
 
     def compile(self, expr):
         """
@@ -81,53 +112,56 @@ class Compiler:
         match expr:
             # Handle the case of the empty vector constructor.
             case ["vector"]:
-                self.stack_ind += 1
+                self.stack_effect(1)
                 emit(I.VEC)
                 emit(0)
             case ["+"] | ["-"] | ["*"] | ["<"] | ["<="] | [">"] | [">="] | ["="]:
-                self.stack_ind += 2
+                self.stack_effect(1)
                 emit(I.LOAD64)
                 emit(box_fixnum(0))
             case ["and"]:
-                self.stack_ind += 2
+                self.stack_effect(1)
                 emit(I.LOAD64)
                 emit(box_bool(True))
             case ["or"]:
-                self.stack_ind += 2
+                self.stack_effect(1)
                 emit(I.LOAD64)
                 emit(box_bool(False))
             case bool(_):
-                self.stack_ind += 1
+                self.stack_effect(1)
                 emit(I.LOAD64)
                 emit(box_bool(expr))
             case int(_):
-                self.stack_ind += 1
+                self.stack_effect(1)
                 emit(I.LOAD64)
                 emit(box_fixnum(expr))
             case s if type(expr) is Free:
+                self.stack_effect(1)
                 emit(I.GET_FREE)
-                emit(len(self.labels) - 1)
                 emit(self.frees.index(s.get_name()))
             case s if type(expr) is Bound:
+                self.stack_effect(1)
                 emit(I.GET_ARG)
                 emit(self.bounds.index(s.get_name()))
             case s if type(expr) is Local:
-                self.stack_ind += 1
+                self.stack_effect(1)
                 emit(I.PUSH_LET)
                 emit(self.stack_ind - 1 - self.bindings[-1][s.get_name()])
             case str(s):
                 match s[0]:
                     case "#":
-                        self.stack_ind += 1
+                        self.stack_effect(1)
                         emit(I.LOAD64)
                         emit(box_char(expr))
                     case _:
                         raise RuntimeError(f"Unknown string {s}.")
             case [only]:
                 self.compile(only)
+                self.last_call = len(self.code)
                 emit(I.CALL)
+                emit(0)
             case []:
-                self.stack_ind += 1
+                self.stack_effect(1)
                 emit(I.LOAD64)
                 emit(box_empty_list())
             # Compilation of an expression.
@@ -138,12 +172,12 @@ class Compiler:
                         for i in range(len(rest[1:])):
                             self.compile(rest[1 + i])
                             self.emit_symbol(w)
-                            self.stack_ind -= 1
+                            self.stack_effect(-1)
                     case w if w in BINARY_OPS:
                         self.compile(rest[0])
                         self.compile(rest[1])
                         self.emit_symbol(w)
-                        self.stack_ind -= 1
+                        self.stack_effect(-1)
                     case w if w in UNARY_OPS:
                         self.compile(rest[0])
                         self.emit_symbol(w)
@@ -152,7 +186,12 @@ class Compiler:
                         self.compile(rest[1])
                         self.compile(rest[2])
                         self.emit_symbol(w)
-                        self.stack_ind -= 2
+                        self.stack_effect(-2)
+                    case w if w in ["string", "vector"] and is_bulk(expr):
+                        # Copy a prebuilt image out of the constant pool instead of pushing every element.
+                        self.stack_effect(1)
+                        emit(I.CLONE)
+                        emit(self.constant(expr))
                     case w if w in ["string", "vector", "begin"]:
                         cnt = 0
                         for element in rest:
@@ -160,14 +199,17 @@ class Compiler:
                             cnt += 1
                         self.emit_symbol(w)
                         emit(len(rest))
-                        self.stack_ind -= (cnt - 1)
+                        self.stack_effect(1 - cnt)
                     case "if":
                         self.compile(rest[0])
                         emit(I.POP_JUMP_IF_FALSE)
+                        self.stack_effect(-1)
                         emit(get_len(rest[1]) + 2)
                         self.compile(rest[1])
                         self.check_tail()
                         emit(I.JUMP_OVER_ELSE)
+                        # Only one of the branches leaves its value on the stack.
+                        self.stack_effect(-1)
                         emit(get_len(rest[2]))
                         self.compile(rest[2])
                         self.check_tail()
@@ -180,6 +222,7 @@ class Compiler:
                                 length += (get_len(el) + 1)
                                 emit(length)
                                 emit(I.POP)
+                                self.stack_effect(-1)
                                 self.compile(element)
                     case "or":
                         self.compile(rest[0])
@@ -190,6 +233,7 @@ class Compiler:
                                 length += (get_len(el) + 1)
                                 emit(length)
                                 emit(I.POP)
+                                self.stack_effect(-1)
                                 self.compile(element)
                     case "let":
                         # Compile bindings.
@@ -205,7 +249,7 @@ class Compiler:
                         self.bindings.pop()
                         emit(I.END_LET)
                         emit(len(rest[0]))
-                        self.stack_ind -= len(rest[0])
+                        self.stack_effect(-len(rest[0]))
                     case "let*":
                         # Compile bindings.
                         if len(self.bindings) == 0:
@@ -219,7 +263,7 @@ class Compiler:
                         self.bindings.pop()
                         emit(I.END_LET)
                         emit(len(rest[0]))
-                        self.stack_ind -= len(rest[0])
+                        self.stack_effect(-len(rest[0]))
                     case "letrec":
                         # Compile bindings.
                         if len(self.bindings) == 0:
@@ -227,20 +271,24 @@ class Compiler:
                         else:
                             self.bindings.append(self.bindings[-1].copy())
                         for i, binding in enumerate(rest[0]):
-                            self.bindings[-1][binding[0]] = self.stack_ind
-                            self.stack_ind += 1
-                        for i, binding in enumerate(rest[0]):
-                            self.compile(rest[0][i][1])
+                            self.bindings[-1][binding[0]] = self.stack_ind + i
+                        # Closures are made before any of their frees are set, so that they can capture each other.
+                        closures = [type(binding[1]) is list and binding[1][:1] == ["closure"] for binding in rest[0]]
+                        for binding, closure in zip(rest[0], closures):
+                            self.compile(binding[1][:2] if closure else binding[1])
+                        for binding, closure in zip(rest[0], closures):
+                            if closure and len(binding[1]) > 2:
+                                self.set_frees(binding[1][2:], self.bindings[-1][binding[0]])
                         self.compile(rest[1])
                         self.bindings.pop()
                         emit(I.END_LET)
                         emit(len(rest[0]))
-                        self.stack_ind -= len(rest[0])
+                        self.stack_effect(-len(rest[0]))
                     case "cons":
                         self.compile(rest[1])
                         self.compile(rest[0])
                         emit(I.CONS)
-                        self.stack_ind -= 1
+                        self.stack_effect(-1)
                     case "labels":
                         for element in rest[0]:
                             self.labels.append(element[0])
@@ -253,46 +301,137 @@ class Compiler:
                         emit(len(rest[1]))
                         self.bounds = rest[0]
                         self.frees = rest[1]
+                        # The procedure's body runs in a frame of its own.
+                        stack_ind, max_stack_depth = self.stack_ind, self.max_stack_depth
+                        self.stack_ind, self.max_stack_depth = 0, 0
+                        self.in_code = True
+                        entry = len(self.code)
                         self.compile(rest[2])
                         emit(I.RET)
-                        self.stack_ind -= 2
-                        self.stack_ind -= len(rest[0])
+                        self.in_code = False
+                        self.procedures.append([entry, len(rest[0]), len(rest[1]), FRAME_LINKAGE + len(rest[0]) + self.max_stack_depth])
+                        self.procedure_names.append(self.labels[-1])
+                        self.stack_ind, self.max_stack_depth = stack_ind, max_stack_depth
+                        # The label itself is left on the stack.
+                        self.stack_effect(1)
                     case "closure":
                         emit(I.CLOSURE)
                         emit(self.labels.index(rest[0]))
-                        self.stack_ind += 1
+                        self.stack_effect(1)
                         if len(rest) > 1:
-                            for element in rest[1:]:
-                                self.compile(element)
-                            emit(I.SET_FREES)
-                            emit(self.labels.index(rest[0]))
-                            emit(len(rest[1:]))
-                            self.stack_ind -= len(rest[1:])
-                        else:
-                            emit(I.SET_FREES)
-                            emit(self.labels.index(rest[0]))
-                            emit(0)
+                            self.set_frees(rest[1:], self.stack_ind - 1)
                     case "constant-ref":
+                        self.stack_effect(1)
                         emit(I.CONST_REF)
                         emit(self.labels.index(rest[0]))
                     case "constant-init":
-                        self.compile(rest[0])
+                        # Literal data is laid out in the constant pool, so only its address is pushed.
+                        match rest[0]:
+                            case ["symbol", *_]:
+                                self.compile(rest[0])
+                            case datum if is_literal(datum):
+                                self.stack_effect(1)
+                                emit(I.LOAD64)
+                                emit(self.constant(datum))
+                            case datum:
+                                self.compile(datum)
                         emit(I.CONST_INIT)
                     case "symbol":
+                        # Push the interned symbol by its index in the symbol table.
+                        self.stack_effect(1)
                         emit(I.SYMBOL)
-                        emit(len(rest))
-                        for c in rest:
-                            emit(ord(c))
+                        emit(self.symbols[self.constant(expr)])
                     case _:
                         for element in rest:
                             self.compile(element)
                         self.compile(first)
+                        self.last_call = len(self.code)
                         emit(I.CALL)
-                        self.stack_ind -= len(rest)
+                        emit(len(rest))
+                        self.stack_effect(-len(rest))
+
+    def constant(self, datum) -> int:
+        """
+        Lays out a quoted datum in the constant pool the way the interpreter would build it on the heap.
+        Identical data share a single image.
+
+        Args:
+            datum: Literal datum, as accepted by is_literal().
+
+        Returns:
+            int: 64-bit tagged value of the datum.
+        """
+        match datum:
+            case bool(_):
+                return box_bool(datum)
+            case int(_):
+                return box_fixnum(datum)
+            case str(_):
+                return box_char(datum)
+            case []:
+                return box_empty_list()
+
+        key = repr(datum)
+        if key in self.constants:
+            return self.constants[key]
+
+        # Lay out contents first so that the object's own words are contiguous.
+        match datum:
+            case ["cons", car, cdr]:
+                words = [self.constant(car), self.constant(cdr)]
+                shift, mask, tag = PAIR_SHIFT, PAIR_MASK, PAIR_TAG
+            case ["vector", *elements]:
+                words = [len(elements)] + [self.constant(element) for element in reversed(elements)]
+                shift, mask, tag = VECTOR_SHIFT, VECTOR_MASK, VECTOR_TAG
+            case ["string", *chars]:
+                words = [len(chars)] + pack_chars(chars)
+                shift, mask, tag = STRING_SHIFT, STRING_MASK, STRING_TAG
+            case ["symbol", *chars]:
+                words = [len(chars)] + [ord(c) for c in chars]
+                shift, mask, tag = SYMBOL_SHIFT, SYMBOL_MASK, SYMBOL_TAG
+
+        value = ((len(self.pool) << shift) & ~mask) | tag
+        self.pool += words
+        self.constants[key] = value
+
+        # Every distinct symbol has exactly one object, listed in the symbol table.
+        if tag == SYMBOL_TAG:
+            self.symbols[value] = len(self.symbols)
+
+        return value
+
+    def stack_effect(self, n: int):
+        """
+        Records the effect of an emitted instruction on the depth of the operand stack.
+
+        Args:
+            n (int): Number of values pushed, negative if values are popped.
+        """
+        self.stack_ind += n
+        self.max_stack_depth = max(self.max_stack_depth, self.stack_ind)
 
     def check_tail(self):
-        if self.code[-1] == I.CALL:
-            self.code[-1] = I.TAIL_CALL
+        """
+        Turns the call just compiled into a tail call if it ends a procedure's code.
+        Top-level code has no caller to return to, so its calls are left alone.
+        """
+        if self.in_code and self.last_call == len(self.code) - 2:
+            self.code[self.last_call] = I.TAIL_CALL
+
+    def set_frees(self, frees: list, closure: int):
+        """
+        Compiles the values of a closure's free variables and stores them into the closure.
+
+        Args:
+            frees (list): Expressions for the values of the free variables.
+            closure (int): Stack index of the closure.
+        """
+        for element in frees:
+            self.compile(element)
+        self.code.append(I.SET_FREES)
+        self.code.append(self.stack_ind - closure)
+        self.code.append(len(frees))
+        self.stack_effect(-len(frees))
 
     def compile_function(self, expr):
         """
@@ -304,15 +443,74 @@ class Compiler:
         self.compile(expr)
         self.code.append(I.RETURN)
 
-    def write_to_stream(self, f: BinaryIO):
+    def write_to_stream(self, f: BinaryIO, debug: bool = False):
+        """
+        Writes a bytecode container to file stream.
+
+        The container starts with a header of 8-byte words: magic number, format version, compiler version, flags, maximum stack depth of the entry code, entry point and number of sections.
+        A table follows with the kind, byte offset and length in words of each section.
+        Each section starts on a SECTION_ALIGN byte boundary.
+        The symbol table section is only written if the program uses symbols.
+
+        Args:
+            f (BinaryIO): File opened for writing in binary format.
+            debug (bool): Whether to include the debug section.
+        """
+        sections = [(S.CODE, self.code), (S.CONSTANTS, self.pool), (S.PROCEDURES, [word for procedure in self.procedures for word in procedure])]
+        if self.symbols:
+            sections.append((S.SYMBOLS, list(self.symbols)))
+        if debug:
+            sections.append((S.DEBUG, self.debug_info()))
+
+        header = [BYTECODE_MAGIC, FORMAT_VERSION, COMPILER_VERSION, FLAG_DEBUG_INFO if debug else 0, self.max_stack_depth, 0, len(sections)]
+        offset = align(8 * (HEADER_LEN + SECTION_ENTRY_LEN * len(sections)))
+        for kind, words in sections:
+            header += [kind, offset, len(words)]
+            offset = align(offset + 8 * len(words))
+
+        written = self.write_words(f, header)
+        for kind, words in sections:
+            written += self.write_words(f, [0] * ((align(written) - written) // 8))
+            written += self.write_words(f, words)
+
+    def write_code(self, f: BinaryIO):
         """
-        Writes instructions to file stream.
+        Writes instructions to file stream without a container.
 
         Args:
             f (BinaryIO): File opened for writing in binary format.
         """
-        for op in self.code:
-            f.write(op.to_bytes(8, "little"))
+        self.write_words(f, self.code)
+
+    def write_words(self, f: BinaryIO, words: list) -> int:
+        """
+        Writes 8-byte little endian words to file stream.
+
+        Args:
+            f (BinaryIO): File opened for writing in binary format.
+            words (list): Words to be written.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        for word in words:
+            f.write(word.to_bytes(8, "little"))
+
+        return 8 * len(words)
+
+    def debug_info(self) -> list:
+        """
+        Builds the debug section, which names the label of each procedure.
+
+        Returns:
+            list: Length of each label name followed by its characters, in the order of the procedure table.
+        """
+        words = []
+        for name in self.procedure_names:
+            words.append(len(name))
+            words += [ord(c) for c in name]
+
+        return words
 
     def emit_symbol(self, c: str):
         """
@@ -379,6 +577,14 @@ class Compiler:
                 emit(I.VEC_APP)
             case "begin":
                 emit(I.BEG)
+            case "unsafe-vector-ref":
+                emit(I.VEC_REF_UNCHECKED)
+            case "unsafe-vector-set!":
+                emit(I.VEC_SET_UNCHECKED)
+            case "unsafe-string-ref":
+                emit(I.STR_REF_UNCHECKED)
+            case "unsafe-string-set!":
+                emit(I.STR_SET_UNCHECKED)
 
 def get_len(expr) -> int:
     """
@@ -401,7 +607,7 @@ def get_len(expr) -> int:
             case int(_):
                 length += 2
             case s if type(expr) is Free:
-                length += 3
+                length += 2
             case s if type(expr) is Bound:
                 length += 2
             case s if type(expr) is Local:
@@ -413,7 +619,7 @@ def get_len(expr) -> int:
                     case _:
                         raise RuntimeError(f"Unknown string {s}.")
             case [only]:
-                length += (get_len(only) + 1)
+                length += (get_len(only) + 2)
             case []:
                 length += 2
             # Compilation of an expression.
@@ -429,21 +635,22 @@ def get_len(expr) -> int:
                         length += (get_len(rest[0]) + 1)
                     case w if w in TERNARY_OPS:
                         length += (get_len(rest[0]) + get_len(rest[1]) + get_len(rest[2]) + 1)
+                    case w if w in ["string", "vector"] and is_bulk(expr):
+                        length += 2
                     case w if w in ["string", "vector", "begin"]:
                         for element in rest:
                             length += get_len(element)
                         length += 2
                     case "if":
                         length += (get_len(rest[0]) + 2 + get_len(rest[1]) + 2 + get_len(rest[2]))
-                    case "let":
-                        for i, binding in enumerate(rest[0]):
-                            length += get_len(rest[1][i][1])
+                    case "let" | "let*" | "letrec":
+                        for binding in rest[0]:
+                            length += get_len(binding[1])
                         length += (get_len(rest[1]) + 2)
                     case "cons":
                         length += (get_len(rest[1]) + get_len(rest[0]) + 1)
                     case "labels":
                         for element in rest[0]:
-                            ielf.stack_ind -= 1
                             length += get_len(element[1])
                         length += get_len(rest[1])
                     case "code":
@@ -453,19 +660,89 @@ def get_len(expr) -> int:
                         if len(rest) > 1:
                             for element in rest[1:]:
                                 length += get_len(element)
-                        length += 3
-                    case "constant-ref":
+                            length += 3
+                    case "constant-ref" | "symbol":
                         length += 2
                     case "constant-init":
-                        for element in rest:
-                            length += get_len(element)
+                        length += (2 if is_literal(rest[0]) else get_len(rest[0])) + 1
                     case _:
                         for element in rest:
                             length += get_len(element)
-                        length += (get_len(first) + 1)
+                        length += (get_len(first) + 2)
 
     return length
 
+def is_literal(datum) -> bool:
+    """
+    Checks whether a quoted datum can be laid out in the constant pool at compile time.
+
+    Args:
+        datum: Quoted datum.
+
+    Returns:
+        bool: True if the datum is made up only of immediates, pairs, vectors, strings and symbols.
+    """
+    match datum:
+        case bool(_) | int(_) | []:
+            return True
+        case str(_):
+            return datum[0] == "#"
+        case ["cons", car, cdr]:
+            return is_literal(car) and is_literal(cdr)
+        case ["vector", *elements]:
+            return all(is_literal(element) for element in elements)
+        case ["string", *chars] | ["symbol", *chars]:
+            return all(type(c) is str for c in chars)
+
+    return False
+
+def is_bulk(expr) -> bool:
+    """
+    Checks whether a string or vector constructor is large enough and constant enough to be copied out of the constant pool in one go.
+
+    Args:
+        expr: String or vector constructor.
+
+    Returns:
+        bool: True if the constructor has at least BULK_LITERAL_MIN elements, all of them immediates.
+    """
+    match expr:
+        case ["string", *chars]:
+            elements = chars
+        case ["vector", *elements]:
+            pass
+        case _:
+            return False
+
+    return len(elements) >= BULK_LITERAL_MIN and all(type(element) in [bool, int] or (type(element) is str and element[0] == "#") or element == [] for element in elements)
+
+def pack_chars(chars: list) -> list:
+    """
+    Packs the characters of a string into words the way the interpreter stores them, one byte per character.
+
+    Args:
+        chars (list): Characters of the string.
+
+    Returns:
+        list: Little endian words holding the characters in order, the last one padded with zeros.
+    """
+    data = bytes(box_char(c) >> CHAR_SHIFT for c in chars)
+    data += bytes(-len(data) % 8)
+
+    return [int.from_bytes(data[i:i + 8], "little") for i in range(0, len(data), 8)]
+
+def align(offset: int) -> int:
+    """
+    Rounds a byte offset up to the next section boundary.
+
+    Args:
+        offset (int): Byte offset into the bytecode container.
+
+    Returns:
+        int: Smallest multiple of SECTION_ALIGN not below the offset.
+    """
+    return (offset + SECTION_ALIGN - 1) // SECTION_ALIGN * SECTION_ALIGN
+
 def box_fixnum(val: int) -> int:
     """
     Implements pointer tagging scheme on integer values.
@@ -541,6 +818,16 @@ def get_new_label_num(labels: dict) -> int:
 
     return max + 1
 
+class S(enum.IntEnum):
+    """
+    Class for the enumeration of the kinds of section in a bytecode container.
+    """
+    CODE = 1
+    CONSTANTS = 2
+    PROCEDURES = 3
+    DEBUG = 4
+    SYMBOLS = 5
+
 class I(enum.IntEnum):
     """
     Class for the enumeration of all different opcodes.
@@ -596,6 +883,11 @@ class I(enum.IntEnum):
     JUMP_IF_FALSE = enum.auto()     # 0x2F
     POP = enum.auto()               # 0x30
     JUMP_IF_TRUE = enum.auto()      # 0x31
+    VEC_REF_UNCHECKED = enum.auto() # 0x32
+    VEC_SET_UNCHECKED = enum.auto() # 0x33
+    STR_REF_UNCHECKED = enum.auto() # 0x34
+    STR_SET_UNCHECKED = enum.auto() # 0x35
+    CLONE = enum.auto()             # 0x36
 
 if __name__ == "__main__":
     compiler = Compiler()
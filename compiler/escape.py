@@ -0,0 +1,286 @@
+# escape.py -
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+# - Escape analysis over closure converted programs.
+# - Pairs, vectors and strings bound by a let that are only ever taken apart with car, cdr, vector-ref or string-ref at constant indices never reach the heap.
+#   Each of their fields is bound to a stack slot of its own instead.
+# - Accessors applied directly to a constructor are folded to the selected field.
+#
+
+from .utils import *
+
+ACCESSORS = {"cons": ["car", "cdr"], "vector": ["vector-ref", "unsafe-vector-ref"], "string": ["string-ref", "unsafe-string-ref"]}
+LETS = ["let", "let*", "letrec"]
+
+def fields(value) -> list | None:
+    """
+    Splits an aggregate constructor into its fields.
+
+    Args:
+        value: Expression to be split.
+
+    Returns:
+        list | None: (field name, expression) pairs in evaluation order, None if not a constructor.
+    """
+    match value:
+        case ["cons", car, cdr]:
+            # Cons evaluates its second argument first.
+            return [("cdr", cdr), ("car", car)]
+        case [first, *rest] if type(first) is str and first in ["vector", "string"]:
+            return [(str(i), element) for i, element in enumerate(rest)]
+
+    return None
+
+def field_of(expr, name: str, kind: str, size: int) -> str | None:
+    """
+    Determines whether an expression selects a constant field out of the given variable.
+
+    Args:
+        expr: Expression to be checked.
+        name (str): Name of the let bound aggregate.
+        kind (str): Constructor of the aggregate.
+        size (int): Number of fields in the aggregate.
+
+    Returns:
+        str | None: Name of the selected field, None if the expression is not such an access.
+    """
+    match expr:
+        case [op, var] if kind == "cons" and op in ACCESSORS[kind] and type(var) is Local and var.get_name() == name:
+            return op
+        case [op, var, ind] if kind != "cons" and op in ACCESSORS[kind] and type(var) is Local and var.get_name() == name:
+            if type(ind) is int and 0 <= ind < size:
+                return str(ind)
+
+    return None
+
+def field_name(name: str, field: str, serial: int) -> str:
+    """
+    Names the local holding a field of a scalar replaced aggregate.
+    Identifiers never contain whitespace so the name cannot clash with a source variable.
+
+    Args:
+        name (str): Name of the aggregate.
+        field (str): Name of the field.
+        serial (int): Number of the replacement, so that rebinding the aggregate's name gives new locals.
+
+    Returns:
+        str: Name of the field's local.
+    """
+    return f"{name} {field} {serial}"
+
+def escapes(expr, name: str, kind: str, size: int) -> bool:
+    """
+    Checks whether a let bound aggregate is used other than by selecting constant fields.
+
+    Args:
+        expr: Expression in the scope of the binding.
+        name (str): Name of the aggregate.
+        kind (str): Constructor of the aggregate.
+        size (int): Number of fields in the aggregate.
+
+    Returns:
+        bool: True if the aggregate escapes.
+    """
+    match expr:
+        case _ if type(expr) is Local:
+            return expr.get_name() == name
+        case _ if field_of(expr, name, kind, size) is not None:
+            return False
+        case [first, bindings, body] if type(first) is str and first in LETS:
+            if first == "letrec" and name in [binding[0] for binding in bindings]:
+                return False
+            # Bindings are visible to the bindings after them.
+            for binding_name, value in bindings:
+                if escapes(value, name, kind, size):
+                    return True
+                if binding_name == name:
+                    return False
+            return escapes(body, name, kind, size)
+        case list(_):
+            return any(escapes(element, name, kind, size) for element in expr)
+
+    return False
+
+def replace(expr, name: str, kind: str, size: int, serial: int):
+    """
+    Replaces field selections out of a scalar replaced aggregate by references to the field's local.
+
+    Args:
+        expr: Expression in the scope of the binding.
+        name (str): Name of the aggregate.
+        kind (str): Constructor of the aggregate.
+        size (int): Number of fields in the aggregate.
+        serial (int): Number of the replacement.
+
+    Returns:
+        Rewritten expression.
+    """
+    match expr:
+        case _ if (field := field_of(expr, name, kind, size)) is not None:
+            return Local(field_name(name, field, serial))
+        case [first, bindings, body] if type(first) is str and first in LETS:
+            if first == "letrec" and name in [binding[0] for binding in bindings]:
+                return expr
+            new_bindings = []
+            shadowed = False
+            for binding_name, value in bindings:
+                new_bindings.append((binding_name, value if shadowed else replace(value, name, kind, size, serial)))
+                shadowed = shadowed or binding_name == name
+            return [first, new_bindings, body if shadowed else replace(body, name, kind, size, serial)]
+        case list(_):
+            return [replace(element, name, kind, size, serial) for element in expr]
+
+    return expr
+
+def is_pure(expr) -> bool:
+    """
+    Checks whether evaluating an expression can have no effect other than allocation.
+
+    Args:
+        expr: Expression to be checked.
+
+    Returns:
+        bool: True if the expression can safely be dropped or reordered.
+    """
+    match expr:
+        case bool(_) | int(_) | str(_) | []:
+            return True
+        case _ if type(expr) in [Local, Bound, Free]:
+            return True
+        case ["constant-ref", _]:
+            return True
+        case ["closure", _, *rest]:
+            return all(is_pure(element) for element in rest)
+        case [first, *rest] if type(first) is str and first in ACCESSORS:
+            return all(is_pure(element) for element in rest)
+
+    return False
+
+def fold(expr):
+    """
+    Folds an accessor applied directly to a constructor into the selected field.
+
+    Args:
+        expr: Expression whose subexpressions have already been rewritten.
+
+    Returns:
+        Folded expression, or the original expression if it could not be folded.
+    """
+    match expr:
+        case ["car", ["cons", car, cdr]]:
+            return car if is_pure(cdr) else ["begin", cdr, car]
+        case ["cdr", ["cons", car, cdr]] if is_pure(car):
+            return cdr
+        case [op, [kind, *elements], ind] if kind in ["vector", "string"] and op in ACCESSORS[kind]:
+            if type(ind) is int and 0 <= ind < len(elements):
+                others = elements[:ind] + elements[ind + 1:]
+                if all(is_pure(element) for element in others):
+                    return elements[ind]
+
+    return expr
+
+class ScalarReplacement:
+    """
+    Class to rewrite closure converted programs so that non-escaping aggregates live in stack slots.
+
+    Attributes:
+        serial (int): Number of aggregates replaced so far.
+    """
+
+    def __init__(self):
+        """
+        Initializes the ScalarReplacement object.
+        """
+        self.serial = 0
+
+    def rewrite_let(self, first: str, bindings: list, body) -> list:
+        """
+        Scalar replaces every binding of a let whose aggregate does not escape.
+
+        Args:
+            first (str): Either "let" or "let*".
+            bindings (list): (name, expression) pairs with rewritten expressions.
+            body: Rewritten body.
+
+        Returns:
+            list: Rewritten let expression.
+        """
+        bindings = list(bindings)
+        i = 0
+
+        while i < len(bindings):
+            name, value = bindings[i]
+            split = fields(value)
+
+            if split is not None:
+                kind, size = value[0], len(split)
+                scope = [binding[1] for binding in bindings[i + 1:]]
+                shadow = [binding[0] for binding in bindings[i + 1:]]
+
+                # Only the bindings up to a rebinding of the same name are in scope.
+                if name in shadow:
+                    scope = scope[:shadow.index(name) + 1]
+                    in_body = False
+                else:
+                    in_body = True
+
+                if not any(escapes(element, name, kind, size) for element in scope) and not (in_body and escapes(body, name, kind, size)):
+                    serial = self.serial
+                    self.serial += 1
+                    for j in range(len(scope)):
+                        bindings[i + 1 + j] = (bindings[i + 1 + j][0], replace(bindings[i + 1 + j][1], name, kind, size, serial))
+                    if in_body:
+                        body = replace(body, name, kind, size, serial)
+                    # Revisit the new bindings in case a field is itself an aggregate.
+                    bindings[i:i + 1] = [(field_name(name, field, serial), element) for field, element in split]
+                    continue
+
+            i += 1
+
+        return [first, bindings, body]
+
+    def rewrite(self, expr):
+        """
+        Rewrites an expression bottom up.
+
+        Args:
+            expr: Closure converted expression.
+
+        Returns:
+            Rewritten expression.
+        """
+        match expr:
+            case ["labels", labels, body]:
+                new_labels = []
+                for name, form in labels:
+                    if form[0] == "code":
+                        new_labels.append((name, ["code", form[1], form[2], self.rewrite(form[3])]))
+                    else:
+                        new_labels.append((name, form))
+                return ["labels", new_labels, self.rewrite(body)]
+            case [first, bindings, body] if type(first) is str and first in LETS:
+                bindings = [(name, self.rewrite(value)) for name, value in bindings]
+                body = self.rewrite(body)
+                if first == "letrec":
+                    return [first, bindings, body]
+                return self.rewrite_let(first, bindings, body)
+            case ["constant-ref", _] | ["symbol", *_]:
+                return expr
+            case list(_):
+                return fold([self.rewrite(element) for element in expr])
+
+        return expr
+
+def scalar_replace(expr):
+    """
+    Wrapper around ScalarReplacement class and rewrite() function.
+
+    Args:
+        expr: Closure converted program.
+
+    Returns:
+        Program in which non-escaping aggregates live in stack slots.
+    """
+    return ScalarReplacement().rewrite(expr)
@@ -0,0 +1,257 @@
+# native.py - compiles Scheme programs ahead of time into C++ that runs natively
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+# - Translates the bytecode of a compiled program into a C++ translation unit, which is linked against the interpreter's runtime in interpreter/lib/libutils.a.
+# - Each procedure becomes a function and each instruction inline code on the slots of the stack, whose depth is known at every instruction of verified bytecode.
+# - Instructions that allocate or write to the heap are carried out by the runtime as the interpreter would, reading their operands from the bytecode embedded in the program.
+# - Build the output with "g++ -O2 -std=c++20 -pthread -I interpreter/utils program.cpp -L interpreter/lib -lutils -o program".
+#
+
+import sys
+from io import BytesIO, StringIO
+from .compiler import Compiler, I
+from .compile import compile_source
+
+ARGC = [1, 2, 3]
+# Number of operands each opcode takes from the code.
+OPERANDS = {I.LOAD64: 1, I.POP_JUMP_IF_FALSE: 1, I.JUMP_OVER_ELSE: 1, I.PUSH_LET: 1, I.END_LET: 1, I.STR: 1, I.VEC: 1, I.BEG: 1, I.CODE: 3, I.CLOSURE: 1, I.GET_ARG: 1, I.CALL: 1, I.GET_FREE: 1, I.SET_FREES: 2, I.CONST_REF: 1, I.TAIL_CALL: 1, I.SYMBOL: 1, I.JUMP_IF_FALSE: 1, I.JUMP_IF_TRUE: 1, I.CLONE: 1}
+# Functions of values.h carrying out the opcodes that take one value or two and need nothing else.
+UNARY = {I.ADD1: "add1_value", I.SUB1: "sub1_value", I.INT_TO_CHAR: "int_to_char_value", I.CHAR_TO_INT: "char_to_int_value", I.IS_NULL: "is_null_value", I.IS_ZERO: "is_zero_value", I.NOT: "invert_value", I.IS_INT: "is_int_value", I.IS_BOOL: "is_bool_value"}
+BINARY = {I.PLUS: "plus_value", I.TIMES: "times_value", I.MINUS: "minus_value", I.LT: "less_than_value", I.GT: "greater_than_value", I.LEQ: "less_than_equal_value", I.GEQ: "greater_than_equal_value", I.EQ: "equal_value"}
+# Opcodes the runtime carries out, with the number of values they leave on the stack less the number they take.
+# STR and VEC also take as many values as their operand says and SET_FREES as many as its second.
+STEPPED = {I.CONS: -1, I.STR: 1, I.STR_REF: -1, I.STR_SET: -2, I.STR_APP: -1, I.VEC: 1, I.VEC_REF: -1, I.VEC_SET: -2, I.VEC_APP: -1, I.CLOSURE: 1, I.SET_FREES: 0, I.VEC_REF_UNCHECKED: -1, I.VEC_SET_UNCHECKED: -2, I.STR_REF_UNCHECKED: -1, I.STR_SET_UNCHECKED: -2, I.CLONE: 1}
+WORD_MASK = 2**64 - 1
+BYTES_PER_LINE = 16
+
+class NativeTranslator:
+    """
+    Class to translate the bytecode of a compiled program into C++.
+
+    Attributes:
+        compiler (Compiler): Compiler holding the program's bytecode, constant pool and symbol table.
+        code (list): Bytecode of the program.
+        symbols (list): Tagged value of each interned symbol, in the order of the symbol table.
+        procedures (list): Entry point, number of bound variables and end of the code of each procedure, in the order they are defined.
+    """
+
+    def __init__(self, compiler: Compiler):
+        """
+        Initializes the NativeTranslator object.
+
+        Args:
+            compiler (Compiler): Compiler which has compiled the program.
+        """
+        self.compiler = compiler
+        self.code = compiler.code
+        self.symbols = sorted(compiler.symbols, key = lambda value: compiler.symbols[value])
+        self.procedures = []
+
+    def translate(self) -> str:
+        """
+        Translates the program into a C++ translation unit.
+
+        Returns:
+            str: Source of the translation unit, defining main().
+        """
+        stream = BytesIO()
+        self.compiler.write_to_stream(stream)
+        data = stream.getvalue()
+
+        lines = ["// Compiled ahead of time from Scheme by compiler/native.py.", "", "#include <native.h>", ""]
+
+        # Embed the bytecode, which holds the constants and the operands of the instructions the runtime carries out.
+        lines.append("alignas(8) static const uint8_t bytecode[] = {")
+        for i in range(0, len(data), BYTES_PER_LINE):
+            lines.append("    " + ", ".join(f"0x{byte:02X}" for byte in data[i:i + BYTES_PER_LINE]) + ",")
+        lines += ["};", ""]
+
+        # The program's own code defines the procedures, so it is translated first.
+        program = self.translate_code("program", 0, len(self.code), 0, None)
+        for entry, num_bounds, end in self.procedures:
+            lines += self.translate_code(f"procedure_{entry}", entry, end, num_bounds, entry) + [""]
+        lines += program + [""]
+
+        if self.procedures:
+            lines.append("static const NativeProcedure procedures[] = {")
+            for entry, _, _ in self.procedures:
+                lines.append(f"    {{{entry}, procedure_{entry}}},")
+            lines += ["};", ""]
+
+        lines.append("int main(int argc, char** argv) {")
+        lines.append(f"    return native_main(argc, argv, bytecode, {'procedures' if self.procedures else '{}'}, program);")
+        lines.append("}")
+
+        return "\n".join(lines) + "\n"
+
+    def translate_code(self, name: str, start: int, end: int, depth: int, entry: int | None) -> list:
+        """
+        Translates the code between two locations into a function.
+        Values are kept in the slots of the stack from the base of the frame, so the depth of the stack at each instruction names the slots it uses.
+
+        Args:
+            name (str): Name of the function.
+            start (int): Location of the first instruction.
+            end (int): Location after the last instruction.
+            depth (int): Number of values on the stack at the start, which are the arguments of a procedure.
+            entry (int | None): Entry point of the procedure, None for the program's own code.
+
+        Returns:
+            list: Lines of the function.
+        """
+        body = []
+        targets = {}
+        loops = False
+        reachable = True
+        p = start
+
+        while p < end:
+            op = I(self.code[p])
+            operands = self.code[p + 1:p + 1 + OPERANDS.get(op, 0)]
+            after = p + 1 + len(operands)
+
+            # Code only reached by jumping takes the depth of the jumps to it. Code not reached at all is left out.
+            if p in targets:
+                depth = targets[p]
+                body.append(f"l_{p}:")
+                reachable = True
+            if not reachable:
+                p = after
+                continue
+
+            top = f"s[b + {depth - 1}]" if depth > 0 else None
+            push = f"s[b + {depth}]"
+
+            match op:
+                case I.LOAD64:
+                    body.append(f"    {push} = {operands[0] & WORD_MASK}ULL;")
+                    depth += 1
+                case I.RETURN | I.RET:
+                    body.append(f"    return {top};")
+                    reachable = False
+                case op if op in UNARY:
+                    body.append(f"    {top} = {UNARY[op]}({top});")
+                case op if op in BINARY:
+                    body.append(f"    s[b + {depth - 2}] = {BINARY[op]}(s[b + {depth - 2}], {top});")
+                    depth -= 1
+                case I.CAR | I.CDR:
+                    body.append(f"    {top} = vm.pair_field({top}, {0 if op == I.CAR else 1});")
+                case I.POP_JUMP_IF_FALSE | I.JUMP_IF_FALSE | I.JUMP_IF_TRUE:
+                    test = "is_false" if op != I.JUMP_IF_TRUE else "!is_false"
+                    body.append(f"    if ({test}({top})) goto l_{after + operands[0]};")
+                    if op == I.POP_JUMP_IF_FALSE:
+                        depth -= 1
+                    targets[after + operands[0]] = depth
+                case I.JUMP_OVER_ELSE:
+                    body.append(f"    goto l_{after + operands[0]};")
+                    targets[after + operands[0]] = depth
+                    reachable = False
+                case I.POP:
+                    depth -= 1
+                case I.PUSH_LET:
+                    body.append(f"    {push} = s[b + {depth - operands[0]}];")
+                    depth += 1
+                case I.END_LET | I.BEG:
+                    # Keep the value on top and drop those under it.
+                    drop = operands[0] if op == I.END_LET else max(operands[0], 1) - 1
+                    if drop > 0:
+                        body.append(f"    s[b + {depth - 1 - drop}] = {top};")
+                    depth -= drop
+                case I.GET_ARG:
+                    body.append(f"    {push} = s[b + {operands[0]}];")
+                    depth += 1
+                case I.GET_FREE:
+                    body.append(f"    {push} = vm.get_free({operands[0]});")
+                    depth += 1
+                case I.CONST_REF:
+                    body.append(f"    {push} = s[{operands[0]}];")
+                    depth += 1
+                case I.SYMBOL:
+                    body.append(f"    {push} = {self.symbols[operands[0]]}ULL;")
+                    depth += 1
+                case I.CONST_INIT:
+                    # Constants stay where they were computed, which is all the interpreter does.
+                    pass
+                case I.CALL:
+                    body.append(f"    s[b + {depth - 1 - operands[0]}] = vm.call(b + {depth - 1}, {operands[0]});")
+                    depth -= operands[0]
+                case I.TAIL_CALL:
+                    # A procedure calling itself starts again in place of returning to the caller to call it.
+                    body.append(f"    if (vm.tail_call(b, b + {depth - 1}, {operands[0]}) == {entry}) goto entry;")
+                    body.append("    return TAIL_CALL_VALUE;")
+                    loops = True
+                    reachable = False
+                case I.CODE:
+                    # The runtime places the procedure's record on the stack. Its code follows and becomes a function of its own.
+                    body.append(f"    vm.step({p}, b + {depth});")
+                    self.procedures.append((after, operands[1], after + operands[0]))
+                    depth += 1
+                    after += operands[0]
+                case op if op in STEPPED:
+                    body.append(f"    vm.step({p}, b + {depth});")
+                    depth += STEPPED[op]
+                    if op in [I.STR, I.VEC]:
+                        depth -= operands[0]
+                    elif op == I.SET_FREES:
+                        depth -= operands[1]
+
+            p = after
+
+        lines = [f"static uint64_t {name}(Native& vm, uint64_t b) {{", "    uint64_t* s;", "", "    s = vm.slots;"]
+        if loops:
+            lines.append("entry:")
+
+        return lines + body + ["}"]
+
+def translate_to_native(compiler: Compiler) -> str:
+    """
+    Translates a compiled program into C++.
+
+    Args:
+        compiler (Compiler): Compiler which has compiled the program.
+
+    Returns:
+        str: Source of a translation unit defining main().
+    """
+    return NativeTranslator(compiler).translate()
+
+def compile_native(input: StringIO, output: StringIO):
+    """
+    Compiles a Scheme program and writes its translation into C++ to output file.
+
+    Args:
+        input (StringIO): Scheme source code.
+        output (StringIO): Text file to write C++ to.
+    """
+    # Read until newline if interactive input, else read until EOF.
+    if input.isatty():
+        source = input.readline()
+    else:
+        source = input.read()
+    output.write(translate_to_native(compile_source(source)))
+
+if __name__ == "__main__":
+    # Parse arguments.
+    if len(sys.argv) not in ARGC:
+        print("usage: python3 native.py [ input_file.scm ] [ output_file.cpp ]")
+        sys.exit(1)
+
+    # Set input to stdin and output to stdout.
+    if len(sys.argv) == 1:
+        compile_native(sys.stdin, sys.stdout)
+    # Open files.
+    elif len(sys.argv) == 3:
+        with open(sys.argv[1], "r") as input, open(sys.argv[2], "w") as output:
+            compile_native(input, output)
+    # Check which argument was provided and open respective files.
+    elif sys.argv[1].endswith(".cpp"):
+        with open(sys.argv[1], "w") as output:
+            compile_native(sys.stdin, output)
+    elif sys.argv[1].endswith(".scm"):
+        with open(sys.argv[1], "r") as input:
+            compile_native(input, sys.stdout)
+    else:
+        print("usage: python3 native.py [ input_file.scm ] [ output_file.cpp ]")
+        sys.exit(1)
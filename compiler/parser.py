@@ -100,7 +100,6 @@ class Parser:
         self.bound_vars = []
         self.free_vars = []
         self.in_let_star_rec = False
-        self.in_quote = False
 
     def get_token(self) -> Token:
         """
@@ -413,8 +412,7 @@ class Parser:
         self.insert_func_name = True
 
         # Consume opening parenthesis.
-        if not self.in_quote:
-            self.match()
+        self.match()
 
         match t := self.get_token():
             case _ if t in [Token.ADD1, Token.SUB1, Token.INT_TO_CHAR, Token.CHAR_TO_INT, Token.IS_NULL, Token.IS_ZERO, Token.NOT, Token.IS_INT, Token.IS_BOOL, Token.CAR, Token.CDR]:
@@ -425,22 +423,6 @@ class Parser:
                 ast = self.parse_args(num_args = 3)
             case _ if t in [Token.VEC, Token.BEG, Token.PLUS, Token.MINUS, Token.TIMES, Token.LT, Token.GT, Token.LEQ, Token.GEQ, Token.EQ, Token.AND, Token.OR]:
                 ast = self.parse_args(num_args = -1)
-            case _ if t == Token.VEC_LIT and self.in_quote:
-                self.match()
-                ast = ["vector"]
-                self.insert_func_name = False
-                ast += self.parse_args(num_args = -1)
-                self.insert_func_name = True
-                if self.get_token() != Token.CP:
-                    raise RuntimeError(f"Unexpected token {self.text}")
-                self.match()
-            case _ if t == Token.STR_LIT and self.in_quote:
-                self.insert_func_name = False
-                ast = ["string"]
-                ast += self.parse_string()
-                self.insert_func_name = True
-            case _ if t == Token.OP and self.in_quote:
-                ast = self.parse_symbol()
             case Token.LET:
                 ast = self.parse_let()
             case Token.LETSTAR | Token.LETREC:
@@ -460,22 +442,19 @@ class Parser:
                 ast = [ast] + ret
             case Token.QUOTE:
                 ast = self.parse_quote()
-            case _ if (self.in_let or self.in_lambda or self.in_let_star_rec) and t == Token.ID and not self.in_quote:
+            case _ if (self.in_let or self.in_lambda or self.in_let_star_rec) and t == Token.ID:
                 ast = self.text
                 self.match()
                 self.insert_func_name = False
                 ret = self.parse_args(num_args = -1)
                 ast = [ast] +ret
-            case _ if self.in_quote:
-                ast = self.parse_symbol()
             case _:
                 raise RuntimeError(f"Unexpected token {self.text}")
 
         # Consume closing parenthesis.
-        if not self.in_quote:
-            if self.get_token() != Token.CP:
-                raise RuntimeError(f"Unexpected token {self.text}")
-            self.match()
+        if self.get_token() != Token.CP:
+            raise RuntimeError(f"Unexpected token {self.text}")
+        self.match()
 
         return ast
 
@@ -513,8 +492,6 @@ class Parser:
                     ast.append(self.parse_expr())
                 case Token.QUOTE:
                     ast.append(self.parse_quote())
-                case _ if self.in_quote:
-                    ast.append(self.parse_expr())
                 case _ if (self.in_let or self.in_lambda or self.in_let_star_rec) and self.get_token() == Token.ID:
                     ast.append(self.text)
                     self.match()
@@ -557,27 +534,6 @@ class Parser:
 
         return ast
 
-    def parse_symbol(self) -> list:
-        ast = ["symbol"]
-        expr = self.text
-        self.match()
-
-        if expr[0] == '(':
-            num_p = 0
-            while (t := self.get_token()) != Token.CP or num_p != 0:
-                if t == Token.OP:
-                    num_p += 1
-                elif t == Token.CP:
-                    num_p -= 1
-                expr += self.text
-                self.match()
-
-            expr += ')'
-            self.match()
-        
-        ast += expr
-        return ast
-
     def parse_let(self) -> list:
         """
         Parses let expression's bindings and expression.
@@ -757,24 +713,102 @@ class Parser:
         # Insert and consume "quote".
         ast = ["quote"]
         self.match()
-        self.in_quote = True
 
         # Parse argument to quote.
-        match self.get_token():
-            case Token.INT:
-                expr = self.parse_int()
-            case Token.CHAR:
-                expr = self.parse_char()
-            case Token.BOOL:
-                expr = self.parse_bool()
+        ast.append(self.parse_datum())
+
+        return ast
+
+    def parse_datum(self):
+        """
+        Parses a quoted datum into the structure it denotes.
+        Keywords are not special inside a datum, so it is read straight from the source rather than through get_token().
+
+        Returns:
+            Datum's AST: lists become cons cells ending in the empty list and identifiers become symbols.
+
+        Raises:
+            RuntimeError: Unexpected token or end of input.
+        """
+        # Consume whitespace.
+        self.skip_whitespace()
+
+        match self.source[self.pos:]:
+            case _ if self.pos == self.length:
+                raise RuntimeError("Unexpected end of input.")
+            case _ if t := re.match(r"\(", self.source[self.pos:]):
+                self.text = t.group(0)
+                self.match()
+                return self.parse_list()
+            case _ if t := re.match(r"#\(", self.source[self.pos:]):
+                self.text = t.group(0)
+                self.match()
+                ast = ["vector"]
+                self.skip_whitespace()
+                while not re.match(r"\)", self.source[self.pos:]):
+                    ast.append(self.parse_datum())
+                    self.skip_whitespace()
+                # Consume closing parenthesis.
+                self.pos += 1
+                return ast
+            case _ if re.match(r"\"", self.source[self.pos:]):
+                self.insert_func_name = False
+                ast = ["string"] + self.parse_string()
+                self.insert_func_name = True
+                return ast
+            case _ if t := re.match(r"#\\[^`]", self.source[self.pos:]):
+                self.text = t.group(0)
+                return self.parse_char()
+            case _ if t := re.match(r"#[tfTF]", self.source[self.pos:]):
+                self.text = t.group(0)
+                return self.parse_bool()
+            case _ if t := re.match(r"[0-9]+(?![^ \n\t\r()])", self.source[self.pos:]):
+                self.text = t.group(0)
+                return self.parse_int()
+            case _ if t := re.match(r"'", self.source[self.pos:]):
+                self.text = t.group(0)
+                self.match()
+                return ["cons", ["symbol", *"quote"], ["cons", self.parse_datum(), []]]
+            case _ if t := re.match(r"[^ \n\t\r()'\"]+", self.source[self.pos:]):
+                self.text = t.group(0)
+                self.match()
+                return ["symbol", *self.text]
             case _:
-                expr = self.parse_expr()
+                raise RuntimeError(f"Unexpected token {self.source[self.pos]}")
 
-        ast.append(expr)
+    def parse_list(self) -> list:
+        """
+        Parses the elements of a quoted list after its opening parenthesis.
+
+        Returns:
+            list: Nested cons cells holding the elements.
 
-        self.in_quote = False
+        Raises:
+            RuntimeError: Unexpected token or end of input.
+        """
+        elements = []
+        tail = []
 
-        return ast
+        self.skip_whitespace()
+        while not re.match(r"\)", self.source[self.pos:]):
+            # A dot before the last datum makes it the tail of the list.
+            if len(elements) != 0 and re.match(r"\.(?![^ \n\t\r()])", self.source[self.pos:]):
+                self.pos += 1
+                tail = self.parse_datum()
+                self.skip_whitespace()
+                if not re.match(r"\)", self.source[self.pos:]):
+                    raise RuntimeError("Unexpected token after dotted tail.")
+                break
+            elements.append(self.parse_datum())
+            self.skip_whitespace()
+
+        # Consume closing parenthesis.
+        self.pos += 1
+
+        for element in reversed(elements):
+            tail = ["cons", element, tail]
+
+        return tail
 
 def get_closure_form(lambda_body, cur_count):
     return ["closure", f"f{cur_count}"] + lambda_body
@@ -8,28 +8,42 @@
  */
 
 #include <interpreter.h>
+#include <bytecode.h>
 #include <utilities.h>
-#include <vector>
+#include <stdexcept>
 
 int main(int argc, char** argv) {
-    std::ifstream ifile;
-    std::istream* input;
+    const char* infile;
     std::ofstream ofile;
     std::ostream* output;
-    std::vector<uint8_t> bytes;
-    char c;
+    std::ostream* stats;
+    Bytecode bytecode;
     Interpreter interpreter;
-    uint64_t val;
+    uint64_t val, heap_words, nursery_words, gc_threads, heap_limit, stack_words, jit_threshold;
+    bool gc_stats, stack_engine, jit;
 
     // Parse arguments and set input and output sources.
-    if (parse_args(argc, argv, ifile, input, ofile, output) != 0) return 1;
+    heap_words = DEFAULT_HEAP_WORDS;
+    nursery_words = DEFAULT_NURSERY_WORDS;
+    gc_threads = DEFAULT_GC_THREADS;
+    heap_limit = DEFAULT_HEAP_LIMIT;
+    stack_words = DEFAULT_STACK_WORDS;
+    gc_stats = false;
+    stack_engine = false;
+    jit = false;
+    jit_threshold = DEFAULT_JIT_THRESHOLD;
+    infile = nullptr;
+    if (parse_args(argc, argv, infile, ofile, output, heap_words, nursery_words, gc_threads, heap_limit, stack_words, gc_stats, stack_engine, jit, jit_threshold) != 0) return 1;
 
-    // Read bytes into vector.
-    while ((c = input->get()) != EOF)
-        bytes.push_back(static_cast<uint8_t>(c));
-
-    // Construct interpreter.
-    interpreter = Interpreter(bytes);
+    // Map or read the program, which is run from where it is loaded, and construct interpreter, which rejects invalid bytecode.
+    try {
+        bytecode = Bytecode(infile);
+        interpreter = Interpreter(bytecode.bytes(), heap_words, nursery_words, gc_threads, heap_limit, stack_words, !stack_engine, jit ? jit_threshold : 0);
+    }
+    catch (const std::runtime_error& error) {
+        std::cerr << error.what();
+        return 1;
+    }
 
     // Interpret program.
     val = interpreter.interpret();
@@ -38,8 +52,13 @@ int main(int argc, char** argv) {
     interpreter.print_val(val, output);
     *output << std::endl;
 
+    // Report collection pauses apart from the program's output.
+    if (gc_stats) {
+        stats = &std::cerr;
+        interpreter.print_gc_stats(stats);
+    }
+
     // Clean up.
-    if (ifile.is_open()) ifile.close();
     if (ofile.is_open()) ofile.close();
 
     return 0;
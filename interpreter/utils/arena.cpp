@@ -0,0 +1,103 @@
+/*
+ * arena.cpp - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ *
+ * Implementation notes:
+ * - The whole region is mapped inaccessible at construction. Pages are made readable and writable as the arena grows and handed back as it shrinks.
+ *
+ */
+
+#include "arena.h"
+#include <algorithm>
+#include <stdexcept>
+#include <utility>
+#include <sys/mman.h>
+#include <unistd.h>
+
+// Round a number of words up to a whole number of pages.
+static uint64_t page_words(uint64_t words) {
+    uint64_t page;
+
+    page = sysconf(_SC_PAGESIZE) / sizeof(uint64_t);
+
+    return (words + page - 1) / page * page;
+}
+
+// Construct arena without any address space.
+Arena::Arena(void) {
+    base = nullptr;
+    used = 0;
+    committed = 0;
+    limit = 0;
+}
+
+// Construct arena reserving address space for the given number of words.
+Arena::Arena(uint64_t limit) {
+    void* region;
+
+    this->limit = page_words(limit);
+    used = 0;
+    committed = 0;
+
+    region = mmap(nullptr, this->limit*sizeof(uint64_t), PROT_NONE, MAP_PRIVATE | MAP_ANONYMOUS | MAP_NORESERVE, -1, 0);
+    if (region == MAP_FAILED) throw std::runtime_error("Failed to reserve heap.\n");
+
+    base = static_cast<uint64_t*>(region);
+}
+
+// Release address space.
+Arena::~Arena(void) {
+    if (base != nullptr) munmap(base, limit*sizeof(uint64_t));
+}
+
+// Take over another arena's address space.
+Arena::Arena(Arena&& other) noexcept {
+    base = std::exchange(other.base, nullptr);
+    used = std::exchange(other.used, 0);
+    committed = std::exchange(other.committed, 0);
+    limit = std::exchange(other.limit, 0);
+}
+
+// Release address space and take over another arena's.
+Arena& Arena::operator=(Arena&& other) noexcept {
+    if (this != &other) {
+        if (base != nullptr) munmap(base, limit*sizeof(uint64_t));
+        base = std::exchange(other.base, nullptr);
+        used = std::exchange(other.used, 0);
+        committed = std::exchange(other.committed, 0);
+        limit = std::exchange(other.limit, 0);
+    }
+
+    return *this;
+}
+
+// Make the given number of words usable, keeping words below it where they are.
+void Arena::resize(uint64_t words) {
+    uint64_t pages;
+
+    pages = page_words(words);
+    if (pages > limit) throw std::runtime_error("Heap limit exceeded.\n");
+
+    // Map more pages in, which start out zeroed.
+    if (pages > committed) {
+        if (mprotect(base + committed, (pages - committed)*sizeof(uint64_t), PROT_READ | PROT_WRITE) != 0)
+            throw std::runtime_error("Failed to grow heap.\n");
+    }
+    // Hand pages no longer needed back to the system.
+    else if (pages < committed) {
+        madvise(base + pages, (committed - pages)*sizeof(uint64_t), MADV_DONTNEED);
+        mprotect(base + pages, (committed - pages)*sizeof(uint64_t), PROT_NONE);
+    }
+
+    committed = pages;
+    used = words;
+}
+
+// Replace contents with a copy of the given words.
+void Arena::assign(const uint64_t* first, const uint64_t* last) {
+    resize(last - first);
+    std::copy(first, last, base);
+}
@@ -0,0 +1,52 @@
+/*
+ * arena.h - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ * - Region of words whose address space is reserved up front, so it grows and shrinks without ever moving what it holds.
+ *
+ */
+
+#pragma once
+#include <cstdint>
+
+class Arena {
+public:
+    // Construct arena without any address space.
+    Arena(void);
+
+    // Construct arena reserving address space for the given number of words, none of which are usable yet.
+    Arena(uint64_t limit);
+
+    // Release address space.
+    ~Arena(void);
+
+    // Arenas own their address space, so they can be moved but not copied.
+    Arena(const Arena&) = delete;
+    Arena& operator=(const Arena&) = delete;
+    Arena(Arena&& other) noexcept;
+    Arena& operator=(Arena&& other) noexcept;
+
+    // Get word at given index.
+    uint64_t& operator[](uint64_t ind) { return base[ind]; }
+
+    // Get pointer to first word.
+    uint64_t* begin(void) { return base; }
+    uint64_t* data(void) { return base; }
+
+    // Get number of usable words.
+    uint64_t size(void) const { return used; }
+
+    // Make the given number of words usable, keeping words below it where they are.
+    void resize(uint64_t words);
+
+    // Replace contents with a copy of the given words.
+    void assign(const uint64_t* first, const uint64_t* last);
+
+private:
+    uint64_t* base;
+    uint64_t used;
+    uint64_t committed;
+    uint64_t limit;
+};
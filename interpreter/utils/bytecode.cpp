@@ -0,0 +1,105 @@
+/*
+ * bytecode.cpp - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ *
+ * Implementation notes:
+ * - Mapped files are never written to, so their pages are read straight from the page cache as the program first touches them.
+ *
+ */
+
+#include "bytecode.h"
+#include <stdexcept>
+#include <utility>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+// Bytes asked for by each read from a pipe.
+#define READ_BLOCK (1ULL << 16)
+
+// Construct bytecode without any bytes.
+Bytecode::Bytecode(void) {
+    base = nullptr;
+    length = 0;
+    mapped = false;
+}
+
+// Load the program in the file at the given path, or on stdin if there is none.
+Bytecode::Bytecode(const char* path) {
+    struct stat info;
+    void* region;
+    uint8_t* block;
+    ssize_t got;
+    int fd;
+
+    base = nullptr;
+    length = 0;
+    mapped = false;
+
+    fd = path == nullptr ? STDIN_FILENO : open(path, O_RDONLY);
+    if (fd < 0) throw std::runtime_error("Failed to open file.\n");
+
+    // Map regular files, whether named or redirected to stdin.
+    if (fstat(fd, &info) == 0 && S_ISREG(info.st_mode)) {
+        length = info.st_size;
+        if (length > 0) {
+            region = mmap(nullptr, length, PROT_READ, MAP_PRIVATE, fd, 0);
+            if (region == MAP_FAILED) {
+                if (path != nullptr) close(fd);
+                throw std::runtime_error("Failed to map file.\n");
+            }
+            base = static_cast<const uint8_t*>(region);
+            mapped = true;
+        }
+        if (path != nullptr) close(fd);
+        return;
+    }
+
+    // Otherwise read blocks straight into an arena, which never moves what it already holds as it grows.
+    buffer = Arena(MAX_BYTECODE_WORDS);
+    while (true) {
+        buffer.resize((length + READ_BLOCK + sizeof(uint64_t) - 1) / sizeof(uint64_t));
+        block = reinterpret_cast<uint8_t*>(buffer.data()) + length;
+        got = read(fd, block, READ_BLOCK);
+        if (got < 0) {
+            if (path != nullptr) close(fd);
+            throw std::runtime_error("Failed to read bytecode.\n");
+        }
+        if (got == 0) break;
+        length += got;
+    }
+    buffer.resize((length + sizeof(uint64_t) - 1) / sizeof(uint64_t));
+    base = reinterpret_cast<const uint8_t*>(buffer.data());
+
+    if (path != nullptr) close(fd);
+}
+
+// Unmap file.
+Bytecode::~Bytecode(void) {
+    if (mapped) munmap(const_cast<uint8_t*>(base), length);
+}
+
+// Take over another program's bytes.
+Bytecode::Bytecode(Bytecode&& other) noexcept {
+    base = std::exchange(other.base, nullptr);
+    length = std::exchange(other.length, 0);
+    mapped = std::exchange(other.mapped, false);
+    buffer = std::move(other.buffer);
+}
+
+// Unmap file and take over another program's bytes.
+Bytecode& Bytecode::operator=(Bytecode&& other) noexcept {
+    if (this != &other) {
+        if (mapped) munmap(const_cast<uint8_t*>(base), length);
+        base = std::exchange(other.base, nullptr);
+        length = std::exchange(other.length, 0);
+        mapped = std::exchange(other.mapped, false);
+        buffer = std::move(other.buffer);
+    }
+
+    return *this;
+}
@@ -0,0 +1,45 @@
+/*
+ * bytecode.h - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ * - Bytes of a compiled program, held where the interpreter can run its code from without copying it.
+ *
+ */
+
+#pragma once
+#include "arena.h"
+#include <cstdint>
+#include <span>
+
+// Words of address space reserved for a program read from a pipe, which it can never outgrow.
+#define MAX_BYTECODE_WORDS (1ULL << 32)
+
+class Bytecode {
+public:
+    // Construct bytecode without any bytes.
+    Bytecode(void);
+
+    // Load the program in the file at the given path, or on stdin if there is none.
+    // Regular files are mapped into memory. Anything else is read in blocks into memory that starts on a page boundary.
+    Bytecode(const char* path);
+
+    // Unmap file.
+    ~Bytecode(void);
+
+    // Bytecode owns its mapping, so it can be moved but not copied.
+    Bytecode(const Bytecode&) = delete;
+    Bytecode& operator=(const Bytecode&) = delete;
+    Bytecode(Bytecode&& other) noexcept;
+    Bytecode& operator=(Bytecode&& other) noexcept;
+
+    // Get bytes of program.
+    std::span<const uint8_t> bytes(void) const { return {base, length}; }
+
+private:
+    const uint8_t* base;
+    uint64_t length;
+    bool mapped;
+    Arena buffer;
+};
@@ -11,41 +11,73 @@
  */
 
 #include "interpreter.h"
+#include "values.h"
+#include "utilities.h"
+#include <algorithm>
 #include <stdexcept>
 #include <span>
+#include <bit>
+#include <cstring>
 #include <iostream>
 #include <format>
+#include <atomic>
+#include <chrono>
+#include <deque>
+#include <map>
+#include <mutex>
+#include <thread>
 
 #define BPB 8
 #define BPI 8
-#define FIXNUM_SHIFT 2
-#define FIXNUM_MASK 3
-#define FIXNUM_TAG 0
-#define CHAR_SHIFT 8
-#define CHAR_MASK 255
-#define CHAR_TAG 15
-#define BOOL_SHIFT 7
-#define BOOL_MASK 127
-#define BOOL_TAG 31
-#define EMPTY_LIST_MASK 255
-#define EMPTY_LIST_TAG 47
-#define PAIR_SHIFT 3
-#define PAIR_MASK 7
-#define PAIR_TAG 1
-#define STR_SHIFT 3
-#define STR_MASK 7
-#define STR_TAG 3
-#define VEC_SHIFT 3
-#define VEC_MASK 7
-#define VEC_TAG 2
-#define CLOSURE_SHIFT 3
-#define CLOSURE_MASK 7
-#define CLOSURE_TAG 6
-#define SYMBOL_SHIFT 3
-#define SYMBOL_TAG 5
-#define SYMBOL_MASK 7
-
-#define CLOSURE_LEN 2
+// Strings hold one byte per character, packed into words after the length.
+#define STR_WORDS(len) (((len) + BPI - 1) / BPI)
+
+// Every object allocated at run time is preceded by a header word holding its size in words and its tag.
+// Once an object has been copied by the collector its header holds its new location instead.
+#define OBJECT_SHIFT 8
+#define OBJECT_TAG_MASK 7
+#define FORWARD_TAG 0
+// Set in the header of an old object while it is in the remembered set.
+#define REMEMBERED_BIT 8
+// Header of an object some thread of a parallel collection is copying.
+#define BUSY_TAG 4
+// Header of unused words left at the end of a thread's chunk by a parallel collection.
+#define FILLER_TAG 7
+#ifdef COMPRESSED_REFS
+// Largest heap whose tagged pointers fit in 32 bits.
+#define COMPRESSED_HEAP_LIMIT (1ULL << 28)
+#endif
+// The collector lays chains of pairs out as runs of cdr-coded cells: the car of each cell is followed by the car of the next,
+// and only the last cell keeps its cdr. A run of n cells is one object of n + 1 words with a pair header, and a bit per heap word
+// is set for every cell whose cdr is the cell after it. Runs are kept short so the start of one is found quickly from any cell.
+#define RUN_CELLS 32
+// Words each thread of a parallel collection takes from the spare heap at a time.
+// Objects over an eighth of this are copied straight to the spare heap so that at most an eighth of a chunk goes unused.
+#define CHUNK_WORDS 4096
+
+// Layout of bytecode container.
+#define BYTECODE_MAGIC 0x4342454D45484353
+#define FORMAT_VERSION 2
+#define HEADER_LEN 7
+#define SECTION_ENTRY_LEN 3
+#define PROCEDURE_ENTRY_LEN 4
+// Smallest old space and nursery the heap may be given.
+#define MIN_HEAP_WORDS 1024
+#define MIN_NURSERY_WORDS 256
+// Stack depth assumed for procedures in bytecode written without a header.
+#define DEFAULT_FRAME_DEPTH 1024
+// C stack given to compiled code for each word of the operand stack, so that the operand stack overflows first, and how much more it is given for whatever runs once compiled code stops calling.
+#define JIT_STACK_BYTES_PER_WORD 256
+#define JIT_STACK_RESERVE 65536
+
+// enumerations of container sections.
+enum class Section : uint64_t {
+    CODE = 1,
+    CONSTANTS = 2,
+    PROCEDURES = 3,
+    DEBUG = 4,
+    SYMBOLS = 5
+};
 
 // enumerations of opcodes.
 enum class OpCode : uint64_t {
@@ -97,11 +129,74 @@ enum class OpCode : uint64_t {
     SYMBOL = 46,
     JUMP_IF_FALSE = 47,
     POP = 48,
-    JUMP_IF_TRUE = 49
+    JUMP_IF_TRUE = 49,
+    VEC_REF_UNCHECKED = 50,
+    VEC_SET_UNCHECKED = 51,
+    STR_REF_UNCHECKED = 52,
+    STR_SET_UNCHECKED = 53,
+    CLONE = 54
+};
+
+// Opcodes of the register form a program is translated into when loaded.
+// Instructions that allocate, call or return keep their stack form opcode and are preceded by how far to move the stack pointer first.
+enum class RegOp : uint64_t {
+    MOVE = 64,
+    ADD1 = 65,
+    SUB1 = 66,
+    INT_TO_CHAR = 67,
+    CHAR_TO_INT = 68,
+    IS_NULL = 69,
+    IS_ZERO = 70,
+    NOT = 71,
+    IS_INT = 72,
+    IS_BOOL = 73,
+    PLUS = 74,
+    TIMES = 75,
+    MINUS = 76,
+    LT = 77,
+    GT = 78,
+    LEQ = 79,
+    GEQ = 80,
+    EQ = 81,
+    VEC_REF = 82,
+    STR_REF = 83,
+    VEC_REF_UNCHECKED = 84,
+    STR_REF_UNCHECKED = 85,
+    CAR = 86,
+    CDR = 87,
+    GET_FREE = 88,
+    BRANCH_IF_FALSE = 89,
+    BRANCH_IF_TRUE = 90,
+    JUMP = 91,
+    RET = 92,
+    RETURN = 93
 };
 
-// Build insturction out of 4 bytes.
-static uint64_t word_from_bytes(std::span<uint8_t> slice) {
+// Opcode handlers are inlined into the dispatch loop of interpret.
+#define HANDLER [[gnu::always_inline]] inline
+
+// One more than the largest opcode.
+#define NUM_OPCODES (static_cast<uint64_t>(OpCode::CLONE) + 1)
+
+// One more than the largest opcode of the register form.
+#define NUM_REG_OPCODES (static_cast<uint64_t>(RegOp::RETURN) + 1)
+
+// Operands of register form instructions are tagged with where the value lives.
+// Slots are counted from the stack pointer, arguments from the base pointer and stack operands from the bottom of the stack.
+#define OPERAND_SHIFT 2
+#define OPERAND_MASK 3
+#define SLOT_OPERAND 0
+#define ARG_OPERAND 1
+#define STACK_OPERAND 2
+#define IMM_OPERAND 3
+
+// Dispatch by jumping through a table of labels where the compiler can take their addresses, unless told to switch on each opcode.
+#if defined(__GNUC__) && !defined(SWITCH_DISPATCH)
+#define THREADED_DISPATCH
+#endif
+
+// Build insturction out of 8 little endian bytes.
+static uint64_t word_from_bytes(std::span<const uint8_t> slice) {
     uint64_t val;
     int i;
 
@@ -109,250 +204,2200 @@ static uint64_t word_from_bytes(std::span<uint8_t> slice) {
 
     val = 0;
     for (i = 0; i < BPI; i++)
-        val |= (slice[i] << i*BPB);
+        val |= (static_cast<uint64_t>(slice[i]) << i*BPB);
 
     return val;
 }
 
+// Read word at given index of byte stream.
+static uint64_t word_at(std::span<const uint8_t> bytes, uint64_t ind) {
+    if ((ind + 1)*BPI > bytes.size()) throw std::runtime_error("Truncated bytecode.\n");
+
+    return word_from_bytes(bytes.subspan(ind*BPI, BPI));
+}
+
 // Default constructor.
 Interpreter::Interpreter(void) {
     // Initialize program counter and heap pointer.
     pc = 0;
     heap_ptr = 0;
+    pool_end = 0;
+    copy_ptr = 0;
+    old_ptr = 0;
+    nursery_start = 0;
+    gc_threads = 1;
+    peak_live = 0;
+    stack_ptr = 0;
+    base_ptr = 0;
+    current_closure = 0;
+    next_frame = 0;
+    register_form = false;
+    return_to_compiled = 0;
+    jit_stack_floor = 0;
 }
 
 // Construct interpreter based on a byte stream.
-Interpreter::Interpreter(std::vector<uint8_t>& bytes) {
-    int i;
-    uint64_t word;
-
-    // Add instructions to vector contsining code.
-    for (i = 0; i < static_cast<int>(bytes.size()); i+= BPI) {
-        word = word_from_bytes(std::span<uint8_t>(bytes.begin() + i, BPI));
-        code.push_back(word);
-    }
+Interpreter::Interpreter(std::span<const uint8_t> bytes, uint64_t heap_words, uint64_t nursery_words, uint64_t threads, uint64_t heap_limit, uint64_t stack_words, bool registers, uint64_t jit_threshold) {
+    std::span<const uint8_t> code_bytes;
+    uint64_t i;
 
     // Initialize "registers".
     pc = 0;
     heap_ptr = 0;
+    pool_end = 0;
+    copy_ptr = 0;
+    old_ptr = 0;
+    nursery_start = 0;
+    gc_threads = 1;
+    peak_live = 0;
     stack_ptr = 0;
     base_ptr = 0;
+    current_closure = 0;
+    next_frame = 0;
+    register_form = false;
+    return_to_compiled = 0;
+    jit_stack_floor = 0;
+
+    // Reserve address space for both halves of the heap up front so that growing them never moves objects.
+#ifdef COMPRESSED_REFS
+    heap_limit = std::min(heap_limit, (uint64_t)COMPRESSED_HEAP_LIMIT);
+#endif
+    heap = Arena(heap_limit);
+    spare = Arena(heap_limit);
+    cdr_codes = Arena(heap_limit / 64 + 1);
+    cdr_codes.resize(heap_limit / 64 + 1);
+    spare_codes = Arena(heap_limit / 64 + 1);
+    spare_codes.resize(heap_limit / 64 + 1);
+
+    // Find code within container.
+    code_bytes = load_container(bytes, stack_words);
+
+    // Run the code where it was loaded if its words can be read in place, which they can once aligned on a little endian machine.
+    if (std::endian::native == std::endian::little && reinterpret_cast<uintptr_t>(code_bytes.data()) % alignof(uint64_t) == 0) {
+        code = std::span<const uint64_t>(reinterpret_cast<const uint64_t*>(code_bytes.data()), code_bytes.size() / BPI);
+    }
+    else {
+        for (i = 0; i + BPI <= code_bytes.size(); i += BPI)
+            owned_code.push_back(word_from_bytes(code_bytes.subspan(i, BPI)));
+        code = owned_code;
+    }
+
+    // Reject invalid bytecode once and for all, so that instructions run without checking their operands.
+    verify();
+
+    // Run the program in register form unless told to keep the stack form.
+    if (registers) register_form = translate();
+
+    // Only the register form is compiled into machine code.
+    if (register_form && jit_threshold != 0) jit = Jit(code.size(), jit_threshold);
+
+    // The old space and then the nursery follow the constant pool, which is never collected.
+    heap_words = std::max(heap_words, (uint64_t)MIN_HEAP_WORDS);
+    nursery_words = std::max(nursery_words, (uint64_t)MIN_NURSERY_WORDS);
+    heap.resize(pool_end + heap_words + nursery_words);
+    old_ptr = pool_end;
+    nursery_start = pool_end + heap_words;
+    heap_ptr = nursery_start;
+
+    // Full collections copy into a spare heap which also starts with the constant pool.
+    spare.assign(heap.begin(), heap.begin() + pool_end);
+    gc_threads = std::max(threads, (uint64_t)1);
+}
+
+// Read the container written by the compiler and return the bytes of its code section.
+// The stack is allocated here once and for all, holding the given number of words or as many as the entry code needs if that is more.
+std::span<const uint8_t> Interpreter::load_container(std::span<const uint8_t> bytes, uint64_t stack_words) {
+    std::span<const uint8_t> all(bytes), code_bytes;
+    uint64_t num_sections, kind, offset, len, entry, i, j;
+    bool found_code;
+
+    // Bytecode without a container starts straight with an opcode.
+    if (bytes.size() < HEADER_LEN*BPI || word_at(all, 0) != BYTECODE_MAGIC) {
+        stack = Arena(stack_words);
+        stack.resize(stack_words);
+        return all;
+    }
+
+    if (word_at(all, 1) != FORMAT_VERSION) throw std::runtime_error("Unsupported bytecode format version.\n");
+
+    // Allocate the stack and start at the entry point.
+    stack_words = std::max(stack_words, word_at(all, 4));
+    stack = Arena(stack_words);
+    stack.resize(stack_words);
+    pc = word_at(all, 5);
+
+    // Walk the section table, skipping sections that are not needed to run the program.
+    num_sections = word_at(all, 6);
+    found_code = false;
+    for (i = 0; i < num_sections; i++) {
+        entry = HEADER_LEN + i*SECTION_ENTRY_LEN;
+        kind = word_at(all, entry);
+        offset = word_at(all, entry + 1);
+        len = word_at(all, entry + 2);
+
+        // Ensure section lies within the container and is word aligned.
+        if (offset % BPI != 0 || offset > bytes.size() || len > (bytes.size() - offset) / BPI)
+            throw std::runtime_error("Invalid section.\n");
+
+        switch (static_cast<Section>(kind)) {
+            case Section::CODE:
+                code_bytes = all.subspan(offset, len*BPI);
+                found_code = true;
+                break;
+            case Section::CONSTANTS:
+                // Place the image of the quoted constants at the base of the heap, copying it whole where words are stored as they are written.
+                heap.resize(len);
+                if (std::endian::native == std::endian::little) {
+                    std::memcpy(heap.data(), all.data() + offset, len*BPI);
+                }
+                else {
+                    for (j = 0; j < len; j++)
+                        heap[j] = word_at(all, offset / BPI + j);
+                }
+                heap_ptr = len;
+                pool_end = len;
+                break;
+            case Section::PROCEDURES:
+                // Keep the stack depth needed by each procedure.
+                for (j = 0; j + PROCEDURE_ENTRY_LEN <= len; j += PROCEDURE_ENTRY_LEN)
+                    frame_depths.push_back(word_at(all, offset / BPI + j + 3));
+                break;
+            case Section::SYMBOLS:
+                // Keep the interned object of each symbol in the constant pool.
+                for (j = 0; j < len; j++)
+                    symbols.push_back(word_at(all, offset / BPI + j));
+                break;
+            default:
+                break;
+        }
+    }
+
+    if (!found_code) throw std::runtime_error("Missing code section.\n");
+
+    // Interned symbols must live in the constant pool.
+    for (j = 0; j < symbols.size(); j++)
+        if ((symbols[j] & SYMBOL_MASK) != SYMBOL_TAG || (symbols[j] >> SYMBOL_SHIFT) >= pool_end)
+            throw std::runtime_error("Invalid symbol table.\n");
+
+    return code_bytes;
+}
+
+// Check the stack has room for a frame of the given depth from the base pointer. Values within the frame are pushed without checking.
+HANDLER void Interpreter::check_frame(uint64_t depth) {
+    if (base_ptr + depth > stack.size()) throw std::runtime_error("Stack overflow.\n");
+}
+
+// Check whether a value refers to an object on the heap.
+static bool is_pointer(uint64_t val) {
+    switch (val & OBJECT_TAG_MASK) {
+        case PAIR_TAG:
+        case VEC_TAG:
+        case STR_TAG:
+        case SYMBOL_TAG:
+        case CLOSURE_TAG:
+            return true;
+        default:
+            return false;
+    }
+}
+
+// Find how many words at the start of an object are not values.
+static uint64_t first_value(uint64_t header) {
+    switch (header & OBJECT_TAG_MASK) {
+        case PAIR_TAG:
+            return 0;
+        case VEC_TAG:
+            return 1;
+        case CLOSURE_TAG:
+            return CLOSURE_LEN;
+        default:
+            // Lengths and characters are not values.
+            return header >> OBJECT_SHIFT;
+    }
+}
+
+// Check whether the cell at a heap location is cdr-coded to the cell after it.
+static bool cdr_next(Arena& codes, uint64_t loc) {
+    return (codes[loc / 64] >> (loc % 64)) & 1;
+}
+
+// Find the first cell of the run of cdr-coded cells holding the pair at a heap location.
+static uint64_t run_start(Arena& codes, uint64_t loc) {
+    while (cdr_next(codes, loc - 1)) loc--;
+
+    return loc;
+}
+
+#ifdef COMPRESSED_REFS
+// Check whether a value survives being cut down to 32 bits and sign extended back.
+static bool fits_compressed(uint64_t val) {
+    return static_cast<int64_t>(static_cast<int32_t>(val)) == static_cast<int64_t>(val);
+}
+
+// Pack the car and cdr of a pair into a single word.
+static uint64_t pack_pair(uint64_t car, uint64_t cdr) {
+    return static_cast<uint32_t>(car) | (static_cast<uint64_t>(static_cast<uint32_t>(cdr)) << 32);
+}
+
+// Get one half of a packed pair back as a value.
+static uint64_t unpack_half(uint64_t word, uint64_t field) {
+    return static_cast<uint64_t>(static_cast<int64_t>(static_cast<int32_t>(word >> 32*field)));
+}
+#endif
+
+// A thread taking part in a parallel full collection.
+struct GCWorker {
+    // Locations in the spare heap of copied objects not yet scanned. Other threads steal from the front.
+    std::deque<uint64_t> grey;
+    std::mutex lock;
+
+    // Unused part of the chunk of the spare heap the thread copies into.
+    uint64_t chunk_ptr = 0;
+    uint64_t chunk_end = 0;
+};
+
+// State shared by the threads of a parallel full collection.
+struct ParallelCollection {
+    std::vector<GCWorker> workers;
+    std::atomic<uint64_t> top;
+    std::atomic<uint64_t> idle;
+
+    ParallelCollection(uint64_t num_threads, uint64_t start) : workers(num_threads), top(start), idle(0) {}
+};
+
+// Reserve room for an object with the given tag and size in words, collecting garbage if the heap is full.
+// Returns the heap location of the object's first word; the caller must fill in every word.
+uint64_t Interpreter::allocate(uint64_t tag, uint64_t words) {
+    uint64_t loc;
+
+    // Objects too large for the nursery go straight to the old space and are remembered until they have been filled in.
+    if (4*(1 + words) > heap.size() - nursery_start) {
+        if (old_ptr + 1 + words > nursery_start) collect(1 + words);
+
+        heap[old_ptr] = (words << OBJECT_SHIFT) | REMEMBERED_BIT | tag;
+        loc = old_ptr + 1;
+        remembered.push_back(loc);
+        old_ptr += 1 + words;
+
+        return loc;
+    }
+
+    if (heap_ptr + 1 + words > heap.size()) collect_nursery();
+
+    // Write header in front of the object.
+    heap[heap_ptr] = (words << OBJECT_SHIFT) | tag;
+    loc = heap_ptr + 1;
+
+    // Bump heap pointer.
+    heap_ptr += 1 + words;
+
+    return loc;
+}
+
+// Remember an object in the old space once a value referring to the nursery has been stored into it.
+void Interpreter::write_barrier(uint64_t loc, uint64_t val) {
+    if (loc < pool_end || loc >= nursery_start || (heap[loc - 1] & REMEMBERED_BIT)) return;
+
+    if (is_pointer(val) && (val >> PAIR_SHIFT) >= nursery_start) {
+        heap[loc - 1] |= REMEMBERED_BIT;
+        remembered.push_back(loc);
+    }
+}
+
+// Copy the object a value refers to into the given space, unless already copied, and return the value updated to its new location.
+// Only objects at or above the given heap location are moved.
+uint64_t Interpreter::forward(uint64_t val, Arena& to, uint64_t from) {
+    uint64_t loc, start, header, words, i;
+    Arena& to_codes = &to == &heap ? cdr_codes : spare_codes;
+
+    // Immediates and objects outside the collected region stay where they are.
+    if (!is_pointer(val) || (val >> PAIR_SHIFT) < from) return val;
+
+    // A pair may be a cell part way through a run, which is copied as a whole.
+    loc = val >> PAIR_SHIFT;
+    start = (val & OBJECT_TAG_MASK) == PAIR_TAG ? run_start(cdr_codes, loc) : loc;
+    header = heap[start - 1];
+
+    if ((header & OBJECT_TAG_MASK) != FORWARD_TAG) {
+        words = header >> OBJECT_SHIFT;
+
+        // Lay the chain of pairs starting at a plain pair out as a run.
+        if (is_plain_pair(val, from)) {
+            copy_run(loc, to, to_codes, from);
+        }
+        // Copy object along with its header and leave its new location behind.
+        else {
+            std::copy_n(heap.begin() + start - 1, 1 + words, to.begin() + copy_ptr);
+            to[copy_ptr] &= ~(uint64_t)REMEMBERED_BIT;
+            if ((header & OBJECT_TAG_MASK) == PAIR_TAG)
+                for (i = 0; i + 2 < words; i++)
+                    to_codes[(copy_ptr + 1 + i) / 64] |= 1ULL << ((copy_ptr + 1 + i) % 64);
+            heap[start - 1] = ((copy_ptr + 1) << OBJECT_SHIFT) | FORWARD_TAG;
+            copy_ptr += 1 + words;
+        }
+        header = heap[start - 1];
+    }
+
+    return (((header >> OBJECT_SHIFT) + loc - start) << PAIR_SHIFT) | (val & OBJECT_TAG_MASK);
+}
+
+// Check whether a value refers to a pair at or above the given heap location that is not part of a run and has not been copied.
+bool Interpreter::is_plain_pair(uint64_t val, uint64_t from) {
+    uint64_t loc;
+
+    if ((val & PAIR_MASK) != PAIR_TAG || (val >> PAIR_SHIFT) < from) return false;
+
+    loc = val >> PAIR_SHIFT;
+
+    if (cdr_next(cdr_codes, loc - 1)) return false;
+
+#ifdef COMPRESSED_REFS
+    // Packed pairs are unpacked into their cells.
+    if (heap[loc - 1] == ((1 << OBJECT_SHIFT) | PAIR_TAG)) return true;
+#endif
+
+    return heap[loc - 1] == ((2 << OBJECT_SHIFT) | PAIR_TAG);
+}
+
+// Copy the chain of plain pairs linked through the cdr of the pair at a heap location into the given space as one run of cells.
+// Each pair is left forwarded to its own cell, so values referring to the middle of the chain are updated too.
+void Interpreter::copy_run(uint64_t loc, Arena& to, Arena& to_codes, uint64_t from) {
+    uint64_t first, cells, cdr;
+
+    first = copy_ptr + 1;
+    cells = 0;
+
+    while (true) {
+        to[first + cells] = pair_field(loc, 0);
+        cdr = pair_field(loc, 1);
+        heap[loc - 1] = ((first + cells) << OBJECT_SHIFT) | FORWARD_TAG;
+        cells++;
+
+        if (cells == RUN_CELLS || !is_plain_pair(cdr, from)) break;
+
+        // The cdr of this cell is the cell after it.
+        to_codes[(first + cells - 1) / 64] |= 1ULL << ((first + cells - 1) % 64);
+        loc = cdr >> PAIR_SHIFT;
+    }
+
+    // Only the last cell keeps its cdr.
+    to[first + cells] = cdr;
+    to[copy_ptr] = ((cells + 1) << OBJECT_SHIFT) | PAIR_TAG;
+    copy_ptr += cells + 2;
+}
+
+// Copy whatever the objects copied into the given space from the given location onwards refer to.
+void Interpreter::scan(Arena& to, uint64_t scan_ptr, uint64_t from) {
+    uint64_t words, i;
+
+    for (; scan_ptr < copy_ptr; scan_ptr += 1 + words) {
+        words = to[scan_ptr] >> OBJECT_SHIFT;
+
+#ifdef COMPRESSED_REFS
+        // Packed pairs hold both values in their only word.
+        if ((to[scan_ptr] & OBJECT_TAG_MASK) == PAIR_TAG && words == 1) {
+            to[scan_ptr + 1] = pack_pair(forward(unpack_half(to[scan_ptr + 1], 0), to, from), forward(unpack_half(to[scan_ptr + 1], 1), to, from));
+            continue;
+        }
+#endif
+
+        for (i = first_value(to[scan_ptr]); i < words; i++)
+            to[scan_ptr + 1 + i] = forward(to[scan_ptr + 1 + i], to, from);
+    }
+}
+
+// Reserve room in the spare heap for a thread's copy of an object of the given number of words, header included.
+static uint64_t reserve_copy(Arena& to, GCWorker& self, ParallelCollection& gc, uint64_t words) {
+    uint64_t loc;
+
+    if (8*words > CHUNK_WORDS) return gc.top.fetch_add(words);
+
+    // Mark what is left of a full chunk as filler and take a new one.
+    if (self.chunk_ptr + words > self.chunk_end) {
+        if (self.chunk_ptr < self.chunk_end) to[self.chunk_ptr] = ((self.chunk_end - self.chunk_ptr - 1) << OBJECT_SHIFT) | FILLER_TAG;
+        self.chunk_ptr = gc.top.fetch_add(CHUNK_WORDS);
+        self.chunk_end = self.chunk_ptr + CHUNK_WORDS;
+    }
+
+    loc = self.chunk_ptr;
+    self.chunk_ptr += words;
+
+    return loc;
+}
+
+// Copy the object a value refers to into the spare heap on behalf of one thread of a parallel collection and return the updated value.
+// Threads race to claim an object by marking its header busy; the others wait for the winner to leave its new location behind.
+uint64_t Interpreter::forward_shared(uint64_t val, GCWorker& self, ParallelCollection& gc) {
+    uint64_t loc, start, header, words, copy, i;
+
+    // Immediates and constants stay where they are.
+    if (!is_pointer(val) || (val >> PAIR_SHIFT) < pool_end) return val;
+
+    // Runs of cells are copied as they are, without taking in more pairs.
+    loc = val >> PAIR_SHIFT;
+    start = (val & OBJECT_TAG_MASK) == PAIR_TAG ? run_start(cdr_codes, loc) : loc;
+    std::atomic_ref<uint64_t> slot(heap[start - 1]);
+    header = slot.load(std::memory_order_acquire);
+
+    while ((header & OBJECT_TAG_MASK) != FORWARD_TAG) {
+        if ((header & OBJECT_TAG_MASK) == BUSY_TAG) {
+            header = slot.load(std::memory_order_acquire);
+        }
+        else if (slot.compare_exchange_weak(header, BUSY_TAG, std::memory_order_acquire)) {
+            // Copy object and leave it for this thread to scan.
+            words = header >> OBJECT_SHIFT;
+            copy = reserve_copy(spare, self, gc, 1 + words);
+            spare[copy] = header & ~(uint64_t)REMEMBERED_BIT;
+            std::copy_n(heap.begin() + start, words, spare.begin() + copy + 1);
+            // Other threads may be setting codes in the same word.
+            if ((header & OBJECT_TAG_MASK) == PAIR_TAG)
+                for (i = 0; i + 2 < words; i++)
+                    std::atomic_ref<uint64_t>(spare_codes[(copy + 1 + i) / 64]).fetch_or(1ULL << ((copy + 1 + i) % 64));
+            {
+                std::lock_guard<std::mutex> guard(self.lock);
+                self.grey.push_back(copy);
+            }
+
+            header = ((copy + 1) << OBJECT_SHIFT) | FORWARD_TAG;
+            slot.store(header, std::memory_order_release);
+        }
+    }
+
+    return (((header >> OBJECT_SHIFT) + loc - start) << PAIR_SHIFT) | (val & OBJECT_TAG_MASK);
+}
+
+// Take a copied object to scan, first from the thread's own work and otherwise from another thread's.
+static bool take_grey(uint64_t id, ParallelCollection& gc, uint64_t& obj) {
+    uint64_t i, victim;
+
+    for (i = 0; i < gc.workers.size(); i++) {
+        victim = (id + i) % gc.workers.size();
+        std::lock_guard<std::mutex> guard(gc.workers[victim].lock);
+
+        if (gc.workers[victim].grey.empty()) continue;
+
+        // Owners work from the back, thieves from the front.
+        if (i == 0) {
+            obj = gc.workers[victim].grey.back();
+            gc.workers[victim].grey.pop_back();
+        }
+        else {
+            obj = gc.workers[victim].grey.front();
+            gc.workers[victim].grey.pop_front();
+        }
+
+        return true;
+    }
+
+    return false;
+}
+
+// Check whether any thread of a parallel collection has copied objects left to scan.
+static bool any_grey(ParallelCollection& gc) {
+    uint64_t i;
+
+    for (i = 0; i < gc.workers.size(); i++) {
+        std::lock_guard<std::mutex> guard(gc.workers[i].lock);
+        if (!gc.workers[i].grey.empty()) return true;
+    }
+
+    return false;
+}
+
+// Work of one thread of a parallel collection: forward its share of the stack, then scan copied objects until every thread runs out.
+void Interpreter::collect_worker(uint64_t id, ParallelCollection& gc) {
+    GCWorker& self = gc.workers[id];
+    uint64_t num_threads, obj, words, i;
+
+    num_threads = gc.workers.size();
+
+    // Copy objects referenced from this thread's share of the stack.
+    for (i = id*stack_ptr / num_threads; i < (id + 1)*stack_ptr / num_threads; i++)
+        stack[i] = forward_shared(stack[i], self, gc);
+
+    // The first thread also copies the closures of the running procedure and of those waiting for it to return.
+    if (id == 0) {
+        current_closure = forward_shared(current_closure, self, gc);
+        for (i = 0; i < frames.size(); i++)
+            frames[i].closure = forward_shared(frames[i].closure, self, gc);
+    }
+
+    while (true) {
+        if (take_grey(id, gc, obj)) {
+            words = spare[obj] >> OBJECT_SHIFT;
+#ifdef COMPRESSED_REFS
+            if ((spare[obj] & OBJECT_TAG_MASK) == PAIR_TAG && words == 1) {
+                spare[obj + 1] = pack_pair(forward_shared(unpack_half(spare[obj + 1], 0), self, gc), forward_shared(unpack_half(spare[obj + 1], 1), self, gc));
+                continue;
+            }
+#endif
+            for (i = first_value(spare[obj]); i < words; i++)
+                spare[obj + 1 + i] = forward_shared(spare[obj + 1 + i], self, gc);
+            continue;
+        }
+
+        // Wait until more work turns up or every thread is out of work, in which case nothing is left to copy.
+        gc.idle.fetch_add(1);
+        while (gc.idle.load() < num_threads && !any_grey(gc)) std::this_thread::yield();
+        if (gc.idle.load() == num_threads) break;
+        gc.idle.fetch_sub(1);
+    }
+
+    // Mark the rest of the thread's chunk as filler.
+    if (self.chunk_ptr < self.chunk_end) spare[self.chunk_ptr] = ((self.chunk_end - self.chunk_ptr - 1) << OBJECT_SHIFT) | FILLER_TAG;
+}
+
+// Copy every object reachable from the stack into the spare heap using several threads. Returns the end of the copied objects.
+uint64_t Interpreter::copy_in_parallel(void) {
+    ParallelCollection gc(gc_threads, pool_end);
+    std::vector<std::thread> threads;
+    uint64_t i;
+
+    for (i = 0; i < gc_threads; i++)
+        threads.emplace_back(&Interpreter::collect_worker, this, i, std::ref(gc));
+    for (i = 0; i < gc_threads; i++)
+        threads[i].join();
+
+    return gc.top.load();
+}
+
+// Promote every object reachable in the nursery to the old space.
+// Roots are the stack, the closures of the running procedure and its callers and the old objects remembered by the write barrier.
+void Interpreter::collect_nursery(void) {
+    std::chrono::steady_clock::time_point start;
+    uint64_t header, i, j;
+
+    // Promoting everything must not overflow the old space; a full collection empties the nursery instead.
+    if (old_ptr + (heap_ptr - nursery_start) > nursery_start) {
+        collect(0);
+        return;
+    }
+
+    start = std::chrono::steady_clock::now();
+    copy_ptr = old_ptr;
+
+    // Copy objects referenced from the stack and the closures of the running procedure and its callers.
+    for (i = 0; i < stack_ptr; i++)
+        stack[i] = forward(stack[i], heap, nursery_start);
+    current_closure = forward(current_closure, heap, nursery_start);
+    for (i = 0; i < frames.size(); i++)
+        frames[i].closure = forward(frames[i].closure, heap, nursery_start);
+
+    // Copy objects referenced from remembered old objects.
+    for (i = 0; i < remembered.size(); i++) {
+        header = heap[remembered[i] - 1] & ~(uint64_t)REMEMBERED_BIT;
+        heap[remembered[i] - 1] = header;
+        for (j = first_value(header); j < (header >> OBJECT_SHIFT); j++)
+            heap[remembered[i] + j] = forward(heap[remembered[i] + j], heap, nursery_start);
+    }
+    remembered.clear();
+
+    // Promoted objects are scanned in place as they land in the old space.
+    scan(heap, old_ptr, nursery_start);
+
+    old_ptr = copy_ptr;
+    heap_ptr = nursery_start;
+
+    record_pause(minor_pauses, start);
+}
+
+// Copy every object reachable from the stack into the spare semispace and make it the heap, emptying the nursery.
+// Grows the old space if less than half of it is free afterwards or it cannot fit the given number of words.
+void Interpreter::collect(uint64_t needed) {
+    std::chrono::steady_clock::time_point start;
+    uint64_t nursery_words, old_words, i;
+
+    start = std::chrono::steady_clock::now();
+    nursery_words = heap.size() - nursery_start;
+    old_words = nursery_start - pool_end;
+
+    // Codes left over from when the spare heap was last in use would describe cells no longer there.
+    std::fill_n(spare_codes.begin(), heap.size() / 64 + 1, 0);
+
+    if (gc_threads > 1) {
+        // Leave room for the filler at the end of each chunk.
+        spare.resize(heap.size() + (heap.size() - pool_end) / 7 + gc_threads*CHUNK_WORDS);
+        copy_ptr = copy_in_parallel();
+    }
+    else {
+        spare.resize(heap.size());
+        copy_ptr = pool_end;
+
+        // Copy objects referenced from the stack and the closures of the running procedure and its callers.
+        for (i = 0; i < stack_ptr; i++)
+            stack[i] = forward(stack[i], spare, pool_end);
+        current_closure = forward(current_closure, spare, pool_end);
+        for (i = 0; i < frames.size(); i++)
+            frames[i].closure = forward(frames[i].closure, spare, pool_end);
+
+        // Scan copied objects in order, copying whatever they refer to.
+        scan(spare, pool_end, pool_end);
+    }
+
+    std::swap(heap, spare);
+    std::swap(cdr_codes, spare_codes);
+    remembered.clear();
+    old_ptr = copy_ptr;
+    peak_live = std::max(peak_live, old_ptr - pool_end);
+
+    // Grow geometrically so an old space full of live data is not collected on every promotion.
+    if (2*(old_ptr - pool_end + needed) > old_words)
+        old_words = std::max(2*old_words, 2*(old_ptr - pool_end + needed));
+    heap.resize(pool_end + old_words + nursery_words);
+
+    nursery_start = pool_end + old_words;
+    heap_ptr = nursery_start;
+
+    record_pause(full_pauses, start);
+}
+
+// Add the time since a collection started to the pauses of its kind.
+void Interpreter::record_pause(GCPauses& pauses, std::chrono::steady_clock::time_point start) {
+    uint64_t pause;
+
+    pause = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now() - start).count();
+
+    pauses.count++;
+    pauses.total += pause;
+    pauses.longest = std::max(pauses.longest, pause);
+}
+
+// Print number of collections of each kind and the time they took.
+void Interpreter::print_gc_stats(std::ostream*& output) {
+    *output << "minor collections: " << minor_pauses.count << " total " << minor_pauses.total / 1000 << " us longest " << minor_pauses.longest / 1000 << " us\n";
+    *output << "full collections: " << full_pauses.count << " total " << full_pauses.total / 1000 << " us longest " << full_pauses.longest / 1000 << " us\n";
+    *output << "most words live after a full collection: " << peak_live << "\n";
+}
+
+// Opcodes taking no operands from the code along with the member functions that carry them out.
+#define OPCODE_HANDLERS(X) \
+    X(ADD1, add1) \
+    X(SUB1, sub1) \
+    X(INT_TO_CHAR, int_to_char) \
+    X(CHAR_TO_INT, char_to_int) \
+    X(IS_NULL, is_null) \
+    X(IS_ZERO, is_zero) \
+    X(NOT, invert) \
+    X(IS_INT, is_int) \
+    X(IS_BOOL, is_bool) \
+    X(PLUS, plus) \
+    X(TIMES, times) \
+    X(MINUS, minus) \
+    X(LT, less_than) \
+    X(GT, greater_than) \
+    X(LEQ, less_than_equal) \
+    X(GEQ, greater_than_equal) \
+    X(EQ, equal) \
+    X(POP_JUMP_IF_FALSE, pop_jump_if_false) \
+    X(JUMP_OVER_ELSE, jump_over_else) \
+    X(PUSH_LET, push_let) \
+    X(END_LET, end_let) \
+    X(CONS, create_cons) \
+    X(CAR, car) \
+    X(CDR, cdr) \
+    X(STR, create_str) \
+    X(STR_REF, str_ref) \
+    X(STR_SET, str_set) \
+    X(STR_APP, str_append) \
+    X(VEC, create_vec) \
+    X(VEC_REF, vec_ref) \
+    X(VEC_SET, vec_set) \
+    X(VEC_APP, vec_append) \
+    X(BEG, begin) \
+    X(CODE, code_label) \
+    X(CLOSURE, closure) \
+    X(CALL, call) \
+    X(RET, ret) \
+    X(GET_ARG, get_arg) \
+    X(GET_FREE, get_free) \
+    X(SET_FREES, set_frees) \
+    X(CONST_REF, const_ref) \
+    X(CONST_INIT, const_init) \
+    X(TAIL_CALL, tail_call) \
+    X(SYMBOL, symbol) \
+    X(JUMP_IF_FALSE, jump_if_false) \
+    X(POP, pop) \
+    X(JUMP_IF_TRUE, jump_if_true) \
+    X(VEC_REF_UNCHECKED, vec_ref_unchecked) \
+    X(VEC_SET_UNCHECKED, vec_set_unchecked) \
+    X(STR_REF_UNCHECKED, str_ref_unchecked) \
+    X(STR_SET_UNCHECKED, str_set_unchecked) \
+    X(CLONE, clone)
+
+// Opcodes the register form carries out on operands wherever they live, taking one value or two.
+#define UNARY_HANDLERS(X) \
+    X(ADD1, add1) \
+    X(SUB1, sub1) \
+    X(INT_TO_CHAR, int_to_char) \
+    X(CHAR_TO_INT, char_to_int) \
+    X(IS_NULL, is_null) \
+    X(IS_ZERO, is_zero) \
+    X(NOT, invert) \
+    X(IS_INT, is_int) \
+    X(IS_BOOL, is_bool)
+
+#define BINARY_HANDLERS(X) \
+    X(PLUS, plus) \
+    X(TIMES, times) \
+    X(MINUS, minus) \
+    X(LT, less_than) \
+    X(GT, greater_than) \
+    X(LEQ, less_than_equal) \
+    X(GEQ, greater_than_equal) \
+    X(EQ, equal) \
+    X(VEC_REF, vec_ref) \
+    X(STR_REF, str_ref) \
+    X(VEC_REF_UNCHECKED, vec_ref_unchecked) \
+    X(STR_REF_UNCHECKED, str_ref_unchecked)
+
+// Opcodes the register form keeps in stack form since they allocate or write to the heap, with the number of values they leave on the stack less the number they take.
+// Those taking a count of values from the code also take as many more as it says. CODE, CALL and TAIL_CALL are kept in stack form too.
+#define STACK_FORM_HANDLERS(X) \
+    X(CONS, create_cons, -1) \
+    X(STR, create_str, 1) \
+    X(STR_SET, str_set, -2) \
+    X(STR_APP, str_append, -1) \
+    X(VEC, create_vec, 1) \
+    X(VEC_SET, vec_set, -2) \
+    X(VEC_APP, vec_append, -1) \
+    X(CLOSURE, closure, 1) \
+    X(SET_FREES, set_frees, 0) \
+    X(CONST_INIT, const_init, 0) \
+    X(VEC_SET_UNCHECKED, vec_set_unchecked, -2) \
+    X(STR_SET_UNCHECKED, str_set_unchecked, -2) \
+    X(CLONE, clone, 1)
+
+// Where the value of an operand lives before it is encoded. Slots are numbered from the bottom of the frame being translated.
+struct Operand {
+    uint64_t kind;
+    int64_t index;
+};
+
+// Value on the stack of the frame being translated, either in its slot already or still to be read from an operand once needed.
+struct PendingValue {
+    bool deferred;
+    Operand operand;
+};
+
+// State of the translation of a program into register form.
+struct Translation {
+    std::span<const uint64_t> from;
+    std::vector<uint64_t>& symbols;
+    std::vector<uint64_t>& immediates;
+    std::vector<uint64_t> to;
+
+    // Whether each instruction of the stack form is jumped to by a jump translated so far and where it was translated to.
+    std::vector<bool> targets;
+    std::vector<uint64_t> moved;
+
+    // Words of the register form holding a jump offset, along with the location in the stack form jumped to.
+    std::vector<std::pair<uint64_t, uint64_t>> jumps;
+
+    // Number of values on the stack of the frame being translated, how many of them the stack pointer covers and how many of them are in their slots.
+    int64_t depth = 0;
+    int64_t synced = 0;
+    int64_t held = 0;
+
+    // Values above those held in their slots.
+    std::vector<PendingValue> pending;
+
+    // Whether the instruction being translated can be reached from the one before it.
+    bool reachable = true;
+
+    Translation(std::span<const uint64_t> code, std::vector<uint64_t>& syms, std::vector<uint64_t>& imms) : from(code), symbols(syms), immediates(imms), targets(code.size() + 1, false), moved(code.size() + 1, UINT64_MAX) {}
+};
+
+// Number of words following an opcode of the stack form, -1 if the opcode is unknown.
+static int64_t num_operands(uint64_t word) {
+    switch (static_cast<OpCode>(word)) {
+        case OpCode::LOAD64:
+        case OpCode::POP_JUMP_IF_FALSE:
+        case OpCode::JUMP_OVER_ELSE:
+        case OpCode::PUSH_LET:
+        case OpCode::END_LET:
+        case OpCode::STR:
+        case OpCode::VEC:
+        case OpCode::BEG:
+        case OpCode::CLOSURE:
+        case OpCode::GET_ARG:
+        case OpCode::CONST_REF:
+        case OpCode::SYMBOL:
+        case OpCode::JUMP_IF_FALSE:
+        case OpCode::JUMP_IF_TRUE:
+        case OpCode::CLONE:
+        case OpCode::GET_FREE:
+        case OpCode::CALL:
+        case OpCode::TAIL_CALL:
+            return 1;
+        case OpCode::SET_FREES:
+            return 2;
+        case OpCode::CODE:
+            return 3;
+        default:
+            return (word >= 1 && word < NUM_OPCODES) ? 0 : -1;
+    }
+}
+
+// Encode an operand relative to where the stack pointer is when the instruction using it runs.
+static uint64_t encode(Translation& t, Operand operand) {
+    if (operand.kind == SLOT_OPERAND) operand.index -= t.synced;
+
+    return (static_cast<uint64_t>(operand.index) << OPERAND_SHIFT) | operand.kind;
+}
+
+// Push a value that is to be read from an operand once needed.
+static void push_pending(Translation& t, Operand operand) {
+    t.pending.push_back({true, operand});
+    t.depth++;
+}
+
+// Push a value that an instruction has placed in its slot.
+static void push_held(Translation& t) {
+    t.pending.push_back({false, {SLOT_OPERAND, t.depth}});
+    t.depth++;
+}
+
+// Pop the value on top of the stack, returning where it can be read from.
+static Operand pop_operand(Translation& t) {
+    Operand operand;
+
+    if (t.depth > t.held) {
+        operand = t.pending.back().operand;
+        t.pending.pop_back();
+    }
+    else {
+        operand = {SLOT_OPERAND, t.depth - 1};
+        t.held--;
+    }
+    t.depth--;
+
+    return operand;
+}
+
+// Add an instruction to the register form.
+static void emit(Translation& t, RegOp op) {
+    t.to.push_back(static_cast<uint64_t>(op));
+}
+
+// Move every pending value into its slot.
+static void flush(Translation& t) {
+    uint64_t i;
 
+    for (i = 0; i < t.pending.size(); i++) {
+        if (!t.pending[i].deferred) continue;
+        emit(t, RegOp::MOVE);
+        t.to.push_back(encode(t, {SLOT_OPERAND, t.held + static_cast<int64_t>(i)}));
+        t.to.push_back(encode(t, t.pending[i].operand));
+    }
+
+    t.pending.clear();
+    t.held = t.depth;
+}
+
+// Add how far to move the stack pointer for it to cover every value.
+static void sync(Translation& t) {
+    t.to.push_back(static_cast<uint64_t>(t.depth - t.synced));
+    t.synced = t.depth;
 }
 
+// Add the offset of a jump to the given location in the stack form, filled in once every instruction has been translated.
+static void jump_to(Translation& t, uint64_t target) {
+    t.jumps.push_back({t.to.size(), target});
+    t.to.push_back(0);
+    t.targets[target] = true;
+}
+
+// Translate an operation on the value on top of the stack, leaving the result in its slot.
+static void translate_unary(Translation& t, RegOp op) {
+    Operand operand;
+
+    operand = pop_operand(t);
+    emit(t, op);
+    t.to.push_back(encode(t, {SLOT_OPERAND, t.depth}));
+    t.to.push_back(encode(t, operand));
+    push_held(t);
+}
+
+// Translate an operation on the two values on top of the stack, leaving the result in the slot of the lower one.
+static void translate_binary(Translation& t, RegOp op) {
+    Operand operand_1, operand_2;
+
+    operand_2 = pop_operand(t);
+    operand_1 = pop_operand(t);
+    emit(t, op);
+    t.to.push_back(encode(t, {SLOT_OPERAND, t.depth}));
+    t.to.push_back(encode(t, operand_1));
+    t.to.push_back(encode(t, operand_2));
+    push_held(t);
+}
+
+// Number of values the instruction kept in stack form at the given location leaves on the stack less the number it takes, given where its operands start.
+static int64_t stack_effect(std::span<const uint64_t> code, uint64_t p, uint64_t operands) {
+    int64_t effect;
+
+    switch (static_cast<OpCode>(code[p])) {
+#define EFFECT_CASE(op, handler, effect_of) case OpCode::op: effect = effect_of; break;
+        STACK_FORM_HANDLERS(EFFECT_CASE)
+#undef EFFECT_CASE
+        default:
+            effect = 0;
+            break;
+    }
+
+    // Those taking a count of values from the code also take as many more.
+    if (static_cast<OpCode>(code[p]) == OpCode::STR || static_cast<OpCode>(code[p]) == OpCode::VEC) effect -= code[operands];
+    else if (static_cast<OpCode>(code[p]) == OpCode::SET_FREES) effect -= code[operands + 1];
+
+    return effect;
+}
+
+// Translate the stack form code between the given locations, which make up the body of one frame. Returns false if the code cannot be translated.
+static bool translate_code(Translation& t, uint64_t start, uint64_t end) {
+    uint64_t p, word, len, body, pops, i;
+    int64_t n, depth, synced, held;
+    Operand operand;
+    std::vector<PendingValue> pending;
+
+    for (p = start; p < end; p += 1 + n) {
+        word = t.from[p];
+        n = num_operands(word);
+
+        // Code that cannot be reached is left out.
+        if (!t.targets[p] && !t.reachable) {
+            if (static_cast<OpCode>(word) == OpCode::CODE) n += t.from[p + 1];
+            continue;
+        }
+
+        // Every value must be in its slot and covered by the stack pointer wherever control may arrive from elsewhere.
+        if (t.targets[p] && t.reachable) {
+            flush(t);
+            if (t.synced != t.depth) {
+                emit(t, RegOp::JUMP);
+                sync(t);
+                t.to.push_back(0);
+            }
+        }
+        else if (t.targets[p]) {
+            t.pending.clear();
+            t.held = t.depth;
+            t.synced = t.depth;
+        }
+        t.reachable = true;
+        t.moved[p] = t.to.size();
+
+        switch (static_cast<OpCode>(word)) {
+            // Values loaded onto the stack are only read once an instruction needs them.
+            case OpCode::LOAD64:
+                t.immediates.push_back(t.from[p + 1]);
+                push_pending(t, {IMM_OPERAND, static_cast<int64_t>(t.immediates.size() - 1)});
+                break;
+            case OpCode::SYMBOL:
+                t.immediates.push_back(t.symbols[t.from[p + 1]]);
+                push_pending(t, {IMM_OPERAND, static_cast<int64_t>(t.immediates.size() - 1)});
+                break;
+            case OpCode::GET_ARG:
+                push_pending(t, {ARG_OPERAND, static_cast<int64_t>(t.from[p + 1])});
+                break;
+            case OpCode::CONST_REF:
+                push_pending(t, {STACK_OPERAND, static_cast<int64_t>(t.from[p + 1])});
+                break;
+            case OpCode::PUSH_LET:
+                depth = t.depth - static_cast<int64_t>(t.from[p + 1]);
+                push_pending(t, depth >= t.held ? t.pending[depth - t.held].operand : Operand{SLOT_OPERAND, depth});
+                break;
+            case OpCode::GET_FREE:
+                emit(t, RegOp::GET_FREE);
+                t.to.push_back(encode(t, {SLOT_OPERAND, t.depth}));
+                t.to.push_back(t.from[p + 1]);
+                push_held(t);
+                break;
+#define UNARY_CASE(op, handler) case OpCode::op: translate_unary(t, RegOp::op); break;
+            UNARY_HANDLERS(UNARY_CASE)
+#undef UNARY_CASE
+            case OpCode::CAR:
+                translate_unary(t, RegOp::CAR);
+                break;
+            case OpCode::CDR:
+                translate_unary(t, RegOp::CDR);
+                break;
+#define BINARY_CASE(op, handler) case OpCode::op: translate_binary(t, RegOp::op); break;
+            BINARY_HANDLERS(BINARY_CASE)
+#undef BINARY_CASE
+            case OpCode::END_LET:
+            case OpCode::BEG:
+                // Keep the value on top and drop those under it.
+                pops = static_cast<OpCode>(word) == OpCode::END_LET ? t.from[p + 1] : std::max(t.from[p + 1], (uint64_t)1) - 1;
+                operand = pop_operand(t);
+                for (i = 0; i < pops; i++)
+                    pop_operand(t);
+
+                // A value left in a slot that is no longer covered must be moved down before it is overwritten.
+                if (operand.kind == SLOT_OPERAND && operand.index >= t.depth) {
+                    if (operand.index != t.depth) {
+                        emit(t, RegOp::MOVE);
+                        t.to.push_back(encode(t, {SLOT_OPERAND, t.depth}));
+                        t.to.push_back(encode(t, operand));
+                    }
+                    push_held(t);
+                }
+                else
+                    push_pending(t, operand);
+                break;
+            case OpCode::POP:
+                pop_operand(t);
+                break;
+            case OpCode::POP_JUMP_IF_FALSE:
+                operand = pop_operand(t);
+                flush(t);
+                emit(t, RegOp::BRANCH_IF_FALSE);
+                t.to.push_back(encode(t, operand));
+                sync(t);
+                jump_to(t, p + 2 + t.from[p + 1]);
+                break;
+            case OpCode::JUMP_IF_FALSE:
+            case OpCode::JUMP_IF_TRUE:
+                // The value tested stays on the stack either way.
+                flush(t);
+                emit(t, static_cast<OpCode>(word) == OpCode::JUMP_IF_FALSE ? RegOp::BRANCH_IF_FALSE : RegOp::BRANCH_IF_TRUE);
+                t.to.push_back(encode(t, {SLOT_OPERAND, t.depth - 1}));
+                sync(t);
+                jump_to(t, p + 2 + t.from[p + 1]);
+                break;
+            case OpCode::JUMP_OVER_ELSE:
+                // Jumping to a return returns straight away.
+                if (static_cast<OpCode>(t.from[p + 2 + t.from[p + 1]]) == OpCode::RET) {
+                    emit(t, RegOp::RET);
+                    t.to.push_back(encode(t, pop_operand(t)));
+                    t.reachable = false;
+                    break;
+                }
+                flush(t);
+                emit(t, RegOp::JUMP);
+                sync(t);
+                jump_to(t, p + 2 + t.from[p + 1]);
+                t.reachable = false;
+                break;
+            case OpCode::RET:
+            case OpCode::RETURN:
+                operand = pop_operand(t);
+                emit(t, static_cast<OpCode>(word) == OpCode::RET ? RegOp::RET : RegOp::RETURN);
+                t.to.push_back(encode(t, operand));
+                t.reachable = false;
+                break;
+            case OpCode::CODE:
+                // The body is a frame of its own and follows the instruction in both forms.
+                len = t.from[p + 1];
+                flush(t);
+                t.to.push_back(word);
+                sync(t);
+                t.to.push_back(0);
+                t.to.push_back(t.from[p + 2]);
+                t.to.push_back(t.from[p + 3]);
+                body = t.to.size();
+
+                depth = t.depth;
+                synced = t.synced;
+                held = t.held;
+                pending.swap(t.pending);
+                t.depth = t.synced = t.held = 0;
+                t.reachable = true;
+                if (!translate_code(t, p + 4, p + 4 + len)) return false;
+                t.depth = depth;
+                t.synced = synced;
+                t.held = held;
+                t.pending.swap(pending);
+                t.reachable = true;
+
+                t.to[body - 3] = t.to.size() - body;
+                t.depth++;
+                t.synced++;
+                t.held++;
+                n += len;
+                break;
+            case OpCode::CALL:
+            case OpCode::TAIL_CALL:
+                // Calls leave their result in place of the closure and the arguments.
+                flush(t);
+                t.to.push_back(word);
+                sync(t);
+                t.to.push_back(t.from[p + 1]);
+                t.depth -= t.from[p + 1];
+                t.synced = t.depth;
+                t.held = t.depth;
+                t.reachable = static_cast<OpCode>(word) == OpCode::CALL;
+                break;
+#define STACK_FORM_CASE(op, handler, effect) case OpCode::op:
+            STACK_FORM_HANDLERS(STACK_FORM_CASE)
+#undef STACK_FORM_CASE
+                // Every value must be in its slot for the handler, which leaves every value in its slot.
+                flush(t);
+                t.to.push_back(word);
+                sync(t);
+                t.to.insert(t.to.end(), t.from.begin() + p + 1, t.from.begin() + p + 1 + n);
+                t.depth += stack_effect(t.from, p, p + 1);
+                t.synced = t.depth;
+                t.held = t.depth;
+                break;
+            default:
+                return false;
+        }
+    }
+
+    return true;
+}
+
+// Translate the program into register form. Returns false, leaving the program in stack form, if it cannot be translated.
+// The program must have been verified, so every operand is in range. Code before the entry point is never run and is left out.
+bool Interpreter::translate(void) {
+    Translation t(code, symbols, immediates);
+    uint64_t i;
+
+    if (!translate_code(t, pc, code.size()) || t.moved[pc] == UINT64_MAX) return false;
+
+    // Jumps are relative to the end of the instruction, which ends with the offset.
+    for (i = 0; i < t.jumps.size(); i++) {
+        if (t.moved[t.jumps[i].second] == UINT64_MAX) return false;
+        t.to[t.jumps[i].first] = t.moved[t.jumps[i].second] - (t.jumps[i].first + 1);
+    }
+
+    // Compiled code calling a procedure that is interpreted has it return here, which hands back the value it left on the stack.
+    return_to_compiled = t.to.size();
+    t.to.push_back(static_cast<uint64_t>(RegOp::RETURN));
+    t.to.push_back((static_cast<uint64_t>(-1) << OPERAND_SHIFT) | SLOT_OPERAND);
+
+    pc = t.moved[pc];
+    owned_code = std::move(t.to);
+    code = owned_code;
+
+    return true;
+}
+
+// Label defined by the program's own code, either a procedure's code or a constant, along with the stack depth a procedure may use.
+struct VerifiedLabel {
+    bool code;
+    uint64_t num_bounds;
+    uint64_t num_frees;
+    uint64_t frame_depth;
+};
+
+// What is known of the stack where an instruction runs: how many labels are defined and, for each value, the label whose code it is a closure of or -1 if not known.
+struct StackShape {
+    uint64_t labels = 0;
+    std::vector<int64_t> closures;
+};
+
+// State of the verification of a program.
+struct Verification {
+    std::span<const uint64_t> code;
+    uint64_t num_symbols;
+    Arena& heap;
+    uint64_t pool_end;
+
+    // Labels in the order the program's own code defines them and where each is defined.
+    std::vector<VerifiedLabel> labels;
+    std::vector<uint64_t> sites;
+
+    Verification(std::span<const uint64_t> from, uint64_t syms, Arena& pool, uint64_t end) : code(from), num_symbols(syms), heap(pool), pool_end(end) {}
+};
+
+// Reject the program unless a condition of valid bytecode holds.
+static void require(bool valid) {
+    if (!valid) throw std::runtime_error("Invalid bytecode.\n");
+}
+
+// Take the given number of values off the stack, none of which may lie below the given floor.
+static void take(StackShape& shape, uint64_t n, uint64_t floor) {
+    require(n <= shape.closures.size() - floor);
+    shape.closures.resize(shape.closures.size() - n);
+}
+
+// Record the stack control arrives at a jump target with. Every way of arriving must agree on its depth and on the labels defined.
+static void arrive(std::map<uint64_t, StackShape>& targets, uint64_t target, const StackShape& shape) {
+    std::map<uint64_t, StackShape>::iterator found;
+    uint64_t i;
+
+    found = targets.find(target);
+    if (found == targets.end()) {
+        targets.emplace(target, shape);
+        return;
+    }
+
+    require(found->second.labels == shape.labels && found->second.closures.size() == shape.closures.size());
+    for (i = 0; i < shape.closures.size(); i++)
+        if (found->second.closures[i] != shape.closures[i]) found->second.closures[i] = -1;
+}
+
+// Verify the code between the given locations, which make up the body of one frame, and return the greatest number of values it has on the stack at once.
+// Only the program's own code, which holds the given number of values when it starts, defines labels. Procedures read as many arguments and frees as given.
+static uint64_t verify_code(Verification& v, uint64_t start, uint64_t end, bool top, uint64_t num_bounds, uint64_t num_frees) {
+    std::map<uint64_t, StackShape> targets;
+    StackShape shape;
+    uint64_t p, word, operand, floor, depth, max_depth, image, len, words;
+    int64_t n, closure;
+    bool reachable;
+
+    max_depth = 0;
+    reachable = true;
+    for (p = start; p < end; p += 1 + n) {
+        word = v.code[p];
+        n = num_operands(word);
+        require(n >= 0 && static_cast<uint64_t>(n) < end - p);
+        operand = n > 0 ? v.code[p + 1] : 0;
+
+        // Jumps must land on an instruction, where control also arrives from the instruction before unless that ends the code.
+        require(targets.empty() || targets.begin()->first >= p);
+        if (!targets.empty() && targets.begin()->first == p) {
+            if (reachable) arrive(targets, p, shape);
+            shape = std::move(targets.begin()->second);
+            targets.erase(targets.begin());
+            reachable = true;
+        }
+
+        // Code that cannot be reached is never run.
+        if (!reachable) {
+            if (static_cast<OpCode>(word) == OpCode::CODE) {
+                require(operand <= end - p - 4);
+                n += operand;
+            }
+            continue;
+        }
+
+        // Labels at the bottom of the stack are never taken off it.
+        floor = top ? shape.labels : 0;
+
+        switch (static_cast<OpCode>(word)) {
+            case OpCode::LOAD64:
+                // Only immediates and objects in the constant pool can be loaded, so closures cannot be forged.
+                require(!is_pointer(operand) || ((operand & CLOSURE_MASK) != CLOSURE_TAG && (operand >> PAIR_SHIFT) < v.pool_end));
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::RETURN:
+                require(top);
+                take(shape, 1, floor);
+                reachable = false;
+                break;
+#define UNARY_CASE(op, handler) case OpCode::op:
+            UNARY_HANDLERS(UNARY_CASE)
+#undef UNARY_CASE
+            case OpCode::CAR:
+            case OpCode::CDR:
+                take(shape, 1, floor);
+                shape.closures.push_back(-1);
+                break;
+#define BINARY_CASE(op, handler) case OpCode::op:
+            BINARY_HANDLERS(BINARY_CASE)
+#undef BINARY_CASE
+            case OpCode::CONS:
+            case OpCode::STR_APP:
+            case OpCode::VEC_APP:
+                take(shape, 2, floor);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::STR_SET:
+            case OpCode::VEC_SET:
+            case OpCode::STR_SET_UNCHECKED:
+            case OpCode::VEC_SET_UNCHECKED:
+                take(shape, 3, floor);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::STR:
+            case OpCode::VEC:
+                take(shape, operand, floor);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::CLONE:
+                // The image copied must lie whole within the constant pool.
+                require(((operand & STR_MASK) == STR_TAG || (operand & VEC_MASK) == VEC_TAG) && (operand >> VEC_SHIFT) < v.pool_end);
+                image = operand >> VEC_SHIFT;
+                len = v.heap[image];
+                words = (operand & STR_MASK) == STR_TAG ? len / BPI + (len % BPI != 0) : len;
+                require(words < v.pool_end - image);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::POP_JUMP_IF_FALSE:
+            case OpCode::JUMP_IF_FALSE:
+            case OpCode::JUMP_IF_TRUE:
+            case OpCode::JUMP_OVER_ELSE:
+                // Jumps are forward to an instruction of the same code. The value tested is popped first by POP_JUMP_IF_FALSE and kept by the others.
+                require(operand < end - p - 2);
+                if (static_cast<OpCode>(word) == OpCode::POP_JUMP_IF_FALSE) take(shape, 1, floor);
+                else if (static_cast<OpCode>(word) != OpCode::JUMP_OVER_ELSE) require(shape.closures.size() > floor);
+                arrive(targets, p + 2 + operand, shape);
+                reachable = static_cast<OpCode>(word) != OpCode::JUMP_OVER_ELSE;
+                break;
+            case OpCode::POP:
+                take(shape, 1, floor);
+                break;
+            case OpCode::PUSH_LET:
+                require(operand >= 1 && operand <= shape.closures.size());
+                shape.closures.push_back(shape.closures[shape.closures.size() - operand]);
+                break;
+            case OpCode::END_LET:
+            case OpCode::BEG:
+                // Keep the value on top and drop those under it.
+                require(shape.closures.size() > floor);
+                closure = shape.closures.back();
+                take(shape, 1, floor);
+                take(shape, static_cast<OpCode>(word) == OpCode::END_LET ? operand : std::max(operand, (uint64_t)1) - 1, floor);
+                shape.closures.push_back(closure);
+                break;
+            case OpCode::GET_ARG:
+                require(operand < num_bounds);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::GET_FREE:
+                require(operand < num_frees);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::SYMBOL:
+                require(operand < v.num_symbols);
+                shape.closures.push_back(-1);
+                break;
+            case OpCode::CLOSURE:
+            case OpCode::CONST_REF:
+                // The program's own code can only refer to labels it has defined. Procedures run once every label is defined.
+                require(operand < (top ? shape.labels : v.labels.size()));
+                require(static_cast<OpCode>(word) == OpCode::CONST_REF || v.labels[operand].code);
+                shape.closures.push_back(v.labels[operand].code ? static_cast<int64_t>(operand) : -1);
+                break;
+            case OpCode::SET_FREES:
+                // The closure set lies under the values of its frees and must have room for them.
+                require(operand > v.code[p + 2] && operand <= shape.closures.size());
+                closure = shape.closures[shape.closures.size() - operand];
+                require(closure >= 0 && v.labels[closure].num_frees == v.code[p + 2]);
+                take(shape, v.code[p + 2], floor);
+                break;
+            case OpCode::CALL:
+            case OpCode::TAIL_CALL:
+                // Procedures can only be called once every label is defined, and tail calls need a caller to return to.
+                require(!top || (static_cast<OpCode>(word) == OpCode::CALL && shape.labels == v.labels.size()));
+                take(shape, 1, floor);
+                take(shape, operand, floor);
+                shape.closures.push_back(-1);
+                reachable = static_cast<OpCode>(word) == OpCode::CALL;
+                break;
+            case OpCode::RET:
+                require(!top);
+                take(shape, 1, floor);
+                reachable = false;
+                break;
+            case OpCode::CONST_INIT:
+                // The value computed becomes the next label.
+                require(top && shape.labels < v.sites.size() && v.sites[shape.labels] == p && shape.closures.size() == shape.labels + 1);
+                shape.closures.back() = -1;
+                shape.labels++;
+                break;
+            case OpCode::CODE:
+                // The label is placed on top of those defined so far and its body is a frame of its own, which must fit in the depth given for it.
+                require(top && shape.labels < v.sites.size() && v.sites[shape.labels] == p && shape.closures.size() == shape.labels);
+                depth = verify_code(v, p + 4, p + 4 + operand, false, v.code[p + 2], v.code[p + 3]);
+                require(depth <= v.labels[shape.labels].frame_depth && v.code[p + 2] <= v.labels[shape.labels].frame_depth - depth);
+                shape.closures.push_back(static_cast<int64_t>(shape.labels));
+                shape.labels++;
+                n += operand;
+                break;
+            default:
+                require(false);
+                break;
+        }
+
+        max_depth = std::max(max_depth, (uint64_t)shape.closures.size());
+    }
+
+    // Control must not run off the end of the code.
+    require(!reachable && targets.empty());
+
+    return max_depth;
+}
+
+// Check the program is valid bytecode, throwing if not.
+void Interpreter::verify(void) {
+    Verification v(code, symbols.size(), heap, pool_end);
+    uint64_t p, frame;
+    int64_t n;
+
+    // Code before the entry point is never run.
+    require(pc < code.size());
+
+    // Find every label first, since procedures may refer to labels defined after them.
+    frame = 0;
+    for (p = pc; p < code.size(); p += 1 + n) {
+        n = num_operands(code[p]);
+        require(n >= 0 && static_cast<uint64_t>(n) < code.size() - p);
+        if (static_cast<OpCode>(code[p]) == OpCode::CODE) {
+            require(code[p + 1] <= code.size() - p - 4);
+            v.labels.push_back({true, code[p + 2], code[p + 3], frame < frame_depths.size() ? frame_depths[frame] : DEFAULT_FRAME_DEPTH});
+            v.sites.push_back(p);
+            frame++;
+            n += code[p + 1];
+        }
+        else if (static_cast<OpCode>(code[p]) == OpCode::CONST_INIT) {
+            v.labels.push_back({false, 0, 0, 0});
+            v.sites.push_back(p);
+        }
+    }
+
+    // The program's own code runs on the stack as allocated, while each procedure checks its frame fits when called.
+    require(verify_code(v, pc, code.size(), true, 0, 0) <= stack.size());
+}
+
+// Labels as values are a GNU extension.
+#ifdef THREADED_DISPATCH
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wpedantic"
+#endif
+
 // Interpret a program, return once it reaches a return instruction.
+// Where labels can be taken as values each instruction jumps straight to the code of the next rather than going back round a switch.
+// The value on top of the stack is kept in a local rather than in its slot, so instructions that only take and replace the top never touch the stack.
+// Instructions that reach further down write it back to its slot first and read the new top afterwards.
+// Programs translated into register form when loaded run in interpret_registers instead.
 uint64_t Interpreter::interpret(void) {
-    OpCode instr;
-    uint64_t word, val;
+    uint64_t tos, val, num, bytes;
+
+    // Compiled code recurses on the C stack wherever the interpreter pushes a frame, so it runs on a thread whose stack is sized to the operand stack.
+    if (register_form && jit.enabled()) {
+        bytes = stack.size() * JIT_STACK_BYTES_PER_WORD;
+        return run_with_stack(bytes + JIT_STACK_RESERVE, [this, bytes]() {
+            uint8_t here;
+
+            // Calls from compiled code stop short of the end of the thread's stack.
+            jit_stack_floor = reinterpret_cast<uintptr_t>(&here) - bytes;
 
-    do {
+            return interpret_registers();
+        });
+    }
+    if (register_form) return interpret_registers();
+
+    tos = 0;
+#ifdef THREADED_DISPATCH
+    // Label of the code carrying out each opcode, indexed by opcode.
+    void* labels[NUM_OPCODES];
+    uint64_t i;
+
+    for (i = 0; i < NUM_OPCODES; i++)
+        labels[i] = &&unknown;
+    labels[static_cast<uint64_t>(OpCode::LOAD64)] = &&op_LOAD64;
+    labels[static_cast<uint64_t>(OpCode::RETURN)] = &&op_RETURN;
+#define LABEL_ADDRESS(op, handler) labels[static_cast<uint64_t>(OpCode::op)] = &&op_##op;
+    OPCODE_HANDLERS(LABEL_ADDRESS)
+#undef LABEL_ADDRESS
+
+    // Jump straight from the end of one instruction to the code of the next. Verified code only holds known opcodes, so the table is indexed unchecked.
+#define DISPATCH() goto *labels[read_word()]
+#define LABEL(op) op_##op
+
+    DISPATCH();
+#else
+    // Go back round the switch after each instruction.
+#define DISPATCH() continue
+#define LABEL(op) case static_cast<uint64_t>(OpCode::op)
+
+    while (true) switch (read_word()) {
+#endif
+    // Slot the top of the stack belongs in. The program's own code can run with nothing on the stack, in which case the first slot is used since it is free.
+#define TOP stack[stack_ptr - (stack_ptr != 0)]
+    // Instructions only found in procedures, or which need values on the stack, always have a slot to use.
+#define FRAME_TOP stack[stack_ptr - 1]
+LABEL(LOAD64):
+    // Get the next word from the code and push onto the stack.
+    TOP = tos;
+    stack_ptr++;
+    tos = read_word();
+    DISPATCH();
+LABEL(RETURN):
+    // Pop a value from stack and return the value.
+    stack_ptr--;
+    return tos;
+#define UNARY_LABEL(op, handler) \
+LABEL(op): \
+    tos = handler##_value(tos); \
+    DISPATCH();
+    UNARY_HANDLERS(UNARY_LABEL)
+#undef UNARY_LABEL
+#define BINARY_LABEL(op, handler) \
+LABEL(op): \
+    stack_ptr--; \
+    tos = handler##_value(stack[stack_ptr - 1], tos); \
+    DISPATCH();
+    BINARY_HANDLERS(BINARY_LABEL)
+#undef BINARY_LABEL
+LABEL(CAR):
+    tos = pair_field(tos >> PAIR_SHIFT, 0);
+    DISPATCH();
+LABEL(CDR):
+    tos = pair_field(tos >> PAIR_SHIFT, 1);
+    DISPATCH();
+LABEL(POP_JUMP_IF_FALSE):
+    // Pop the value tested, then jump over the consequent if it is false.
+    val = tos;
+    stack_ptr--;
+    tos = TOP;
+    if (is_false(val)) pc += read_word();
+    else pc += 1;
+    DISPATCH();
+LABEL(JUMP_IF_FALSE):
+    if (is_false(tos)) pc += read_word();
+    else pc += 1;
+    DISPATCH();
+LABEL(JUMP_IF_TRUE):
+    if (!is_false(tos)) pc += read_word();
+    else pc += 1;
+    DISPATCH();
+LABEL(JUMP_OVER_ELSE):
+    jump_over_else();
+    DISPATCH();
+LABEL(POP):
+    stack_ptr--;
+    tos = TOP;
+    DISPATCH();
+LABEL(PUSH_LET):
+    // Write the top back first since the binding may be the top itself.
+    FRAME_TOP = tos;
+    tos = stack[stack_ptr - read_word()];
+    stack_ptr++;
+    DISPATCH();
+LABEL(GET_ARG):
+    FRAME_TOP = tos;
+    stack_ptr++;
+    tos = stack[base_ptr + read_word()];
+    DISPATCH();
+LABEL(GET_FREE):
+    FRAME_TOP = tos;
+    stack_ptr++;
+    tos = heap[(current_closure >> CLOSURE_SHIFT) + CLOSURE_LEN + read_word()];
+    DISPATCH();
+LABEL(RET):
+    // Return to the caller as ret does, the return value staying on top throughout.
+    stack_ptr = base_ptr + 1;
+    pc = frames.back().return_pc;
+    base_ptr = frames.back().base_ptr;
+    current_closure = frames.back().closure;
+    frames.pop_back();
+    DISPATCH();
+LABEL(END_LET):
+    // Drop the bindings from under the value kept on top.
+    stack_ptr -= read_word();
+    DISPATCH();
+LABEL(BEG):
+    // Drop the values of every expression but the last from under it.
+    num = read_word();
+    if (num > 1) stack_ptr -= num - 1;
+    DISPATCH();
+    // Other instructions run as they would with the whole stack in memory.
+#define SPILL_LABEL(op, handler) \
+LABEL(op): \
+    TOP = tos; \
+    handler(); \
+    tos = TOP; \
+    DISPATCH();
+    SPILL_LABEL(CODE, code_label)
+    SPILL_LABEL(CONST_REF, const_ref)
+    SPILL_LABEL(SYMBOL, symbol)
+#define STACK_FORM_SPILL_LABEL(op, handler, effect) SPILL_LABEL(op, handler)
+    STACK_FORM_HANDLERS(STACK_FORM_SPILL_LABEL)
+#undef STACK_FORM_SPILL_LABEL
+#undef SPILL_LABEL
+#define FRAME_LABEL(op, handler) \
+LABEL(op): \
+    FRAME_TOP = tos; \
+    handler(); \
+    tos = FRAME_TOP; \
+    DISPATCH();
+    FRAME_LABEL(CALL, call)
+    FRAME_LABEL(TAIL_CALL, tail_call)
+#undef FRAME_LABEL
+#ifdef THREADED_DISPATCH
+unknown:
+    throw std::runtime_error("Opcode not yet implemented.\n");
+#else
+    default:
+        throw std::runtime_error("Opcode not yet implemented.\n");
+    }
+#endif
+#undef TOP
+#undef FRAME_TOP
+#undef DISPATCH
+#undef LABEL
+}
+
+// Interpret a program translated into register form, return once it reaches a return instruction.
+// Instructions kept in stack form first move the stack pointer to cover every value and then run as they would in interpret.
+uint64_t Interpreter::interpret_registers(void) {
+    uint64_t dst, val, delta;
+#ifdef THREADED_DISPATCH
+    // Label of the code carrying out each opcode, indexed by opcode.
+    void* labels[NUM_REG_OPCODES];
+    uint64_t i;
+
+    for (i = 0; i < NUM_REG_OPCODES; i++)
+        labels[i] = &&unknown;
+    labels[static_cast<uint64_t>(OpCode::CODE)] = &&op_CODE;
+    labels[static_cast<uint64_t>(OpCode::CALL)] = &&op_CALL;
+    labels[static_cast<uint64_t>(OpCode::TAIL_CALL)] = &&op_TAIL_CALL;
+    labels[static_cast<uint64_t>(RegOp::MOVE)] = &&reg_MOVE;
+    labels[static_cast<uint64_t>(RegOp::CAR)] = &&reg_CAR;
+    labels[static_cast<uint64_t>(RegOp::CDR)] = &&reg_CDR;
+    labels[static_cast<uint64_t>(RegOp::GET_FREE)] = &&reg_GET_FREE;
+    labels[static_cast<uint64_t>(RegOp::BRANCH_IF_FALSE)] = &&reg_BRANCH_IF_FALSE;
+    labels[static_cast<uint64_t>(RegOp::BRANCH_IF_TRUE)] = &&reg_BRANCH_IF_TRUE;
+    labels[static_cast<uint64_t>(RegOp::JUMP)] = &&reg_JUMP;
+    labels[static_cast<uint64_t>(RegOp::RET)] = &&reg_RET;
+    labels[static_cast<uint64_t>(RegOp::RETURN)] = &&reg_RETURN;
+#define STACK_FORM_ADDRESS(op, handler, effect) labels[static_cast<uint64_t>(OpCode::op)] = &&op_##op;
+    STACK_FORM_HANDLERS(STACK_FORM_ADDRESS)
+#undef STACK_FORM_ADDRESS
+#define REG_ADDRESS(op, handler) labels[static_cast<uint64_t>(RegOp::op)] = &&reg_##op;
+    UNARY_HANDLERS(REG_ADDRESS)
+    BINARY_HANDLERS(REG_ADDRESS)
+#undef REG_ADDRESS
+
+    // Jump straight from the end of one instruction to the code of the next. Translated code only holds opcodes of the register form and those kept in stack form.
+#define DISPATCH() goto *labels[read_word()]
+#define STACK_LABEL(op) op_##op
+#define REG_LABEL(op) reg_##op
+
+    DISPATCH();
+#else
+    // Go back round the switch after each instruction.
+#define DISPATCH() continue
+#define STACK_LABEL(op) case static_cast<uint64_t>(OpCode::op)
+#define REG_LABEL(op) case static_cast<uint64_t>(RegOp::op)
+
+    while (true) switch (read_word()) {
+#endif
+REG_LABEL(MOVE):
+    // Copy an operand into a slot.
+    dst = read_word();
+    set_slot(dst, operand(read_word()));
+    DISPATCH();
+#define UNARY_LABEL(op, handler) \
+REG_LABEL(op): \
+    dst = read_word(); \
+    set_slot(dst, handler##_value(operand(read_word()))); \
+    DISPATCH();
+    UNARY_HANDLERS(UNARY_LABEL)
+#undef UNARY_LABEL
+#define BINARY_LABEL(op, handler) \
+REG_LABEL(op): \
+    dst = read_word(); \
+    val = operand(read_word()); \
+    set_slot(dst, handler##_value(val, operand(read_word()))); \
+    DISPATCH();
+    BINARY_HANDLERS(BINARY_LABEL)
+#undef BINARY_LABEL
+REG_LABEL(CAR):
+    dst = read_word();
+    set_slot(dst, pair_field(operand(read_word()) >> PAIR_SHIFT, 0));
+    DISPATCH();
+REG_LABEL(CDR):
+    dst = read_word();
+    set_slot(dst, pair_field(operand(read_word()) >> PAIR_SHIFT, 1));
+    DISPATCH();
+REG_LABEL(GET_FREE):
+    // Read free from the running procedure's closure.
+    dst = read_word();
+    set_slot(dst, heap[(current_closure >> CLOSURE_SHIFT) + CLOSURE_LEN + read_word()]);
+    DISPATCH();
+REG_LABEL(BRANCH_IF_FALSE):
+    // Read the value tested before moving the stack pointer, then jump if it is false.
+    val = operand(read_word());
+    stack_ptr += read_word();
+    delta = read_word();
+    if (is_false(val)) pc += delta;
+    DISPATCH();
+REG_LABEL(BRANCH_IF_TRUE):
+    val = operand(read_word());
+    stack_ptr += read_word();
+    delta = read_word();
+    if (!is_false(val)) pc += delta;
+    DISPATCH();
+REG_LABEL(JUMP):
+    stack_ptr += read_word();
+    pc += read_word();
+    DISPATCH();
+REG_LABEL(RET):
+    // Place the return value on top of the stack and return as the stack form does.
+    push(operand(read_word()));
+    ret();
+    DISPATCH();
+REG_LABEL(RETURN):
+    return operand(read_word());
+STACK_LABEL(CODE):
+    stack_ptr += read_word();
+    code_label();
+    DISPATCH();
+STACK_LABEL(CALL):
+    stack_ptr += read_word();
+    call();
+    if (jit.enabled()) run_compiled();
+    DISPATCH();
+STACK_LABEL(TAIL_CALL):
+    stack_ptr += read_word();
+    tail_call();
+    if (jit.enabled()) run_compiled();
+    DISPATCH();
+#define STACK_FORM_LABEL(op, handler, effect) \
+STACK_LABEL(op): \
+    stack_ptr += read_word(); \
+    handler(); \
+    DISPATCH();
+    STACK_FORM_HANDLERS(STACK_FORM_LABEL)
+#undef STACK_FORM_LABEL
+#ifdef THREADED_DISPATCH
+unknown:
+    throw std::runtime_error("Opcode not yet implemented.\n");
+#else
+    default:
+        throw std::runtime_error("Opcode not yet implemented.\n");
+    }
+#endif
+#undef DISPATCH
+#undef STACK_LABEL
+#undef REG_LABEL
+}
+
+#ifdef THREADED_DISPATCH
+#pragma GCC diagnostic pop
+#endif
+
+// Carry out the single instruction at the given location with the given number of values on the stack, as interpret would.
+// Only instructions that neither jump, call nor return can be carried out on their own.
+void Interpreter::step(uint64_t at, uint64_t sp) {
+    uint64_t op;
+
+    pc = at;
+    stack_ptr = sp;
+    op = read_word();
+
+    // The register form follows the opcode with how far to move the stack pointer, which the given number of values already accounts for.
+    if (register_form) pc++;
+
+    switch (static_cast<OpCode>(op)) {
+#define STEP_CASE(op, handler) case OpCode::op: handler(); break;
+#define STACK_FORM_STEP_CASE(op, handler, effect) STEP_CASE(op, handler)
+        BINARY_HANDLERS(STEP_CASE)
+        STACK_FORM_HANDLERS(STACK_FORM_STEP_CASE)
+        STEP_CASE(CODE, code_label)
+#undef STACK_FORM_STEP_CASE
+#undef STEP_CASE
+        default:
+            throw std::runtime_error("Opcode not yet implemented.\n");
+    }
+}
+
+// Run the procedure about to be entered at the program counter in machine code if it has been compiled, compiling it once it has been entered often enough.
+// Procedures it tail calls run the same way. Once compiled code returns, its value replaces the frame as ret leaves it. Otherwise the procedure is left to be interpreted from the program counter.
+void Interpreter::run_compiled(void) {
+    JitCode compiled;
+    uint64_t val;
+
+    while (true) {
+        compiled = jit.code(pc);
+        if (compiled == nullptr && jit.hot(pc)) compiled = compile_procedure(pc);
+        if (compiled == nullptr) return;
+
+        val = compiled(this, stack.data() + base_ptr);
+
+        // Rethrow what compiled code caught, now that nothing unwinds through machine code.
+        if (val == JIT_ERROR_VALUE) std::rethrow_exception(std::exchange(jit_error, nullptr));
+
+        // A tail call has left the callee's arguments at the start of the frame and pointed the program counter at its code.
+        if (val == TAIL_CALL_VALUE) continue;
+
+        // Return to the caller as ret does.
+        stack_ptr = base_ptr;
+        pc = frames.back().return_pc;
+        base_ptr = frames.back().base_ptr;
+        current_closure = frames.back().closure;
+        frames.pop_back();
+        push(val);
+
+        return;
+    }
+}
+
+// Slot of the frame a register form operand counted from the stack pointer names, given where the stack pointer stands in the frame.
+static int64_t frame_slot(uint64_t word, int64_t sp) {
+    return sp + (static_cast<int64_t>(word) >> OPERAND_SHIFT);
+}
+
+// Emit the template of an operation on the value in rax, leaving the result in rax.
+static void emit_unary(MachineCode& m, RegOp op) {
+    switch (op) {
+        case RegOp::ADD1:
+            m.add_constant(Reg::RAX, 1 << FIXNUM_SHIFT);
+            break;
+        case RegOp::SUB1:
+            m.add_constant(Reg::RAX, -(1 << FIXNUM_SHIFT));
+            break;
+        case RegOp::INT_TO_CHAR:
+            m.shift_left(Reg::RAX, CHAR_SHIFT - FIXNUM_SHIFT);
+            m.and_constant(Reg::RAX, ~CHAR_MASK);
+            m.or_constant(Reg::RAX, CHAR_TAG);
+            break;
+        case RegOp::CHAR_TO_INT:
+            m.shift_right(Reg::RAX, CHAR_SHIFT - FIXNUM_SHIFT);
+            m.and_constant(Reg::RAX, ~FIXNUM_MASK);
+            break;
+        case RegOp::IS_NULL:
+            m.and_constant(Reg::RAX, EMPTY_LIST_MASK);
+            m.compare_constant(Reg::RAX, EMPTY_LIST_TAG);
+            m.box_condition(Reg::RAX, Cond::E);
+            break;
+        case RegOp::IS_ZERO:
+            // Only values below 1 << FIXNUM_SHIFT shift down to 0.
+            m.compare_constant(Reg::RAX, 1 << FIXNUM_SHIFT);
+            m.box_condition(Reg::RAX, Cond::B);
+            break;
+        case RegOp::NOT:
+            // False is the only value whose tag and payload make up the tag of a boolean alone.
+            m.compare_constant(Reg::RAX, BOOL_TAG);
+            m.box_condition(Reg::RAX, Cond::E);
+            break;
+        case RegOp::IS_INT:
+            m.and_constant(Reg::RAX, FIXNUM_MASK);
+            m.compare_constant(Reg::RAX, FIXNUM_TAG);
+            m.box_condition(Reg::RAX, Cond::E);
+            break;
+        default:
+            m.and_constant(Reg::RAX, BOOL_MASK);
+            m.compare_constant(Reg::RAX, BOOL_TAG);
+            m.box_condition(Reg::RAX, Cond::E);
+            break;
+    }
+}
+
+// Emit the template of an arithmetic operation or comparison on the values in rax and rcx, leaving the result in rax.
+// Both values are shifted down first, as the functions of values.h do, so comparisons are unsigned.
+static void emit_binary(MachineCode& m, RegOp op) {
+    m.shift_right(Reg::RAX, FIXNUM_SHIFT);
+    m.shift_right(Reg::RCX, FIXNUM_SHIFT);
+
+    switch (op) {
+        case RegOp::PLUS:
+            m.add(Reg::RAX, Reg::RCX);
+            m.shift_left(Reg::RAX, FIXNUM_SHIFT);
+            break;
+        case RegOp::TIMES:
+            m.multiply(Reg::RAX, Reg::RCX);
+            m.shift_left(Reg::RAX, FIXNUM_SHIFT);
+            break;
+        case RegOp::MINUS:
+            m.subtract(Reg::RAX, Reg::RCX);
+            m.shift_left(Reg::RAX, FIXNUM_SHIFT);
+            break;
+        case RegOp::LT:
+            m.compare(Reg::RAX, Reg::RCX);
+            m.box_condition(Reg::RAX, Cond::B);
+            break;
+        case RegOp::GT:
+            m.compare(Reg::RAX, Reg::RCX);
+            m.box_condition(Reg::RAX, Cond::A);
+            break;
+        case RegOp::LEQ:
+            m.compare(Reg::RAX, Reg::RCX);
+            m.box_condition(Reg::RAX, Cond::BE);
+            break;
+        case RegOp::GEQ:
+            m.compare(Reg::RAX, Reg::RCX);
+            m.box_condition(Reg::RAX, Cond::AE);
+            break;
+        default:
+            m.compare(Reg::RAX, Reg::RCX);
+            m.box_condition(Reg::RAX, Cond::E);
+            break;
+    }
+}
 
-        // Read instruction.
-        word = read_word();
+// Emit a check of the value a function of the interpreter returned, leaving through the epilogue with it if it reports an error.
+static void emit_check(MachineCode& m, std::vector<uint64_t>& exits) {
+    m.compare_constant(Reg::RAX, -1);
+    exits.push_back(m.jump_if(Cond::E));
+}
 
-        // Case value to instruction.
-        instr = static_cast<OpCode>(word);
+// Emit machine code loading the value of a register form operand into a register, given where the stack pointer stands in the frame.
+void Interpreter::load_operand(MachineCode& m, Reg reg, uint64_t word, int64_t sp) {
+    switch (word & OPERAND_MASK) {
+        case SLOT_OPERAND:
+            m.load_slot(reg, frame_slot(word, sp));
+            break;
+        case ARG_OPERAND:
+            m.load_slot(reg, word >> OPERAND_SHIFT);
+            break;
+        case STACK_OPERAND:
+            // The stack never moves, but the value in the slot does when collected.
+            m.load_word(reg, stack.data() + (word >> OPERAND_SHIFT));
+            break;
+        default:
+            m.load_constant(reg, immediates[word >> OPERAND_SHIFT]);
+            break;
+    }
+}
 
-        switch (instr) {
-            case OpCode::LOAD64:
-                // Get the next word from the code and push onto the stack.
-                word = read_word();
-                push(word);
-                break;
-            case OpCode::RETURN:
-                // Pop a value from stack and return the value.
-                val = pop();
-                break;
-            case OpCode::ADD1:
-                // Add 1 to the top value on the stack.
-                add1();
-                break;
-            case OpCode::SUB1:
-                // Subtract 1 from top value on stack.
-                sub1();
-                break;
-            case OpCode::INT_TO_CHAR:
-                // Convert to character.
-                int_to_char();
-                break;
-            case OpCode::CHAR_TO_INT:
-                // Convert to integer.
-                char_to_int();
-                break;
-            case OpCode::IS_NULL:
-                // Check if top value on stack is ().
-                is_null();
-                break;
-            case OpCode::IS_ZERO:
-                // Check if value is 0 and push true if so, false otherwise.
-                is_zero();
-                break;
-            case OpCode::NOT:
-                // Convert truthy to falsya dn vice versa.
-                invert();
-                break;
-            case OpCode::IS_INT:
-                // Check if value is an integer and push true if so, false otherwise.
-                is_int();
-                break;
-            case OpCode::IS_BOOL:
-                // Check if value is a boolean and push true if so, false otherwise.
-                is_bool();
-                break;
-            case OpCode::PLUS:
-                // Add values that are currenty on stack. Leave result on stack.
-                plus();
-                break;
-            case OpCode::TIMES:
-                // Multiply values that are currenty on stack. Leave result on stack.
-                times();
-                break;
-            case OpCode::MINUS:
-                // Minus values that are currenty on stack. Leave result on stack.
-                minus();
-                break;
-            case OpCode::LT:
-                // Check that values on stack are in ascending order (top to bottom).
-                less_than();
-                break;
-            case OpCode::GT:
-                // Check that values on stack are in descending order (top to bottom).
-                greater_than();
-                break;
-            case OpCode::LEQ:
-                // Check that values on stack are in non-decreasing order (top to bottom).
-                less_than_equal();
-                break;
-            case OpCode::GEQ:
-                // Check that values on stack are in non-increasing order (top to bottom).
-                greater_than_equal();
-                break;
-            case OpCode::EQ:
-                // Check that values on stack are equal to one another.
-                equal();
-                break;
-            case OpCode::POP_JUMP_IF_FALSE:
-                // Check top value on stack and direct control accordingly.
-                pop_jump_if_false();
-                break;
-            case OpCode::JUMP_OVER_ELSE:
-                // Jump over alternate if condition was satisfied.
-                jump_over_else();
-                break;
-            case OpCode::PUSH_LET:
-                // Load given value from stack into environment.
-                push_let();
-                break;
-            case OpCode::END_LET:
-                // Clean up environment associated with binding.
-                end_let();
+// Compile the procedure entered at the given location of the register form into machine code, stitching together a template for each instruction.
+// Values stay in the slots of the frame, whose stack pointer stands at a depth known at every instruction, so only instructions that allocate, read the heap or call go through the interpreter.
+// Returns nullptr, leaving the procedure to be interpreted, if it holds an instruction without a template.
+JitCode Interpreter::compile_procedure(uint64_t entry) {
+    MachineCode m;
+    std::map<uint64_t, int64_t> depths;
+    std::map<uint64_t, uint64_t> placed;
+    std::vector<std::pair<uint64_t, uint64_t>> jumps;
+    std::vector<uint64_t> exits;
+    uint64_t p, end, n, num_args, start, target, i;
+    int64_t sp;
+
+#ifndef __x86_64__
+    return nullptr;
+#endif
+
+    // The code follows the procedure's CODE instruction, which gives its length and the number of arguments it takes.
+    end = entry + code[entry - 3];
+    num_args = code[entry - 2];
+
+    m.prologue();
+    start = m.size();
+    sp = num_args;
+
+    for (p = entry; p < end; p += n) {
+        // Wherever control arrives by a jump the stack pointer stands where the jump left it.
+        if (depths.contains(p)) sp = depths[p];
+        placed[p] = m.size();
+
+        switch (code[p]) {
+            case static_cast<uint64_t>(RegOp::MOVE):
+                load_operand(m, Reg::RAX, code[p + 2], sp);
+                m.store_slot(frame_slot(code[p + 1], sp), Reg::RAX);
+                n = 3;
                 break;
-            case OpCode::CONS:
-                // Create cons cell on heap.
-                create_cons();
-                break;
-            case OpCode::CAR:
-                // Pull first value in corresponding cons cell.
-                car();
-                break;
-            case OpCode::CDR:
-                // Get second value from corresponding cons cell.
-                cdr();
-                break;
-            case OpCode::STR:
-                // Place string contents onto heap.
-                create_str();
-                break;
-            case OpCode::STR_REF:
-                // Get character from string.
-                str_ref();
-                break;
-            case OpCode::STR_SET:
-                // Set character in string.
-                str_set();
-                break;
-            case OpCode::STR_APP:
-                // Concatenate strings.
-                str_append();
-                break;
-            case OpCode::VEC:
-                // Place vector contents onto heap.
-                create_vec();
-                break;
-            case OpCode::VEC_REF:
-                // Get character from vectors.
-                vec_ref();
-                break;
-            case OpCode::VEC_SET:
-                // Set character in vectors.
-                vec_set();
-                break;
-            case OpCode::VEC_APP:
-                // Concatenate vectors.
-                vec_append();
-                break;
-            case OpCode::BEG:
-                // Clean up stack and place return value on top.
-                begin();
-                break;
-            case OpCode::CODE:
-                // Create an entry in the environment for the label.
-                code_label();
-                break;
-            case OpCode::CLOSURE:
-                // Place closure object onto stack.
-                closure();
-                break;
-            case OpCode::CALL:
-                // Call procedure.
-                call();
-                break;
-            case OpCode::RET:
-                // Clean up after function execution.
-                ret();
+#define UNARY_CASE(op, handler) case static_cast<uint64_t>(RegOp::op):
+            UNARY_HANDLERS(UNARY_CASE)
+#undef UNARY_CASE
+                load_operand(m, Reg::RAX, code[p + 2], sp);
+                emit_unary(m, static_cast<RegOp>(code[p]));
+                m.store_slot(frame_slot(code[p + 1], sp), Reg::RAX);
+                n = 3;
                 break;
-            case OpCode::GET_ARG:
-                // Get argument onto stack.
-                get_arg();
+            case static_cast<uint64_t>(RegOp::PLUS):
+            case static_cast<uint64_t>(RegOp::TIMES):
+            case static_cast<uint64_t>(RegOp::MINUS):
+            case static_cast<uint64_t>(RegOp::LT):
+            case static_cast<uint64_t>(RegOp::GT):
+            case static_cast<uint64_t>(RegOp::LEQ):
+            case static_cast<uint64_t>(RegOp::GEQ):
+            case static_cast<uint64_t>(RegOp::EQ):
+                load_operand(m, Reg::RAX, code[p + 2], sp);
+                load_operand(m, Reg::RCX, code[p + 3], sp);
+                emit_binary(m, static_cast<RegOp>(code[p]));
+                m.store_slot(frame_slot(code[p + 1], sp), Reg::RAX);
+                n = 4;
                 break;
-            case OpCode::GET_FREE:
-                // GEt free variable onto stack.
-                get_free();
+            case static_cast<uint64_t>(RegOp::VEC_REF):
+            case static_cast<uint64_t>(RegOp::STR_REF):
+            case static_cast<uint64_t>(RegOp::VEC_REF_UNCHECKED):
+            case static_cast<uint64_t>(RegOp::STR_REF_UNCHECKED):
+                load_operand(m, Reg::RDX, code[p + 2], sp);
+                load_operand(m, Reg::RCX, code[p + 3], sp);
+                m.load_constant(Reg::RSI, code[p]);
+                m.call(reinterpret_cast<const void*>(&Interpreter::jit_index));
+                emit_check(m, exits);
+                m.store_slot(frame_slot(code[p + 1], sp), Reg::RAX);
+                n = 4;
                 break;
-            case OpCode::SET_FREES:
-                // Set free variable alues in closure object.
-                set_frees();
+            case static_cast<uint64_t>(RegOp::CAR):
+            case static_cast<uint64_t>(RegOp::CDR):
+                load_operand(m, Reg::RSI, code[p + 2], sp);
+                m.load_constant(Reg::RDX, code[p] == static_cast<uint64_t>(RegOp::CAR) ? 0 : 1);
+                m.call(reinterpret_cast<const void*>(&Interpreter::jit_pair_field));
+                m.store_slot(frame_slot(code[p + 1], sp), Reg::RAX);
+                n = 3;
                 break;
-            case OpCode::CONST_REF:
-                // Get heap location of referneced constant onto top of stack.
-                const_ref();
+            case static_cast<uint64_t>(RegOp::GET_FREE):
+                m.load_constant(Reg::RSI, code[p + 2]);
+                m.call(reinterpret_cast<const void*>(&Interpreter::jit_get_free));
+                m.store_slot(frame_slot(code[p + 1], sp), Reg::RAX);
+                n = 3;
                 break;
-            case OpCode::CONST_INIT:
-                // Increment base pointer by 1.
-                const_init();
+            case static_cast<uint64_t>(RegOp::BRANCH_IF_FALSE):
+            case static_cast<uint64_t>(RegOp::BRANCH_IF_TRUE):
+                // False is the only value equal to the tag of a boolean alone.
+                load_operand(m, Reg::RAX, code[p + 1], sp);
+                sp += static_cast<int64_t>(code[p + 2]);
+                target = p + 4 + code[p + 3];
+                m.compare_constant(Reg::RAX, BOOL_TAG);
+                jumps.push_back({m.jump_if(code[p] == static_cast<uint64_t>(RegOp::BRANCH_IF_FALSE) ? Cond::E : Cond::NE), target});
+                depths[target] = sp;
+                n = 4;
                 break;
-            case OpCode::TAIL_CALL:
-                tail_call();
+            case static_cast<uint64_t>(RegOp::JUMP):
+                sp += static_cast<int64_t>(code[p + 1]);
+                target = p + 3 + code[p + 2];
+                jumps.push_back({m.jump(), target});
+                depths[target] = sp;
+                n = 3;
                 break;
-            case OpCode::SYMBOL:
-                symbol();
+            case static_cast<uint64_t>(RegOp::RET):
+                load_operand(m, Reg::RAX, code[p + 1], sp);
+                exits.push_back(m.jump());
+                n = 2;
                 break;
-            case OpCode::JUMP_IF_FALSE:
-                jump_if_false();
+            case static_cast<uint64_t>(OpCode::CALL):
+                // The value replaces the arguments and the closure below them.
+                sp += static_cast<int64_t>(code[p + 1]);
+                m.load_constant(Reg::RSI, sp - 1);
+                m.load_constant(Reg::RDX, code[p + 2]);
+                m.call(reinterpret_cast<const void*>(&Interpreter::jit_call));
+                emit_check(m, exits);
+                sp -= static_cast<int64_t>(code[p + 2]);
+                m.store_slot(sp - 1, Reg::RAX);
+                n = 3;
                 break;
-            case OpCode::POP:
-                pop();
+            case static_cast<uint64_t>(OpCode::TAIL_CALL):
+                // A procedure calling itself starts over in place, and any other is left to the caller to run.
+                sp += static_cast<int64_t>(code[p + 1]);
+                m.load_constant(Reg::RSI, sp - 1);
+                m.load_constant(Reg::RDX, code[p + 2]);
+                m.call(reinterpret_cast<const void*>(&Interpreter::jit_tail_call));
+                emit_check(m, exits);
+                if (entry <= INT32_MAX) {
+                    m.compare_constant(Reg::RAX, static_cast<int32_t>(entry));
+                    jumps.push_back({m.jump_if(Cond::E), entry});
+                }
+                m.load_constant(Reg::RAX, TAIL_CALL_VALUE);
+                exits.push_back(m.jump());
+                n = 3;
                 break;
-            case OpCode::JUMP_IF_TRUE:
-                jump_if_true();
+#define STACK_FORM_CASE(op, handler, effect) case static_cast<uint64_t>(OpCode::op):
+            STACK_FORM_HANDLERS(STACK_FORM_CASE)
+#undef STACK_FORM_CASE
+                // Constants are only initialized by the program's own code, which moves the base pointer.
+                if (code[p] == static_cast<uint64_t>(OpCode::CONST_INIT)) return nullptr;
+
+                sp += static_cast<int64_t>(code[p + 1]);
+                m.load_constant(Reg::RSI, p);
+                m.load_constant(Reg::RDX, sp);
+                m.call(reinterpret_cast<const void*>(&Interpreter::jit_step));
+                emit_check(m, exits);
+                sp += stack_effect(code, p, p + 2);
+                n = 2 + num_operands(code[p]);
                 break;
             default:
-                throw std::runtime_error("Opcode not yet implemented.\n");
-                break;
+                return nullptr;
         }
-    } while (instr != OpCode::RETURN);
+    }
 
-    return val;
+    // Returns, errors and tail calls to other procedures leave through the epilogue with their value in rax.
+    for (i = 0; i < exits.size(); i++)
+        m.patch(exits[i], m.size());
+    m.epilogue();
+
+    // Jumps go to the machine code of the instruction jumped to, a procedure calling itself to the start of its body.
+    placed[entry] = start;
+    for (i = 0; i < jumps.size(); i++) {
+        if (!placed.contains(jumps[i].second)) return nullptr;
+        m.patch(jumps[i].first, placed[jumps[i].second]);
+    }
+
+    return jit.install(entry, m);
+}
+
+// Call the closure in the given slot of the running frame with the given number of arguments below it on behalf of compiled code and return its value.
+// The callee runs in machine code if it has been compiled and is otherwise interpreted until it returns to compiled code.
+uint64_t Interpreter::call_from_compiled(uint64_t top, uint64_t num_args) {
+    uint64_t closure;
+    uint8_t here;
+
+    // Each call from compiled code nests on the C stack, which must not run out.
+    if (reinterpret_cast<uintptr_t>(&here) < jit_stack_floor) throw std::runtime_error("Stack overflow.\n");
+
+    // Enter the callee as call does, with the frame returning to where compiled code takes its value back.
+    top += base_ptr;
+    closure = stack[top] >> CLOSURE_SHIFT;
+    if (heap[closure + 1] != num_args) throw std::runtime_error("Wrong number of arguments.\n");
+    frames.push_back({return_to_compiled, base_ptr, current_closure});
+    current_closure = stack[top];
+    stack_ptr = top;
+    base_ptr = stack_ptr - num_args;
+    check_frame(heap[closure + 2]);
+    pc = heap[closure];
+
+    run_compiled();
+    if (pc == return_to_compiled) return stack[stack_ptr - 1];
+
+    return interpret_registers();
+}
+
+// Tail call the closure in the given slot of the running frame on behalf of compiled code, as tail_call does, and return the entry point of its code.
+uint64_t Interpreter::tail_call_from_compiled(uint64_t top, uint64_t num_args) {
+    uint64_t closure;
+
+    top += base_ptr;
+    current_closure = stack[top];
+    closure = current_closure >> CLOSURE_SHIFT;
+    if (heap[closure + 1] != num_args) throw std::runtime_error("Wrong number of arguments.\n");
+
+    std::copy_n(stack.begin() + (top - num_args), num_args, stack.begin() + base_ptr);
+    stack_ptr = base_ptr + num_args;
+    check_frame(heap[closure + 2]);
+    pc = heap[closure];
+
+    return pc;
+}
+
+// Run part of an instruction on behalf of compiled code, keeping what it throws and returning JIT_ERROR_VALUE in its place.
+template <typename Body>
+static uint64_t guarded(std::exception_ptr& error, Body body) {
+    try {
+        return body();
+    }
+    catch (...) {
+        error = std::current_exception();
+        return JIT_ERROR_VALUE;
+    }
+}
+
+// Call a closure on behalf of compiled code.
+uint64_t Interpreter::jit_call(Interpreter* vm, uint64_t top, uint64_t num_args) {
+    return guarded(vm->jit_error, [vm, top, num_args]() { return vm->call_from_compiled(top, num_args); });
+}
+
+// Tail call a closure on behalf of compiled code.
+uint64_t Interpreter::jit_tail_call(Interpreter* vm, uint64_t top, uint64_t num_args) {
+    return guarded(vm->jit_error, [vm, top, num_args]() { return vm->tail_call_from_compiled(top, num_args); });
+}
+
+// Carry out an instruction kept in stack form with the given number of values in the running frame.
+uint64_t Interpreter::jit_step(Interpreter* vm, uint64_t at, uint64_t sp) {
+    return guarded(vm->jit_error, [vm, at, sp]() {
+        vm->step(at, vm->base_ptr + sp);
+        return (uint64_t)0;
+    });
+}
+
+// Get the item at an index of a vector or string.
+uint64_t Interpreter::jit_index(Interpreter* vm, uint64_t op, uint64_t obj, uint64_t ind) {
+    return guarded(vm->jit_error, [vm, op, obj, ind]() {
+        switch (static_cast<RegOp>(op)) {
+            case RegOp::VEC_REF:
+                return vm->vec_ref_value(obj, ind);
+            case RegOp::STR_REF:
+                return vm->str_ref_value(obj, ind);
+            case RegOp::VEC_REF_UNCHECKED:
+                return vm->vec_ref_unchecked_value(obj, ind);
+            default:
+                return vm->str_ref_unchecked_value(obj, ind);
+        }
+    });
+}
+
+// Get car (field 0) or cdr (field 1) of a pair.
+uint64_t Interpreter::jit_pair_field(Interpreter* vm, uint64_t pair, uint64_t field) {
+    return vm->pair_field(pair >> PAIR_SHIFT, field);
+}
+
+// Get free of the running procedure's closure.
+uint64_t Interpreter::jit_get_free(Interpreter* vm, uint64_t ind) {
+    return vm->heap[(vm->current_closure >> CLOSURE_SHIFT) + CLOSURE_LEN + ind];
 }
 
 // Prints out value returned by interpreter.
@@ -373,14 +2418,14 @@ void Interpreter::print_val(uint64_t val, std::ostream*& output) {
     else if ((val & EMPTY_LIST_MASK) == EMPTY_LIST_TAG) *output << "()";
     else if ((val & PAIR_MASK) == PAIR_TAG) {
         *output << "(";
-        print_val(heap[val >> PAIR_SHIFT], output);
+        print_val(pair_field(val >> PAIR_SHIFT, 0), output);
         *output << " . ";
-        print_val(heap[(val >> PAIR_SHIFT) + 1], output);
+        print_val(pair_field(val >> PAIR_SHIFT, 1), output);
         *output << ")";
     }
     else if ((val & STR_MASK) == STR_TAG) {
         *output << "\"";
-        for (i = heap[val >> STR_SHIFT]; i >= 1; i--) *output << static_cast<char>(heap[(val >> STR_SHIFT) + i]);
+        output->write(reinterpret_cast<char*>(str_chars(val >> STR_SHIFT)), heap[val >> STR_SHIFT]);
         *output << "\"";
     }
     else if ((val & VEC_MASK) == VEC_TAG) {
@@ -403,31 +2448,37 @@ void Interpreter::print_val(uint64_t val, std::ostream*& output) {
 }
 
 // Get instruction from stack.
-uint64_t Interpreter::read_word(void) {
+HANDLER uint64_t Interpreter::read_word(void) {
     return code[pc++];
 }
 
-// Push value onto stack.
-void Interpreter::push(uint64_t val) {
-    // Check if stack is sufficiently large.
-    if (stack.size() > stack_ptr) stack[stack_ptr] = val;
-    else stack.push_back(val);
-    stack_ptr++;
+// Push value onto stack. The current frame was checked to fit on entry, so there is room.
+HANDLER void Interpreter::push(uint64_t val) {
+    stack[stack_ptr++] = val;
 }
 
 // Pop value from stack.
-uint64_t Interpreter::pop(void) {
-    uint64_t val;
+HANDLER uint64_t Interpreter::pop(void) {
+    return stack[--stack_ptr];
+}
 
-    if (stack.size() > stack_ptr) val = stack[stack_ptr - 1];
-    else {
-        val = stack.back();
-        stack.pop_back();
+// Read the value of an operand of a register form instruction.
+HANDLER uint64_t Interpreter::operand(uint64_t word) {
+    switch (word & OPERAND_MASK) {
+        case SLOT_OPERAND:
+            return stack[stack_ptr + (static_cast<int64_t>(word) >> OPERAND_SHIFT)];
+        case ARG_OPERAND:
+            return stack[base_ptr + (word >> OPERAND_SHIFT)];
+        case STACK_OPERAND:
+            return stack[word >> OPERAND_SHIFT];
+        default:
+            return immediates[word >> OPERAND_SHIFT];
     }
+}
 
-    stack_ptr--;
-
-    return val;
+// Write a value into the slot a register form instruction names, counted from the stack pointer.
+HANDLER void Interpreter::set_slot(uint64_t word, uint64_t val) {
+    stack[stack_ptr + (static_cast<int64_t>(word) >> OPERAND_SHIFT)] = val;
 }
 
 // Print current state of the stack.
@@ -446,235 +2497,224 @@ void Interpreter::inspect_stack(void) {
 }
 
 // Add 1 to the top value on the stack.
-void Interpreter::add1(void) {
-    // Add 4 due to shift.
-    stack.back() += 4;
+HANDLER void Interpreter::add1(void) {
+    stack[stack_ptr - 1] = add1_value(stack[stack_ptr - 1]);
 }
 
 // Subtract 1 from the top value on the stack.
-void Interpreter::sub1(void) {
-    // Subtract 4 due to shift.
-    stack.back() -= 4;
+HANDLER void Interpreter::sub1(void) {
+    stack[stack_ptr - 1] = sub1_value(stack[stack_ptr - 1]);
 }
 
 // Convert top valeu on stack from integer to character by adjusting tag.
-void Interpreter::int_to_char(void) {
-    // Shift and retag.
-    stack.back() <<= (CHAR_SHIFT - FIXNUM_SHIFT);
-    stack.back() &= ~CHAR_MASK;
-    stack.back() |= CHAR_TAG;
+HANDLER void Interpreter::int_to_char(void) {
+    stack[stack_ptr - 1] = int_to_char_value(stack[stack_ptr - 1]);
 }
 
 // Convert top valeu on stack from character to integer by adjusting tag.
-void Interpreter::char_to_int(void) {
-    // Shift and retag.
-    stack.back() >>= (CHAR_SHIFT - FIXNUM_SHIFT);
-    stack.back() &= ~FIXNUM_MASK;
-    stack.back() |= FIXNUM_TAG;
+HANDLER void Interpreter::char_to_int(void) {
+    stack[stack_ptr - 1] = char_to_int_value(stack[stack_ptr - 1]);
 }
 
 // Check if top value on stack is 0.
-void Interpreter::is_zero(void) {
-    // If top value is 0, convert to true, else convert to false.
-    if (stack.back() >> FIXNUM_SHIFT == 0)
-        stack.back() = ((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
-    else
-        stack.back() = ((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+HANDLER void Interpreter::is_zero(void) {
+    stack[stack_ptr - 1] = is_zero_value(stack[stack_ptr - 1]);
 }
 
 // Check if top value on stack is ().
-void Interpreter::is_null(void) {
-    // If top value is (), convert to true, else convert to false.
-    if ((stack.back() & EMPTY_LIST_MASK) == EMPTY_LIST_TAG)
-        stack.back() = ((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
-    else
-        stack.back() = ((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+HANDLER void Interpreter::is_null(void) {
+    stack[stack_ptr - 1] = is_null_value(stack[stack_ptr - 1]);
 }
 
 // Converts top value on stack to falsy if truthy and to truthy if falsy.
-void Interpreter::invert(void) {
-    // The boolean value false is the onl true false value.
-    if (((stack.back() & BOOL_MASK) == BOOL_TAG) && ((stack.back() >> BOOL_SHIFT) == 0))
-        stack.back() = ((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
-    else
-        stack.back() = ((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+HANDLER void Interpreter::invert(void) {
+    stack[stack_ptr - 1] = invert_value(stack[stack_ptr - 1]);
 }
 
 // Check if top value on stack is integer.
-void Interpreter::is_int(void) {
-    // If top value is an integer, convert to true, else convert to false.
-    if ((stack.back() & FIXNUM_MASK) == FIXNUM_TAG)
-        stack.back() = ((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
-    else
-        stack.back() = ((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+HANDLER void Interpreter::is_int(void) {
+    stack[stack_ptr - 1] = is_int_value(stack[stack_ptr - 1]);
 }
 
 // Check if top value on stack is boolean.
-void Interpreter::is_bool(void) {
-    // If top value is a boolean, convert to true, else convert to false.
-    if ((stack.back() & BOOL_MASK) == BOOL_TAG)
-        stack.back() = ((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
-    else
-        stack.back() = ((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+HANDLER void Interpreter::is_bool(void) {
+    stack[stack_ptr - 1] = is_bool_value(stack[stack_ptr - 1]);
 }
 
 // Add values on stack leaving result on stack.
-void Interpreter::plus(void) {
-    uint64_t val;
+HANDLER void Interpreter::plus(void) {
+    uint64_t val_1, val_2;
 
-    // Pop two values off stack and add them.
-    val = pop() >> FIXNUM_SHIFT;
-    val += pop() >> FIXNUM_SHIFT;
+    // Pop two values off of stack.
+    val_1 = pop();
+    val_2 = pop();
 
-    // Push result bakc onto stack.
-    push(((val << FIXNUM_SHIFT) & ~FIXNUM_MASK) | FIXNUM_TAG);
+    // Push result onto stack.
+    push(plus_value(val_2, val_1));
 }
 
 // Multiply values on stack leaving result on stack.
-void Interpreter::times(void) {
-    uint64_t val;
+HANDLER void Interpreter::times(void) {
+    uint64_t val_1, val_2;
 
-    // Pop two values off stack and multiply them.
-    val = pop() >> FIXNUM_SHIFT;
-    val *= pop() >> FIXNUM_SHIFT;
+    // Pop two values off of stack.
+    val_1 = pop();
+    val_2 = pop();
 
-    // Push result bakc onto stack.
-    push(((val << FIXNUM_SHIFT) & ~FIXNUM_MASK) | FIXNUM_TAG);
+    // Push result onto stack.
+    push(times_value(val_2, val_1));
 }
 
 // Subtract values on stack leaving result on stack.
-void Interpreter::minus(void) {
-    uint64_t val_1, val_2, val;
+HANDLER void Interpreter::minus(void) {
+    uint64_t val_1, val_2;
 
-    // Pop two values off stack and subtract them.
-    val_1 = pop() >> FIXNUM_SHIFT;
-    val_2 = pop() >> FIXNUM_SHIFT;
-    val = val_2 - val_1;
+    // Pop two values off of stack.
+    val_1 = pop();
+    val_2 = pop();
 
-    // Push result bakc onto stack.
-    push(((val << FIXNUM_SHIFT) & ~FIXNUM_MASK) | FIXNUM_TAG);
+    // Push result onto stack.
+    push(minus_value(val_2, val_1));
 }
 
 // Check that values on stack are in ascending order (top to bottom). Place truthy on stack if so.
-void Interpreter::less_than(void) {
+HANDLER void Interpreter::less_than(void) {
     uint64_t val_1, val_2;
 
     // Pop two values off of stack.
-    val_1 = pop() >> FIXNUM_SHIFT;
-    val_2 = pop() >> FIXNUM_SHIFT;
+    val_1 = pop();
+    val_2 = pop();
 
-    // Compare values and push result onto stack.
-    if (val_2 < val_1) push(((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
-    else push(((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
+    // Push result onto stack.
+    push(less_than_value(val_2, val_1));
 }
 
 // Check that values on stack are in descending order (top to bottom). Place truthy on stack if so.
-void Interpreter::greater_than(void) {
+HANDLER void Interpreter::greater_than(void) {
     uint64_t val_1, val_2;
 
     // Pop two values off of stack.
-    val_1 = pop() >> FIXNUM_SHIFT;
-    val_2 = pop() >> FIXNUM_SHIFT;
+    val_1 = pop();
+    val_2 = pop();
 
-    // Compare values and push result onto stack.
-    if (val_2 > val_1) push(((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
-    else push(((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
+    // Push result onto stack.
+    push(greater_than_value(val_2, val_1));
 }
 
 // Check that values on stack are in non-decreasing order (top to bottom). Place truthy on stack if so.
-void Interpreter::less_than_equal(void) {
+HANDLER void Interpreter::less_than_equal(void) {
     uint64_t val_1, val_2;
 
     // Pop two values off of stack.
-    val_1 = pop() >> FIXNUM_SHIFT;
-    val_2 = pop() >> FIXNUM_SHIFT;
-
-    // Compare values and push result onto stack.
-    if (val_2 <= val_1) push(((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
-    else push(((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
+    val_1 = pop();
+    val_2 = pop();
 
+    // Push result onto stack.
+    push(less_than_equal_value(val_2, val_1));
 }
 
 // Check that values on stack are in non-increasing order (top to bottom). Place truthy on stack if so.
-void Interpreter::greater_than_equal(void) {
+HANDLER void Interpreter::greater_than_equal(void) {
     uint64_t val_1, val_2;
 
     // Pop two values off of stack.
-    val_1 = pop() >> FIXNUM_SHIFT;
-    val_2 = pop() >> FIXNUM_SHIFT;
-
-    // Compare values and push result onto stack.
-    if (val_2 >= val_1) push(((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
-    else push(((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
+    val_1 = pop();
+    val_2 = pop();
 
+    // Push result onto stack.
+    push(greater_than_equal_value(val_2, val_1));
 }
 
 // Check that values on stack are equal. Place truthy on stack if so.
-void Interpreter::equal(void) {
+HANDLER void Interpreter::equal(void) {
     uint64_t val_1, val_2;
 
     // Pop two values off of stack.
-    val_1 = pop() >> FIXNUM_SHIFT;
-    val_2 = pop() >> FIXNUM_SHIFT;
+    val_1 = pop();
+    val_2 = pop();
 
-    // Compare values and push result onto stack.
-    if (val_2 == val_1) push(((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
-    else push(((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG);
+    // Push result onto stack.
+    push(equal_value(val_2, val_1));
 }
 
 // Move to alternate if test was satisfied.
-void Interpreter::pop_jump_if_false(void) {
+HANDLER void Interpreter::pop_jump_if_false(void) {
     uint64_t val;
 
     val = pop();
 
     // If false on top of stack, jump over consequent; else just mvoe past offset.
-    if (((val & BOOL_MASK) == BOOL_TAG) && (val >> BOOL_SHIFT == 0)) pc += read_word();
+    if (is_false(val)) pc += read_word();
     else pc += 1;
 }
 
 // Move past alternate if test was not satisfied.
-void Interpreter::jump_over_else(void) {
+HANDLER void Interpreter::jump_over_else(void) {
     // Increment porgram counter by given amount.
     pc += read_word();
 }
 
 // Get a value from the environment mapping onto top of stack.
-void Interpreter::push_let(void) {
+HANDLER void Interpreter::push_let(void) {
     // Push value from given index of environment onto stack.
     push(stack[stack_ptr - read_word()]);
 }
 
 // Clean up binding's stack variables.
-void Interpreter::end_let(void) {
-    uint64_t num_to_pop, i, val;
-
-    // Number of bindings to clear off stack.
-    num_to_pop = read_word();
+HANDLER void Interpreter::end_let(void) {
+    uint64_t val;
 
     // Save value to keep on top of stack.
     val = pop();
 
-    for (i = 0; i < num_to_pop; i++) pop();
+    // Clear bindings off stack at once.
+    stack_ptr -= read_word();
 
     push(val);
 }
 
 // Create cons cell.
-void Interpreter::create_cons(void) {
+HANDLER void Interpreter::create_cons(void) {
+    uint64_t loc;
+
+#ifdef COMPRESSED_REFS
+    // Pack both values into one word when they fit.
+    if (fits_compressed(stack[stack_ptr - 1]) && fits_compressed(stack[stack_ptr - 2])) {
+        loc = allocate(PAIR_TAG, 1);
+        heap[loc] = pack_pair(stack[stack_ptr - 1], stack[stack_ptr - 2]);
+        stack_ptr -= 2;
+        push(((loc << PAIR_SHIFT) & ~PAIR_MASK) | PAIR_TAG);
+        return;
+    }
+#endif
+
+    // Allocate before popping so that a collection sees both values.
+    loc = allocate(PAIR_TAG, 2);
+
     // Pop values off stack and place onto heap.
-    heap.push_back(pop());
-    heap.push_back(pop());
+    heap[loc] = pop();
+    heap[loc + 1] = pop();
 
     // Place cons cell's heap location onto stack.
-    push(((heap_ptr << PAIR_SHIFT) & ~PAIR_MASK) | PAIR_TAG);
-
-    // Increment heap pointer.
-    heap_ptr += 2;
+    push(((loc << PAIR_SHIFT) & ~PAIR_MASK) | PAIR_TAG);
 }
 
 // Place first value in corresponding cons cell onto stack.
-void Interpreter::car(void) {
+// Get car (field 0) or cdr (field 1) of pair at given heap location.
+uint64_t Interpreter::pair_field(uint64_t loc, uint64_t field) {
+#ifdef COMPRESSED_REFS
+    // Pairs in the constant pool have no header and are never packed.
+    // Cells other than the first of a run are preceded by a cell coded cdr-next rather than a header.
+    if (loc >= pool_end && !cdr_next(cdr_codes, loc - 1) && (heap[loc - 1] >> OBJECT_SHIFT) == 1) return unpack_half(heap[loc], field);
+#endif
+
+    // The cdr of a cell coded cdr-next is the cell after it.
+    if (field == 1 && cdr_next(cdr_codes, loc)) return (((loc + 1) << PAIR_SHIFT) & ~PAIR_MASK) | PAIR_TAG;
+
+    return heap[loc + field];
+}
+
+HANDLER void Interpreter::car(void) {
     uint64_t cons, heap_ind;
 
     // Read value of corresponding cons cell from stack.
@@ -684,11 +2724,11 @@ void Interpreter::car(void) {
     heap_ind = cons >> PAIR_SHIFT;
 
     // Push car value onto stack.
-    push(heap[heap_ind]);
+    push(pair_field(heap_ind, 0));
 }
 
 // Place second value in corresponding cons cell onto stack.
-void Interpreter::cdr(void) {
+HANDLER void Interpreter::cdr(void) {
     uint64_t cons, heap_ind;
 
     // Read value of corresponding cons cell from stack.
@@ -697,39 +2737,43 @@ void Interpreter::cdr(void) {
     // Extract heap location.
     heap_ind = cons >> PAIR_SHIFT;
 
-    // Push car value onto stack.
-    push(heap[heap_ind + 1]);
+    // Push cdr value onto stack.
+    push(pair_field(heap_ind, 1));
+}
+
+// Get first character of string at given heap location.
+uint8_t* Interpreter::str_chars(uint64_t str_loc) {
+    return reinterpret_cast<uint8_t*>(heap.data() + str_loc + 1);
 }
 
 // Place string contents onto heap and address of string onto stack.
-void Interpreter::create_str(void) {
-    uint64_t len, i;
+HANDLER void Interpreter::create_str(void) {
+    uint64_t len, i, loc;
+    uint8_t* chars;
 
     // Get string length.
     len = read_word();
 
-    // Place length onto heap.
-    heap.push_back(len);
+    // Place length and room for packed characters onto heap.
+    loc = allocate(STR_TAG, 1 + STR_WORDS(len));
+    heap[loc] = len;
 
-    // Place characters onto heap.
-    for (i = 0; i < len; i++) heap.push_back(pop() >> CHAR_SHIFT);
+    // Clear padding, then place characters. Last character is on top of stack.
+    heap[loc + STR_WORDS(len)] = 0;
+    chars = str_chars(loc);
+    for (i = len; i > 0; i--) chars[i - 1] = pop() >> CHAR_SHIFT;
 
     // Place location of string in heap onto stack.
-    push(((heap_ptr << STR_SHIFT) & ~STR_MASK) | STR_TAG);
-
-    // Advance heap ppinter.
-    heap_ptr += (len + 1);
+    push(((loc << STR_SHIFT) & ~STR_MASK) | STR_TAG);
 }
 
-// Place character at given location on top of stack.
-void Interpreter::str_ref(void) {
+// Get character at given index of string.
+HANDLER uint64_t Interpreter::str_ref_value(uint64_t str, uint64_t ind) {
     uint64_t loc, str_loc, val, len;
 
-    // Get location off the top of the stack.
-    loc = pop() >> FIXNUM_SHIFT;
-
-    // Get string location off the stack.
-    str_loc = pop() >> STR_SHIFT;
+    // Get location and string location.
+    loc = ind >> FIXNUM_SHIFT;
+    str_loc = str >> STR_SHIFT;
 
     // Get length of string.
     len = heap[str_loc];
@@ -737,14 +2781,25 @@ void Interpreter::str_ref(void) {
     // Ensure location is within string.
     if (loc >= len) throw std::runtime_error("Invalid index.\n");
 
-    // Set character at location and place onto stack.
-    val = heap[str_loc + len - loc];
+    // Get character at location.
+    val = str_chars(str_loc)[loc];
+
+    return ((val << CHAR_SHIFT) & ~CHAR_MASK) | CHAR_TAG;
+}
 
-    push(((val << CHAR_SHIFT) & ~CHAR_MASK) | CHAR_TAG);
+// Place character at given location on top of stack.
+HANDLER void Interpreter::str_ref(void) {
+    uint64_t val_1, val_2;
+
+    // Pop location and string off of stack.
+    val_1 = pop();
+    val_2 = pop();
+
+    push(str_ref_value(val_2, val_1));
 }
 
 // Set character at given location to given value and place string location on top of stack.
-void Interpreter::str_set(void) {
+HANDLER void Interpreter::str_set(void) {
     uint64_t loc, str_loc, val, len;
 
     // Get character value from stack.
@@ -762,71 +2817,69 @@ void Interpreter::str_set(void) {
     // Ensure location is within string.
     if (loc >= len) throw std::runtime_error("Invalid index.\n");
 
+    // Constants are read-only.
+    if (str_loc < pool_end) throw std::runtime_error("Cannot modify constant.\n");
+
     // Set character at location and place onto stack.
-    heap[str_loc + len - loc] = val;
+    str_chars(str_loc)[loc] = val;
 
     // Place string's heap value back onto stack.
     push(((str_loc << STR_SHIFT) & ~STR_MASK) | STR_TAG);
 }
 
 // Create new string which is a single string appended to another.
-void Interpreter::str_append(void) {
-    uint64_t str_loc_1, str_loc_2, i, tot_len, len_1, len_2;
-
-    // Pull strings' heap locations off of stack.
-    str_loc_2 = pop() >> STR_SHIFT;
-    str_loc_1 = pop() >> STR_SHIFT;
+HANDLER void Interpreter::str_append(void) {
+    uint64_t str_loc_1, str_loc_2, tot_len, len_1, len_2, loc;
 
-    // Get lengths of each string.
-    len_1 = heap[str_loc_1];
-    len_2 = heap[str_loc_2];
+    // Get lengths of each string, leaving them on the stack in case allocating collects.
+    len_1 = heap[stack[stack_ptr - 2] >> STR_SHIFT];
+    len_2 = heap[stack[stack_ptr - 1] >> STR_SHIFT];
 
     // Find length of new string.
     tot_len = len_1 + len_2;
 
-    // Place total length onto heap.
-    heap.push_back(tot_len);
+    // Place total length and room for packed characters onto heap.
+    loc = allocate(STR_TAG, 1 + STR_WORDS(tot_len));
+    heap[loc] = tot_len;
+    heap[loc + STR_WORDS(tot_len)] = 0;
+
+    // Pull strings' heap locations off of stack.
+    str_loc_2 = pop() >> STR_SHIFT;
+    str_loc_1 = pop() >> STR_SHIFT;
 
-    // Place characters into string.
-    for (i = 1; i <= heap[str_loc_2]; i++) heap.push_back(heap[str_loc_2 + i]);
-    for (i = 1; i <= heap[str_loc_1]; i++) heap.push_back(heap[str_loc_1 + i]);
+    // Copy characters of both strings in one go each.
+    std::copy_n(str_chars(str_loc_1), len_1, str_chars(loc));
+    std::copy_n(str_chars(str_loc_2), len_2, str_chars(loc) + len_1);
 
     // Place new string's heap value back onto stack.
-    push(((heap_ptr << STR_SHIFT) & ~STR_MASK) | STR_TAG);
-
-    // Advance heap ppinter.
-    heap_ptr += (tot_len + 1);
+    push(((loc << STR_SHIFT) & ~STR_MASK) | STR_TAG);
 }
 
 // Place vector contents onto heap and address of vector onto stack.
-void Interpreter::create_vec(void) {
-    uint64_t len, i;
+HANDLER void Interpreter::create_vec(void) {
+    uint64_t len, i, loc;
 
     // Get number of items.
     len = read_word();
 
     // Place number of items onto heap.
-    heap.push_back(len);
+    loc = allocate(VEC_TAG, 1 + len);
+    heap[loc] = len;
 
     // Place items onto heap.
-    for (i = 0; i < len; i++) heap.push_back(pop());
+    for (i = 1; i <= len; i++) heap[loc + i] = pop();
 
     // Place location of vector in heap onto stack.
-    push(((heap_ptr << VEC_SHIFT) & ~VEC_MASK) | VEC_TAG);
-
-    // Advance heap ppinter.
-    heap_ptr += (len + 1);
+    push(((loc << VEC_SHIFT) & ~VEC_MASK) | VEC_TAG);
 }
 
-// Place item at given location on top of stack.
-void Interpreter::vec_ref(void) {
-    uint64_t loc, vec_loc, val, len;
-
-    // Get location off the top of the stack.
-    loc = pop() >> FIXNUM_SHIFT;
+// Get item at given index of vector.
+HANDLER uint64_t Interpreter::vec_ref_value(uint64_t vec, uint64_t ind) {
+    uint64_t loc, vec_loc, len;
 
-    // Get vector location off the stack.
-    vec_loc = pop() >> VEC_SHIFT;
+    // Get location and vector location.
+    loc = ind >> FIXNUM_SHIFT;
+    vec_loc = vec >> VEC_SHIFT;
 
     // Get length of vector.
     len = heap[vec_loc];
@@ -834,14 +2887,23 @@ void Interpreter::vec_ref(void) {
     // Ensure location is within vector.
     if (loc >= len) throw std::runtime_error("Invalid index.\n");
 
-    // Set item at location and place onto stack.
-    val = heap[vec_loc + len - loc];
+    // Get item at location.
+    return heap[vec_loc + len - loc];
+}
 
-    push(val);
+// Place item at given location on top of stack.
+HANDLER void Interpreter::vec_ref(void) {
+    uint64_t val_1, val_2;
+
+    // Pop location and vector off of stack.
+    val_1 = pop();
+    val_2 = pop();
+
+    push(vec_ref_value(val_2, val_1));
 }
 
 // Set item at given location to given index and place vector location on top of stack.
-void Interpreter::vec_set(void) {
+HANDLER void Interpreter::vec_set(void) {
     uint64_t loc, vec_loc, val, len;
 
     // Get item from stack.
@@ -859,45 +2921,47 @@ void Interpreter::vec_set(void) {
     // Ensure location is within vector.
     if (loc >= len) throw std::runtime_error("Invalid index.\n");
 
+    // Constants are read-only.
+    if (vec_loc < pool_end) throw std::runtime_error("Cannot modify constant.\n");
+
     // Set character at location and place onto stack.
     heap[vec_loc + len - loc] = val;
+    write_barrier(vec_loc, val);
 
     // Place vector's heap value back onto stack.
     push(((vec_loc << VEC_SHIFT) & ~VEC_MASK) | VEC_TAG);
 }
 
 // Create new vector which is a single vector appended to another.
-void Interpreter::vec_append(void) {
-    uint64_t vec_loc_1, vec_loc_2, i, tot_len, len_1, len_2;
-
-    // Pull vectors' heap locations off of stack.
-    vec_loc_2 = pop() >> VEC_SHIFT;
-    vec_loc_1 = pop() >> VEC_SHIFT;
+HANDLER void Interpreter::vec_append(void) {
+    uint64_t vec_loc_1, vec_loc_2, tot_len, len_1, len_2, loc;
 
-    // Get lengths of each vector.
-    len_1 = heap[vec_loc_1];
-    len_2 = heap[vec_loc_2];
+    // Get lengths of each vector, leaving them on the stack in case allocating collects.
+    len_1 = heap[stack[stack_ptr - 2] >> VEC_SHIFT];
+    len_2 = heap[stack[stack_ptr - 1] >> VEC_SHIFT];
 
     // Find length of new vector.
     tot_len = len_1 + len_2;
 
     // Place total length onto heap.
-    heap.push_back(tot_len);
+    loc = allocate(VEC_TAG, 1 + tot_len);
+    heap[loc] = tot_len;
 
-    // Place characters into vector.
-    for (i = 1; i <= heap[vec_loc_2]; i++) heap.push_back(heap[vec_loc_2 + i]);
-    for (i = 1; i <= heap[vec_loc_1]; i++) heap.push_back(heap[vec_loc_1 + i]);
+    // Pull vectors' heap locations off of stack.
+    vec_loc_2 = pop() >> VEC_SHIFT;
+    vec_loc_1 = pop() >> VEC_SHIFT;
 
-    // Place new vector's heap value back onto stack.
-    push(((heap_ptr << VEC_SHIFT) & ~VEC_MASK) | VEC_TAG);
+    // Place items into vector. Items are stored last first.
+    std::copy_n(heap.begin() + vec_loc_2 + 1, len_2, heap.begin() + loc + 1);
+    std::copy_n(heap.begin() + vec_loc_1 + 1, len_1, heap.begin() + loc + 1 + len_2);
 
-    // Advance heap ppinter.
-    heap_ptr += (tot_len + 1);
+    // Place new vector's heap value back onto stack.
+    push(((loc << VEC_SHIFT) & ~VEC_MASK) | VEC_TAG);
 }
 
 // Clean up stack after evaluating expressions in begin.
-void Interpreter::begin(void) {
-    uint64_t ret_val, i, numel;
+HANDLER void Interpreter::begin(void) {
+    uint64_t ret_val, numel;
 
     // Save value that is to be returned by begin expression.
     ret_val = pop();
@@ -905,15 +2969,15 @@ void Interpreter::begin(void) {
     // Number of elements to be popped off stack.
     numel = read_word();
 
-    // Pop remaining elements off of stack.
-    for (i = 1; i < numel; i++) pop();
+    // Drop remaining elements off of stack at once.
+    if (numel > 1) stack_ptr -= numel - 1;
 
     // Push return value back onto stack.
     push(ret_val);
 }
 
-void Interpreter::code_label(void) {
-    uint64_t code_len, num_frees, num_bounds;
+HANDLER void Interpreter::code_label(void) {
+    uint64_t code_len, num_frees, num_bounds, loc;
 
     // Get length of code.
     code_len = read_word();
@@ -924,195 +2988,270 @@ void Interpreter::code_label(void) {
     // Get number of free variables.
     num_frees = read_word();
 
-    // Place code data onto heap.
-    heap.push_back(pc);
-    heap.push_back(num_bounds);
-    heap.resize(heap.size() + num_frees);
+    // Place code data onto heap, along with the stack depth the code needs.
+    loc = allocate(CLOSURE_TAG, CLOSURE_LEN + num_frees);
+    heap[loc] = pc;
+    heap[loc + 1] = num_bounds;
+    heap[loc + 2] = next_frame < frame_depths.size() ? frame_depths[next_frame] : DEFAULT_FRAME_DEPTH;
+    std::fill_n(heap.begin() + loc + CLOSURE_LEN, num_frees, FIXNUM_TAG);
+    next_frame++;
 
     // Place heap pointer onto bottom of stack and advance base pointer.
-    push(((heap_ptr << CLOSURE_SHIFT) & ~CLOSURE_MASK) | CLOSURE_TAG);
+    push(((loc << CLOSURE_SHIFT) & ~CLOSURE_MASK) | CLOSURE_TAG);
     base_ptr++;
 
-    // Advance heap pointer.
-    heap_ptr += (CLOSURE_LEN + num_frees);
-
     // Advance program counter past code.
     pc += code_len;
 }
 
-void Interpreter::closure(void) {
-    uint64_t addr;
-
-    // Figure out heap address of label.
-    addr = stack[read_word()];
-
-    push(addr);
+HANDLER void Interpreter::closure(void) {
+    uint64_t label, num_frees, loc;
 
-}
-
-void Interpreter::call(void) {
-    uint64_t closure, num_args, code_loc;
-    std::vector<uint64_t> args;
-    int64_t i;
+    // Find the record the label's code placed at the bottom of the stack.
+    label = read_word();
+    num_frees = (heap[(stack[label] >> CLOSURE_SHIFT) - 1] >> OBJECT_SHIFT) - CLOSURE_LEN;
 
-    // Pop heap location of closure object off of stack.
-    closure = pop() >> CLOSURE_SHIFT;
+    // A closure without frees is the record itself.
+    if (num_frees == 0) {
+        push(stack[label]);
+        return;
+    }
 
-    // Get details for closure from heap location.
-    code_loc = heap[closure];
-    num_args = heap[closure + 1];
+    // Otherwise each closure gets its own copy to hold its frees, which are set once they have been computed.
+    // The record is read again after allocating since a collection may have moved it.
+    loc = allocate(CLOSURE_TAG, CLOSURE_LEN + num_frees);
+    std::copy_n(heap.begin() + (stack[label] >> CLOSURE_SHIFT), CLOSURE_LEN, heap.begin() + loc);
+    std::fill_n(heap.begin() + loc + CLOSURE_LEN, num_frees, FIXNUM_TAG);
 
-    args = std::vector<uint64_t>(num_args);
+    push(((loc << CLOSURE_SHIFT) & ~CLOSURE_MASK) | CLOSURE_TAG);
+}
 
-    // Pop arguments off of stack.
-    for (i = 0; i < (int64_t)num_args; i++)
-        args[i] = pop();
+HANDLER void Interpreter::call(void) {
+    uint64_t closure, num_args;
 
-    // Save return address onto stack.
-    push(pc);
+    // Get number of arguments passed, which must be as many as the closure called takes.
+    num_args = read_word();
+    closure = stack[stack_ptr - 1] >> CLOSURE_SHIFT;
+    if (heap[closure + 1] != num_args) throw std::runtime_error("Wrong number of arguments.\n");
 
-    // Save old location of base pointer on stack.
-    push(base_ptr);
+    // Save return address, old base pointer and old closure.
+    frames.push_back({pc, base_ptr, current_closure});
 
-    // Move base pointer to top of stack (will point at old saved base pointer location).
-    base_ptr = stack_ptr - 1;
+    // Pop closure object off of stack, which the callee reads its frees from.
+    current_closure = pop();
 
-    // Push given numebr of arguments onto stack.
-    for (i = (int64_t)num_args - 1; i >= 0; i--)
-        push(args[i]);
+    // The arguments stay where they were pushed and start the callee's frame, which must fit on the stack.
+    base_ptr = stack_ptr - num_args;
+    check_frame(heap[closure + 2]);
 
     // Update program counter to code's location.
-    pc = code_loc;
+    pc = heap[closure];
 }
 
-void Interpreter::ret(void) {
+HANDLER void Interpreter::ret(void) {
     uint64_t ret_val;
 
     // Get the return value off of stack.
     ret_val = pop();
 
-    // Restore pc to return address.
-    pc = stack[base_ptr - 1];
-
-    // Adjust stack pointer.
-    stack_ptr = base_ptr - 1;
+    // Drop the frame along with the arguments.
+    stack_ptr = base_ptr;
 
-    // Restore base pointer.
-    base_ptr = stack[base_ptr];
+    // Restore pc to return address and restore base pointer and closure.
+    pc = frames.back().return_pc;
+    base_ptr = frames.back().base_ptr;
+    current_closure = frames.back().closure;
+    frames.pop_back();
 
     // Push result onto stack.
     push(ret_val);
 }
 
-void Interpreter::get_arg(void) {
+HANDLER void Interpreter::get_arg(void) {
     uint64_t arg_ind;
 
     // Get argument offset.
     arg_ind = read_word();
 
     // Place argument onto the top of the stack.
-    push(stack[base_ptr + 1 + arg_ind]);
+    push(stack[base_ptr + arg_ind]);
 }
 
-void Interpreter::get_free(void) {
-    uint64_t closure_ptr;
-
-    // Find out which closure to get free from.
-    closure_ptr = stack[read_word()] >> CLOSURE_SHIFT;
-
-    // Place free onto stack.
-    push(heap[closure_ptr + 2 + read_word()]);
+HANDLER void Interpreter::get_free(void) {
+    // Place free of the running procedure's closure onto stack.
+    push(heap[(current_closure >> CLOSURE_SHIFT) + CLOSURE_LEN + read_word()]);
 }
 
-void Interpreter::set_frees(void) {
-    uint64_t num_frees, i, closure_ptr;
+HANDLER void Interpreter::set_frees(void) {
+    uint64_t num_frees, i, closure_ptr, val;
 
-    // Find out which closure to read from.
-    closure_ptr = stack[read_word()] >> CLOSURE_SHIFT;
+    // Find the closure to set, which is counted from the top of the stack as let bindings are.
+    closure_ptr = stack[stack_ptr - read_word()] >> CLOSURE_SHIFT;
 
     // Check how many free variables there are.
     num_frees = read_word();
 
     // Place frees into curent closure object.
-    for (i = 0; i < num_frees; i++)
-        heap[closure_ptr + 1 + num_frees - i] = pop();
+    for (i = 0; i < num_frees; i++) {
+        val = pop();
+        heap[closure_ptr + CLOSURE_LEN - 1 + num_frees - i] = val;
+        write_barrier(closure_ptr, val);
+    }
 }
 
 // Place heap address of imediate constant on top of stack.
-void Interpreter::const_ref(void) {
+HANDLER void Interpreter::const_ref(void) {
     push(stack[read_word()]);
 }
 
 // Move base pointer up by 1.
-void Interpreter::const_init(void) {
+HANDLER void Interpreter::const_init(void) {
     base_ptr++;
 }
 
-void Interpreter::tail_call(void) {
-    uint64_t closure, num_args, code_loc;
-    std::vector<uint64_t> args;
-    int64_t i;
-
-    // Pop heap location of closure object off of stack.
-    closure = pop() >> CLOSURE_SHIFT;
-
-    // Get details for closure from heap location.
-    code_loc = heap[closure];
-    num_args = heap[closure + 1];
+HANDLER void Interpreter::tail_call(void) {
+    uint64_t closure, num_args;
 
-    args = std::vector<uint64_t>(num_args);
+    // Get number of arguments passed, which must be as many as the closure called takes.
+    num_args = read_word();
 
-    // Pop arguments off of stack.
-    for (i = 0; i < (int64_t)num_args; i++)
-        args[i] = pop();
+    // Pop closure object off of stack, which the callee reads its frees from.
+    current_closure = pop();
+    closure = current_closure >> CLOSURE_SHIFT;
+    if (heap[closure + 1] != num_args) throw std::runtime_error("Wrong number of arguments.\n");
 
-    // Pop old arguments off of stack.
-    for (i = 0; i < (int64_t)num_args; i++)
-        pop();
+    // Move the arguments down over the current frame, which the callee takes over along with its return address.
+    std::copy_n(stack.begin() + (stack_ptr - num_args), num_args, stack.begin() + base_ptr);
+    stack_ptr = base_ptr + num_args;
 
-    // Push given numebr of arguments onto stack.
-    for (i = (int64_t)num_args - 1; i >= 0; i--)
-        push(args[i]);
+    // Check the callee's frame fits on the stack.
+    check_frame(heap[closure + 2]);
 
     // Update program counter to code's location.
-    pc = code_loc;
+    pc = heap[closure];
 }
 
-void Interpreter::symbol(void) {
-    uint64_t len, i;
-
-    // Read in number of characters in symbol.
-    len = read_word();
-
-    // Push the current heap location onto stack.
-    push(((heap_ptr << SYMBOL_SHIFT) & ~SYMBOL_MASK) | SYMBOL_TAG);
-
-    // Place length on heap.
-    heap.push_back(len);
-
-    for (i = 1; i <= len; i++)
-        heap.push_back(read_word());
-
-    heap_ptr += (len + 1);
+HANDLER void Interpreter::symbol(void) {
+    // Push interned symbol from symbol table.
+    push(symbols[read_word()]);
 }
 
-void Interpreter::jump_if_false(void) {
+HANDLER void Interpreter::jump_if_false(void) {
     uint64_t val;
 
     val = stack[stack_ptr - 1];
 
     // If false on top of stack, jump.
-    if (((val & BOOL_MASK) == BOOL_TAG) && (val >> BOOL_SHIFT == 0)) pc += read_word();
+    if (is_false(val)) pc += read_word();
     else pc += 1;
 }
 
-void Interpreter::jump_if_true(void) {
+HANDLER void Interpreter::jump_if_true(void) {
     uint64_t val;
 
     val = stack[stack_ptr - 1];
 
     // If true on top of stack, jump.
-    if (!(((val & BOOL_MASK) == BOOL_TAG) && (val >> BOOL_SHIFT == 0))) pc += read_word();
+    if (!is_false(val)) pc += read_word();
     else pc += 1;
 }
 
+// Get item at given index of vector without checking the index.
+HANDLER uint64_t Interpreter::vec_ref_unchecked_value(uint64_t vec, uint64_t ind) {
+    uint64_t loc, vec_loc;
+
+    loc = ind >> FIXNUM_SHIFT;
+    vec_loc = vec >> VEC_SHIFT;
+
+    return heap[vec_loc + heap[vec_loc] - loc];
+}
+
+// Place item at given location on top of stack without checking the index.
+HANDLER void Interpreter::vec_ref_unchecked(void) {
+    uint64_t val_1, val_2;
+
+    // Pop location and vector off of stack.
+    val_1 = pop();
+    val_2 = pop();
+
+    push(vec_ref_unchecked_value(val_2, val_1));
+}
+
+// Set item at given location without checking the index and place vector location on top of stack.
+HANDLER void Interpreter::vec_set_unchecked(void) {
+    uint64_t loc, vec_loc, val;
+
+    // Get item, index and vector's heap index from stack.
+    val = pop();
+    loc = pop() >> FIXNUM_SHIFT;
+    vec_loc = pop() >> VEC_SHIFT;
+
+    // Constants are read-only.
+    if (vec_loc < pool_end) throw std::runtime_error("Cannot modify constant.\n");
+
+    // Set item at location.
+    heap[vec_loc + heap[vec_loc] - loc] = val;
+    write_barrier(vec_loc, val);
+
+    // Place vector's heap value back onto stack.
+    push(((vec_loc << VEC_SHIFT) & ~VEC_MASK) | VEC_TAG);
+}
+
+// Get character at given index of string without checking the index.
+HANDLER uint64_t Interpreter::str_ref_unchecked_value(uint64_t str, uint64_t ind) {
+    uint64_t val;
+
+    val = str_chars(str >> STR_SHIFT)[ind >> FIXNUM_SHIFT];
+
+    return ((val << CHAR_SHIFT) & ~CHAR_MASK) | CHAR_TAG;
+}
+
+// Place character at given location on top of stack without checking the index.
+HANDLER void Interpreter::str_ref_unchecked(void) {
+    uint64_t val_1, val_2;
+
+    // Pop location and string off of stack.
+    val_1 = pop();
+    val_2 = pop();
+
+    push(str_ref_unchecked_value(val_2, val_1));
+}
+
+// Set character at given location without checking the index and place string location on top of stack.
+HANDLER void Interpreter::str_set_unchecked(void) {
+    uint64_t loc, str_loc, val;
+
+    // Get character, index and string's heap index from stack.
+    val = pop() >> CHAR_SHIFT;
+    loc = pop() >> FIXNUM_SHIFT;
+    str_loc = pop() >> STR_SHIFT;
+
+    // Constants are read-only.
+    if (str_loc < pool_end) throw std::runtime_error("Cannot modify constant.\n");
+
+    // Set character at location.
+    str_chars(str_loc)[loc] = val;
+
+    // Place string's heap value back onto stack.
+    push(((str_loc << STR_SHIFT) & ~STR_MASK) | STR_TAG);
+}
+
+// Copy string or vector image out of constant pool onto heap and place its address onto stack.
+HANDLER void Interpreter::clone(void) {
+    uint64_t val, image, words, loc;
+
+    // Get tagged image from instruction stream. Images live in the constant pool, which never moves.
+    val = read_word();
+    image = val >> VEC_SHIFT;
+
+    // Strings pack their characters, vectors take a word per element.
+    if ((val & STR_MASK) == STR_TAG) words = 1 + STR_WORDS(heap[image]);
+    else words = 1 + heap[image];
+
+    // Copy length and elements in one go.
+    loc = allocate(val & VEC_MASK, words);
+    std::copy_n(heap.begin() + image, words, heap.begin() + loc);
+
+    // Place location of copy onto stack with the image's tag.
+    push(((loc << VEC_SHIFT) & ~VEC_MASK) | (val & VEC_MASK));
+}
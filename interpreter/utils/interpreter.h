@@ -8,19 +8,59 @@
  */
 
 #pragma once
+#include "arena.h"
+#include "jit.h"
 #include <stack>
 #include <cstdint>
 #include <vector>
+#include <span>
 #include <iostream>
 #include <unordered_map>
+#include <chrono>
+#include <exception>
+
+// Words in the old space and in the nursery of the heap unless told otherwise.
+#define DEFAULT_HEAP_WORDS 65536
+#define DEFAULT_NURSERY_WORDS 32768
+#define DEFAULT_GC_THREADS 1
+// Words of address space reserved for each half of the heap, which it can never outgrow.
+#define DEFAULT_HEAP_LIMIT (1ULL << 32)
+// Words in the operand stack unless told otherwise. The stack never grows, so this bounds how deep calls can nest.
+#define DEFAULT_STACK_WORDS (1ULL << 20)
+// Number of times a procedure is entered before it is compiled into machine code once the JIT is on.
+#define DEFAULT_JIT_THRESHOLD 100
+
+struct GCWorker;
+struct ParallelCollection;
+struct Translation;
+class Native;
+
+// Number and duration in nanoseconds of collections of one kind.
+struct GCPauses {
+    uint64_t count = 0;
+    uint64_t total = 0;
+    uint64_t longest = 0;
+};
+
+// Where a procedure returns to and the base pointer and closure of the frame it was called from.
+struct Frame {
+    uint64_t return_pc;
+    uint64_t base_ptr;
+    uint64_t closure;
+};
 
 class Interpreter {
 public:
     // Default constructor.
     Interpreter(void);
 
-    // Construct interpreter based on byte stream.
-    Interpreter(std::vector<uint8_t>& bytes);
+    // Construct interpreter based on byte stream, with the given number of words in the old space and in the nursery.
+    // Full collections are spread over the given number of threads and the heap never grows past the given limit in words.
+    // The operand stack holds the given number of words, or as many as the entry code needs if that is more.
+    // The program is translated into register form when loaded unless told to run the stack form as compiled.
+    // Otherwise its code is run from the given bytes where they lie, so they must outlive the interpreter.
+    // Procedures of a program in register form are compiled into machine code once entered the given number of times, or never if it is 0.
+    Interpreter(std::span<const uint8_t> bytes, uint64_t heap_words = DEFAULT_HEAP_WORDS, uint64_t nursery_words = DEFAULT_NURSERY_WORDS, uint64_t threads = DEFAULT_GC_THREADS, uint64_t heap_limit = DEFAULT_HEAP_LIMIT, uint64_t stack_words = DEFAULT_STACK_WORDS, bool registers = true, uint64_t jit_threshold = 0);
 
     // Interpret program.
     uint64_t interpret(void);
@@ -28,15 +68,127 @@ public:
     // Print out value.
     void print_val(uint64_t val, std::ostream*& output);
 
+    // Print number of collections of each kind, the time they took and the most words found live.
+    void print_gc_stats(std::ostream*& output);
+
 private:
+    // Programs compiled ahead of time run on the interpreter's stack and heap.
+    friend class Native;
+
     // Member variables.
-    std::vector<uint64_t> code;
-    std::vector<uint64_t> stack;
-    std::vector<uint64_t> heap;
+    std::span<const uint64_t> code;
+    std::vector<uint64_t> owned_code;
+    Arena stack;
+    Arena heap;
+    Arena spare;
+    Arena cdr_codes;
+    Arena spare_codes;
     uint64_t pc;
     uint64_t stack_ptr;
     uint64_t base_ptr;
+    uint64_t current_closure;
+    std::vector<Frame> frames;
     uint64_t heap_ptr;
+    uint64_t pool_end;
+    uint64_t copy_ptr;
+    uint64_t old_ptr;
+    uint64_t nursery_start;
+    std::vector<uint64_t> remembered;
+    uint64_t gc_threads;
+    GCPauses minor_pauses;
+    GCPauses full_pauses;
+    uint64_t peak_live;
+    std::vector<uint64_t> frame_depths;
+    std::vector<uint64_t> symbols;
+    uint64_t next_frame;
+    bool register_form;
+    std::vector<uint64_t> immediates;
+    Jit jit;
+    uint64_t return_to_compiled;
+    std::exception_ptr jit_error;
+    uintptr_t jit_stack_floor;
+
+    // Read the container written by the compiler and return the bytes of its code section, allocating a stack of at least the given number of words.
+    std::span<const uint8_t> load_container(std::span<const uint8_t> bytes, uint64_t stack_words);
+
+    // Check the program is valid bytecode, throwing if not. Every opcode must be known, every operand in range and every instruction must find the values it takes on the stack.
+    void verify(void);
+
+    // Translate the program into register form. Returns false, leaving the program in stack form, if it cannot be translated.
+    bool translate(void);
+
+    // Interpret a program translated into register form.
+    uint64_t interpret_registers(void);
+
+    // Carry out the single instruction at the given location with the given number of values on the stack. It must neither jump, call nor return.
+    void step(uint64_t at, uint64_t sp);
+
+    // Run the procedure about to be entered at the program counter in machine code if it has been compiled, compiling it once it has been entered often enough.
+    void run_compiled(void);
+
+    // Compile the procedure entered at the given location into machine code. Returns nullptr if it cannot be compiled.
+    JitCode compile_procedure(uint64_t entry);
+
+    // Emit machine code loading the value of a register form operand into a register, given where the stack pointer stands in the frame.
+    void load_operand(MachineCode& m, Reg reg, uint64_t word, int64_t sp);
+
+    // Call or tail call the closure in the given slot of the running frame with the given number of arguments below it on behalf of compiled code.
+    uint64_t call_from_compiled(uint64_t top, uint64_t num_args);
+    uint64_t tail_call_from_compiled(uint64_t top, uint64_t num_args);
+
+    // Entry points of compiled code into the interpreter, taking slots counted from the base of the running frame.
+    // Those that can fail return JIT_ERROR_VALUE in place of throwing, keeping what was thrown to be rethrown once out of machine code.
+    static uint64_t jit_call(Interpreter* vm, uint64_t top, uint64_t num_args);
+    static uint64_t jit_tail_call(Interpreter* vm, uint64_t top, uint64_t num_args);
+    static uint64_t jit_step(Interpreter* vm, uint64_t at, uint64_t sp);
+    static uint64_t jit_index(Interpreter* vm, uint64_t op, uint64_t obj, uint64_t ind);
+    static uint64_t jit_pair_field(Interpreter* vm, uint64_t pair, uint64_t field);
+    static uint64_t jit_get_free(Interpreter* vm, uint64_t ind);
+
+    // Read the value of an operand of a register form instruction.
+    uint64_t operand(uint64_t word);
+
+    // Write a value into the slot a register form instruction names, counted from the stack pointer.
+    void set_slot(uint64_t word, uint64_t val);
+
+    // Check the stack has room for a frame of the given depth from the base pointer.
+    void check_frame(uint64_t depth);
+
+    // Reserve room for an object on the heap, collecting garbage if the heap is full.
+    uint64_t allocate(uint64_t tag, uint64_t words);
+
+    // Remember an old object once a value referring to the nursery has been stored into it.
+    void write_barrier(uint64_t loc, uint64_t val);
+
+    // Copy the object a value refers to into the given space if it lies at or above the given location and return the updated value.
+    uint64_t forward(uint64_t val, Arena& to, uint64_t from);
+
+    // Check whether a value refers to an uncopied pair at or above the given location that is not part of a run.
+    bool is_plain_pair(uint64_t val, uint64_t from);
+
+    // Copy the chain of plain pairs starting at a heap location into the given space as one run of cdr-coded cells.
+    void copy_run(uint64_t loc, Arena& to, Arena& to_codes, uint64_t from);
+
+    // Copy whatever the objects copied into the given space from the given location onwards refer to.
+    void scan(Arena& to, uint64_t scan_ptr, uint64_t from);
+
+    // Copy the object a value refers to into the spare heap on behalf of one thread of a parallel collection and return the updated value.
+    uint64_t forward_shared(uint64_t val, GCWorker& self, ParallelCollection& gc);
+
+    // Work of one thread of a parallel collection.
+    void collect_worker(uint64_t id, ParallelCollection& gc);
+
+    // Copy every object reachable from the stack into the spare heap using several threads. Returns the end of the copied objects.
+    uint64_t copy_in_parallel(void);
+
+    // Promote every object reachable in the nursery to the old space.
+    void collect_nursery(void);
+
+    // Copy every object reachable from the stack into the spare semispace and make it the heap.
+    void collect(uint64_t needed);
+
+    // Add the time since a collection started to the pauses of its kind.
+    void record_pause(GCPauses& pauses, std::chrono::steady_clock::time_point start);
 
     // Get instruction.
     uint64_t read_word(void);
@@ -116,15 +268,24 @@ private:
     // Create cons cell.
     void create_cons(void);
 
+    // Get car (field 0) or cdr (field 1) of pair at given heap location.
+    uint64_t pair_field(uint64_t loc, uint64_t field);
+
     // Place first value in corresponding cons cell onto stack.
     void car(void);
 
     // Place second value in corresponding cons cell onto stack.
     void cdr(void);
 
+    // Get first character of string at given heap location.
+    uint8_t* str_chars(uint64_t str_loc);
+
     // Place string contents onto heap and address of string onto stack.
     void create_str(void);
 
+    // Get character at given index of string.
+    uint64_t str_ref_value(uint64_t str, uint64_t ind);
+
     // Place character at given location on top of stack.
     void str_ref(void);
 
@@ -137,6 +298,9 @@ private:
     // Place vector contents onto heap and address of vector onto stack.
     void create_vec(void);
 
+    // Get item at given index of vector.
+    uint64_t vec_ref_value(uint64_t vec, uint64_t ind);
+
     // Place item at given location on top of stack.
     void vec_ref(void);
 
@@ -169,9 +333,31 @@ private:
 
     void tail_call(void);
 
+    // Place interned symbol with given index in symbol table on top of stack.
     void symbol(void);
 
     void jump_if_false(void);
 
     void jump_if_true(void);
+
+    // Get item at given index of vector. Index must have been proven in range.
+    uint64_t vec_ref_unchecked_value(uint64_t vec, uint64_t ind);
+
+    // Place item at given location on top of stack. Index must have been proven in range.
+    void vec_ref_unchecked(void);
+
+    // Set item at given location and place vector location on top of stack. Index must have been proven in range.
+    void vec_set_unchecked(void);
+
+    // Get character at given index of string. Index must have been proven in range.
+    uint64_t str_ref_unchecked_value(uint64_t str, uint64_t ind);
+
+    // Place character at given location on top of stack. Index must have been proven in range.
+    void str_ref_unchecked(void);
+
+    // Set character at given location and place string location on top of stack. Index must have been proven in range.
+    void str_set_unchecked(void);
+
+    // Copy string or vector out of constant pool and place its location on top of stack.
+    void clone(void);
 };
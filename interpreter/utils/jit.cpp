@@ -0,0 +1,348 @@
+/*
+ * jit.cpp - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ *
+ * Implementation notes:
+ * - Every instruction works on 64 bit registers, so each carries a REX prefix with W set.
+ * - Slots of the frame are addressed from rbx with a 32 bit displacement, which needs no SIB byte.
+ * - Machine code is written into memory mapped readable and writable, which is then made readable and executable, so no page is ever both writable and executable.
+ *
+ */
+
+#include "jit.h"
+#include <cstring>
+#include <stdexcept>
+#include <utility>
+#include <sys/mman.h>
+#include <unistd.h>
+
+// Opcodes of x86-64 used by the templates.
+#define OP_ADD 0x01
+#define OP_SUB 0x29
+#define OP_CMP 0x39
+#define OP_MOV_STORE 0x89
+#define OP_MOV_LOAD 0x8B
+#define OP_GROUP_IMM8 0x83
+#define OP_GROUP_IMM32 0x81
+#define OP_SHIFT_IMM8 0xC1
+#define OP_MOV_IMM 0xB8
+#define OP_ESCAPE 0x0F
+#define OP_IMUL 0xAF
+#define OP_SETCC 0x90
+#define OP_MOVZX_BYTE 0xB6
+#define OP_JCC 0x80
+#define OP_JMP 0xE9
+#define OP_CALL_INDIRECT 0xFF
+#define OP_PUSH 0x50
+#define OP_POP 0x58
+#define OP_RET 0xC3
+#define PREFIX_REX_W 0x48
+#define PREFIX_REX_B 0x41
+
+// Extensions of group opcodes, given in the reg field of the ModRM byte.
+#define EXT_ADD 0
+#define EXT_OR 1
+#define EXT_AND 4
+#define EXT_SHL 4
+#define EXT_SHR 5
+#define EXT_CMP 7
+#define EXT_CALL 2
+
+// Modes of the ModRM byte: memory at a register plus a 32 bit displacement, and a register.
+#define MOD_INDIRECT 0
+#define MOD_DISP32 2
+#define MOD_REGISTER 3
+
+// Bytes in each slot of the frame.
+#define SLOT_BYTES 8
+
+// Build a ModRM byte.
+static uint8_t modrm(uint8_t mod, uint8_t reg, uint8_t rm) {
+    return (mod << 6) | ((reg & 7) << 3) | (rm & 7);
+}
+
+// Get number of a register as encoded.
+static uint8_t num(Reg reg) {
+    return static_cast<uint8_t>(reg);
+}
+
+// Emit a byte.
+void MachineCode::emit(uint8_t byte) {
+    bytes.push_back(byte);
+}
+
+// Emit a little endian word of 4 bytes.
+void MachineCode::emit32(uint32_t word) {
+    int i;
+
+    for (i = 0; i < 4; i++)
+        emit((word >> (8*i)) & 0xFF);
+}
+
+// Emit a little endian word of 8 bytes.
+void MachineCode::emit64(uint64_t word) {
+    int i;
+
+    for (i = 0; i < 8; i++)
+        emit((word >> (8*i)) & 0xFF);
+}
+
+// Emit the prefix giving a 64 bit operand size, extending the registers in the reg and rm fields of the ModRM byte to r8 and above.
+void MachineCode::rex(Reg reg, Reg rm) {
+    emit(PREFIX_REX_W | ((num(reg) >> 3) << 2) | (num(rm) >> 3));
+}
+
+// Emit an instruction taking a register in the reg field and another in the rm field.
+void MachineCode::register_op(uint8_t opcode, Reg reg, Reg rm) {
+    rex(reg, rm);
+    emit(opcode);
+    emit(modrm(MOD_REGISTER, num(reg), num(rm)));
+}
+
+// Emit an instruction taking a register in the reg field and a slot of the frame addressed from rbx in the rm field.
+void MachineCode::slot_op(uint8_t opcode, Reg reg, int64_t slot) {
+    rex(reg, Reg::RBX);
+    emit(opcode);
+    emit(modrm(MOD_DISP32, num(reg), num(Reg::RBX)));
+    emit32(static_cast<uint32_t>(slot * SLOT_BYTES));
+}
+
+// Emit an instruction with a group opcode taking a register and a constant, using a single byte for the constant where it fits.
+void MachineCode::constant_op(uint8_t extension, Reg reg, int32_t val) {
+    rex(Reg::RAX, reg);
+    if (val >= INT8_MIN && val <= INT8_MAX) {
+        emit(OP_GROUP_IMM8);
+        emit(modrm(MOD_REGISTER, extension, num(reg)));
+        emit(static_cast<uint8_t>(val));
+    }
+    else {
+        emit(OP_GROUP_IMM32);
+        emit(modrm(MOD_REGISTER, extension, num(reg)));
+        emit32(static_cast<uint32_t>(val));
+    }
+}
+
+// Save rbx, r12 and rbp, which also aligns the stack for calls, and keep the interpreter in r12 and the frame in rbx.
+void MachineCode::prologue(void) {
+    emit(OP_PUSH + num(Reg::RBX));
+    emit(PREFIX_REX_B);
+    emit(OP_PUSH + (num(Reg::R12) & 7));
+    emit(OP_PUSH + num(Reg::RBP));
+    register_op(OP_MOV_STORE, Reg::RSI, Reg::RBX);
+    register_op(OP_MOV_STORE, Reg::RDI, Reg::R12);
+}
+
+// Restore rbp, r12 and rbx and return.
+void MachineCode::epilogue(void) {
+    emit(OP_POP + num(Reg::RBP));
+    emit(PREFIX_REX_B);
+    emit(OP_POP + (num(Reg::R12) & 7));
+    emit(OP_POP + num(Reg::RBX));
+    emit(OP_RET);
+}
+
+// Load the value in the given slot of the frame into a register.
+void MachineCode::load_slot(Reg reg, int64_t slot) {
+    slot_op(OP_MOV_LOAD, reg, slot);
+}
+
+// Store a register into the given slot of the frame.
+void MachineCode::store_slot(int64_t slot, Reg reg) {
+    slot_op(OP_MOV_STORE, reg, slot);
+}
+
+// Load the word at a fixed address into a register, which must be one of rax, rcx, rdx and rsi.
+void MachineCode::load_word(Reg reg, const uint64_t* word) {
+    load_constant(reg, reinterpret_cast<uint64_t>(word));
+    rex(reg, reg);
+    emit(OP_MOV_LOAD);
+    emit(modrm(MOD_INDIRECT, num(reg), num(reg)));
+}
+
+// Load a constant into a register, using a 32 bit move, which clears the upper half, where the constant fits.
+void MachineCode::load_constant(Reg reg, uint64_t val) {
+    if (val <= UINT32_MAX) {
+        if (num(reg) >= 8) emit(PREFIX_REX_B);
+        emit(OP_MOV_IMM + (num(reg) & 7));
+        emit32(static_cast<uint32_t>(val));
+    }
+    else {
+        rex(Reg::RAX, reg);
+        emit(OP_MOV_IMM + (num(reg) & 7));
+        emit64(val);
+    }
+}
+
+// Add one register to another.
+void MachineCode::add(Reg dst, Reg src) {
+    register_op(OP_ADD, src, dst);
+}
+
+// Subtract one register from another.
+void MachineCode::subtract(Reg dst, Reg src) {
+    register_op(OP_SUB, src, dst);
+}
+
+// Multiply one register by another, keeping the low 64 bits.
+void MachineCode::multiply(Reg dst, Reg src) {
+    rex(dst, src);
+    emit(OP_ESCAPE);
+    emit(OP_IMUL);
+    emit(modrm(MOD_REGISTER, num(dst), num(src)));
+}
+
+// Compare one register with another, setting the flags as subtracting the second from the first would.
+void MachineCode::compare(Reg dst, Reg src) {
+    register_op(OP_CMP, src, dst);
+}
+
+// Add a constant to a register.
+void MachineCode::add_constant(Reg reg, int32_t val) {
+    constant_op(EXT_ADD, reg, val);
+}
+
+// And a register with a constant, which is sign extended.
+void MachineCode::and_constant(Reg reg, int32_t val) {
+    constant_op(EXT_AND, reg, val);
+}
+
+// Or a register with a constant, which is sign extended.
+void MachineCode::or_constant(Reg reg, int32_t val) {
+    constant_op(EXT_OR, reg, val);
+}
+
+// Compare a register with a constant, which is sign extended.
+void MachineCode::compare_constant(Reg reg, int32_t val) {
+    constant_op(EXT_CMP, reg, val);
+}
+
+// Shift a register left.
+void MachineCode::shift_left(Reg reg, uint8_t bits) {
+    rex(Reg::RAX, reg);
+    emit(OP_SHIFT_IMM8);
+    emit(modrm(MOD_REGISTER, EXT_SHL, num(reg)));
+    emit(bits);
+}
+
+// Shift a register right, filling with zeroes.
+void MachineCode::shift_right(Reg reg, uint8_t bits) {
+    rex(Reg::RAX, reg);
+    emit(OP_SHIFT_IMM8);
+    emit(modrm(MOD_REGISTER, EXT_SHR, num(reg)));
+    emit(bits);
+}
+
+// Set a register, which must be one of rax, rcx, rdx and rbx, to true if the condition holds and false otherwise, boxed as box_bool does.
+void MachineCode::box_condition(Reg reg, Cond cond) {
+    // Set the low byte and zero the rest, which leaves 0 or 1.
+    emit(OP_ESCAPE);
+    emit(OP_SETCC + static_cast<uint8_t>(cond));
+    emit(modrm(MOD_REGISTER, 0, num(reg)));
+    emit(OP_ESCAPE);
+    emit(OP_MOVZX_BYTE);
+    emit(modrm(MOD_REGISTER, num(reg), num(reg)));
+
+    // Move the truth value into place and tag it.
+    shift_left(reg, 7);
+    or_constant(reg, 31);
+}
+
+// Call a function of the interpreter through rax, passing the interpreter in rdi.
+void MachineCode::call(const void* function) {
+    register_op(OP_MOV_STORE, Reg::R12, Reg::RDI);
+    load_constant(Reg::RAX, reinterpret_cast<uint64_t>(function));
+    emit(OP_CALL_INDIRECT);
+    emit(modrm(MOD_REGISTER, EXT_CALL, num(Reg::RAX)));
+}
+
+// Jump to somewhere patched in later, returning where to patch.
+uint64_t MachineCode::jump(void) {
+    emit(OP_JMP);
+    emit32(0);
+
+    return size() - 4;
+}
+
+// Jump if the condition holds to somewhere patched in later, returning where to patch.
+uint64_t MachineCode::jump_if(Cond cond) {
+    emit(OP_ESCAPE);
+    emit(OP_JCC + static_cast<uint8_t>(cond));
+    emit32(0);
+
+    return size() - 4;
+}
+
+// Make the jump at the given place go to the given location. Jumps are relative to the end of the instruction, which ends with the offset.
+void MachineCode::patch(uint64_t at, uint64_t target) {
+    uint32_t offset;
+
+    offset = static_cast<uint32_t>(target - (at + 4));
+    std::memcpy(bytes.data() + at, &offset, sizeof(offset));
+}
+
+// Construct a JIT which never compiles anything.
+Jit::Jit(void) {
+    threshold = 0;
+}
+
+// Construct a JIT counting entries into procedures at any location of the code.
+Jit::Jit(uint64_t code_words, uint64_t threshold) {
+    this->threshold = threshold;
+    procedures.resize(code_words + 1, {0, nullptr});
+}
+
+// Release machine code.
+Jit::~Jit(void) {
+    release();
+}
+
+// Take over another JIT's machine code.
+Jit::Jit(Jit&& other) noexcept {
+    threshold = std::exchange(other.threshold, 0);
+    procedures = std::move(other.procedures);
+    regions = std::move(other.regions);
+}
+
+// Release machine code and take over another JIT's.
+Jit& Jit::operator=(Jit&& other) noexcept {
+    if (this != &other) {
+        release();
+        threshold = std::exchange(other.threshold, 0);
+        procedures = std::move(other.procedures);
+        regions = std::move(other.regions);
+    }
+
+    return *this;
+}
+
+// Unmap machine code.
+void Jit::release(void) {
+    uint64_t i;
+
+    for (i = 0; i < regions.size(); i++)
+        munmap(regions[i].first, regions[i].second);
+    regions.clear();
+}
+
+// Map machine code executable as that of the procedure entered at the given location.
+JitCode Jit::install(uint64_t entry, const MachineCode& machine_code) {
+    uint64_t page, len;
+    void* region;
+
+    page = sysconf(_SC_PAGESIZE);
+    len = (machine_code.size() + page - 1) / page * page;
+
+    region = mmap(nullptr, len, PROT_READ | PROT_WRITE, MAP_PRIVATE | MAP_ANONYMOUS, -1, 0);
+    if (region == MAP_FAILED) throw std::runtime_error("Failed to map machine code.\n");
+    regions.push_back({region, len});
+
+    std::memcpy(region, machine_code.code().data(), machine_code.size());
+    if (mprotect(region, len, PROT_READ | PROT_EXEC) != 0) throw std::runtime_error("Failed to map machine code.\n");
+
+    procedures[entry].code = reinterpret_cast<JitCode>(region);
+
+    return procedures[entry].code;
+}
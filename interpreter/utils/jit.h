@@ -0,0 +1,170 @@
+/*
+ * jit.h - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ * - Machine code for x86-64 put together one template per instruction, for procedures the interpreter finds it calls often.
+ * - Keeps count of how often each procedure is entered along with the machine code of those compiled, which is mapped executable.
+ *
+ */
+
+#pragma once
+#include <cstdint>
+#include <utility>
+#include <vector>
+
+class Interpreter;
+
+// Returned by compiled code, and by the functions of the interpreter it calls, once an error has been raised. No value or location in the code is all ones.
+#define JIT_ERROR_VALUE UINT64_MAX
+
+// Machine code of a procedure, given the interpreter and the first slot of its frame.
+// Returns its value, TAIL_CALL_VALUE once it has made a tail call for its caller to carry on with, or JIT_ERROR_VALUE.
+typedef uint64_t (*JitCode)(Interpreter* vm, uint64_t* frame);
+
+// Registers of x86-64, numbered as in the encoding of instructions.
+enum class Reg : uint8_t {
+    RAX = 0,
+    RCX = 1,
+    RDX = 2,
+    RBX = 3,
+    RSP = 4,
+    RBP = 5,
+    RSI = 6,
+    RDI = 7,
+    R12 = 12
+};
+
+// Conditions of x86-64 on the flags an unsigned comparison sets, numbered as in the encoding of instructions.
+enum class Cond : uint8_t {
+    B = 2,
+    AE = 3,
+    E = 4,
+    NE = 5,
+    BE = 6,
+    A = 7
+};
+
+// Machine code of one procedure being put together.
+// Compiled code keeps the interpreter in r12 and the first slot of its frame in rbx, and works in rax, rcx and rdx.
+class MachineCode {
+public:
+    // Get number of bytes emitted so far, which is where the next instruction starts.
+    uint64_t size(void) const { return bytes.size(); }
+
+    // Get bytes emitted.
+    const std::vector<uint8_t>& code(void) const { return bytes; }
+
+    // Save the registers compiled code keeps and set them from its arguments.
+    void prologue(void);
+
+    // Restore the registers compiled code keeps and return the value in rax.
+    void epilogue(void);
+
+    // Load the value in the given slot of the frame into a register.
+    void load_slot(Reg reg, int64_t slot);
+
+    // Store a register into the given slot of the frame.
+    void store_slot(int64_t slot, Reg reg);
+
+    // Load the word at a fixed address into a register.
+    void load_word(Reg reg, const uint64_t* word);
+
+    // Load a constant into a register.
+    void load_constant(Reg reg, uint64_t val);
+
+    // Add, subtract, multiply or compare one register with another, leaving the result in the first.
+    void add(Reg dst, Reg src);
+    void subtract(Reg dst, Reg src);
+    void multiply(Reg dst, Reg src);
+    void compare(Reg dst, Reg src);
+
+    // Add, and, or or compare a register with a constant.
+    void add_constant(Reg reg, int32_t val);
+    void and_constant(Reg reg, int32_t val);
+    void or_constant(Reg reg, int32_t val);
+    void compare_constant(Reg reg, int32_t val);
+
+    // Shift a register left or right by the given number of bits, filling with zeroes.
+    void shift_left(Reg reg, uint8_t bits);
+    void shift_right(Reg reg, uint8_t bits);
+
+    // Set a register to the boolean the condition on the last comparison gives.
+    void box_condition(Reg reg, Cond cond);
+
+    // Call a function of the interpreter, passing it the interpreter ahead of the arguments already in rsi, rdx and rcx.
+    void call(const void* function);
+
+    // Jump, or jump if the condition on the last comparison holds, to somewhere patched in later. Returns where to patch.
+    uint64_t jump(void);
+    uint64_t jump_if(Cond cond);
+
+    // Make the jump at the given place go to the given location in the machine code.
+    void patch(uint64_t at, uint64_t target);
+
+private:
+    std::vector<uint8_t> bytes;
+
+    // Emit a byte, or a little endian word of 4 or 8 bytes.
+    void emit(uint8_t byte);
+    void emit32(uint32_t word);
+    void emit64(uint64_t word);
+
+    // Emit the prefix giving a 64 bit operand size and the high bits of the registers an instruction names.
+    void rex(Reg reg, Reg rm);
+
+    // Emit an instruction with an opcode taking a register and a register or a slot of the frame.
+    void register_op(uint8_t opcode, Reg reg, Reg rm);
+    void slot_op(uint8_t opcode, Reg reg, int64_t slot);
+
+    // Emit an instruction with a group opcode taking a register and a constant.
+    void constant_op(uint8_t extension, Reg reg, int32_t val);
+};
+
+// Counts of how often each procedure has been entered and the machine code of those compiled.
+class Jit {
+public:
+    // Construct a JIT which never compiles anything.
+    Jit(void);
+
+    // Construct a JIT for a program with the given number of words of code, compiling a procedure once it has been entered the given number of times.
+    Jit(uint64_t code_words, uint64_t threshold);
+
+    // Release machine code.
+    ~Jit(void);
+
+    // JITs own their machine code, so they can be moved but not copied.
+    Jit(const Jit&) = delete;
+    Jit& operator=(const Jit&) = delete;
+    Jit(Jit&& other) noexcept;
+    Jit& operator=(Jit&& other) noexcept;
+
+    // Check whether procedures are ever compiled.
+    bool enabled(void) const { return threshold != 0; }
+
+    // Get machine code of the procedure entered at the given location, nullptr if it has not been compiled.
+    JitCode code(uint64_t entry) const { return procedures[entry].code; }
+
+    // Count an entry into the procedure at the given location. Returns true the one time it has been entered often enough to be compiled.
+    bool hot(uint64_t entry) { return ++procedures[entry].count == threshold; }
+
+    // Map machine code executable as that of the procedure entered at the given location and return it.
+    JitCode install(uint64_t entry, const MachineCode& machine_code);
+
+private:
+    // How often a procedure has been entered and its machine code once compiled.
+    struct Procedure {
+        uint64_t count;
+        JitCode code;
+    };
+
+    uint64_t threshold;
+    std::vector<Procedure> procedures;
+
+    // Memory mapped for machine code along with its length in bytes.
+    std::vector<std::pair<void*, uint64_t>> regions;
+
+    // Unmap machine code.
+    void release(void);
+};
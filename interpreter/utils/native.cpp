@@ -0,0 +1,98 @@
+/*
+ * native.cpp - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ *
+ * Implementation notes:
+ * - Native code recurses on the C stack wherever the interpreter pushes a frame, so it runs on a thread of its own whose stack is large enough
+ *   for the operand stack to overflow first.
+ *
+ */
+
+#include "native.h"
+#include "utilities.h"
+#include <fstream>
+
+// Default constructor.
+Native::Native(void) {
+    slots = nullptr;
+}
+
+// Load the bytecode of a program, run as compiled, along with the native code of its procedures.
+Native::Native(std::span<const uint8_t> bytes, std::span<const NativeProcedure> procedures, uint64_t heap_words, uint64_t nursery_words, uint64_t threads, uint64_t heap_limit, uint64_t stack_words) {
+    uint64_t i;
+
+    // Closures hold the entry points of the stack form, so the program is not translated into register form.
+    vm = Interpreter(bytes, heap_words, nursery_words, threads, heap_limit, stack_words, false);
+    slots = vm.stack.data();
+
+    codes.resize(vm.code.size());
+    for (i = 0; i < procedures.size(); i++) {
+        if (procedures[i].entry >= codes.size()) throw std::runtime_error("Invalid procedure.\n");
+        codes[procedures[i].entry] = procedures[i].code;
+    }
+}
+
+// Run the program's own code on a thread whose C stack is sized to the operand stack and return its value.
+uint64_t Native::run(NativeCode program) {
+    return run_with_stack(vm.stack.size() * NATIVE_STACK_BYTES_PER_WORD, [this, program]() { return program(*this, 0); });
+}
+
+// Run a program compiled ahead of time and print its value, taking the same options as interpret but no bytecode.
+int native_main(int argc, char** argv, std::span<const uint8_t> bytes, std::span<const NativeProcedure> procedures, NativeCode program) {
+    const char* infile;
+    std::ofstream ofile;
+    std::ostream* output;
+    std::ostream* stats;
+    Native native;
+    uint64_t val, heap_words, nursery_words, gc_threads, heap_limit, stack_words, jit_threshold;
+    bool gc_stats, stack_engine, jit;
+
+    // Parse arguments and set output.
+    heap_words = DEFAULT_HEAP_WORDS;
+    nursery_words = DEFAULT_NURSERY_WORDS;
+    gc_threads = DEFAULT_GC_THREADS;
+    heap_limit = DEFAULT_HEAP_LIMIT;
+    stack_words = DEFAULT_STACK_WORDS;
+    gc_stats = false;
+    stack_engine = false;
+    jit = false;
+    jit_threshold = DEFAULT_JIT_THRESHOLD;
+    infile = nullptr;
+    if (parse_args(argc, argv, infile, ofile, output, heap_words, nursery_words, gc_threads, heap_limit, stack_words, gc_stats, stack_engine, jit, jit_threshold) != 0) return 1;
+
+    // The program is compiled in, so there is neither bytecode to read nor an engine to choose or compile with.
+    if (infile != nullptr || stack_engine || jit) {
+        std::cout << "usage: " << argv[0] << " [--heap-size WORDS] [--nursery-size WORDS] [--gc-threads N] [--heap-limit WORDS] [--stack-size WORDS] [--gc-stats] [outfile.txt]\n";
+        return 1;
+    }
+
+    // Load program, rejecting invalid bytecode.
+    try {
+        native = Native(bytes, procedures, heap_words, nursery_words, gc_threads, heap_limit, stack_words);
+    }
+    catch (const std::runtime_error& error) {
+        std::cerr << error.what();
+        return 1;
+    }
+
+    // Run program.
+    val = native.run(program);
+
+    // Print out return value.
+    native.print_val(val, output);
+    *output << std::endl;
+
+    // Report collection pauses apart from the program's output.
+    if (gc_stats) {
+        stats = &std::cerr;
+        native.print_gc_stats(stats);
+    }
+
+    // Clean up.
+    if (ofile.is_open()) ofile.close();
+
+    return 0;
+}
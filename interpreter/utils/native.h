@@ -0,0 +1,129 @@
+/*
+ * native.h - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ * - Runtime for programs compiled ahead of time into native code by compiler/native.py.
+ * - Native code keeps its values in the slots of the interpreter's stack, so collections find them as they do when interpreting.
+ *
+ */
+
+#pragma once
+#include "interpreter.h"
+#include "values.h"
+#include <algorithm>
+#include <cstdint>
+#include <span>
+#include <stdexcept>
+#include <vector>
+
+// C stack given to native code for each word of the operand stack, so that the operand stack overflows first.
+#define NATIVE_STACK_BYTES_PER_WORD 128
+
+class Native;
+
+// Code of a procedure compiled ahead of time, given the stack index its frame starts at.
+// Returns its value, or TAIL_CALL_VALUE for its caller to call the running closure with the arguments now at the start of the frame.
+typedef uint64_t (*NativeCode)(Native& vm, uint64_t base);
+
+// Procedure compiled ahead of time along with the entry point of its bytecode, which its closures hold.
+struct NativeProcedure {
+    uint64_t entry;
+    NativeCode code;
+};
+
+class Native {
+public:
+    // Slots of the stack, which never moves.
+    uint64_t* slots;
+
+    // Default constructor.
+    Native(void);
+
+    // Load the bytecode of a program along with the native code of its procedures.
+    // The bytecode holds the program's constants and the operands of the instructions the runtime carries out, and is verified as when interpreted.
+    Native(std::span<const uint8_t> bytes, std::span<const NativeProcedure> procedures, uint64_t heap_words = DEFAULT_HEAP_WORDS, uint64_t nursery_words = DEFAULT_NURSERY_WORDS, uint64_t threads = DEFAULT_GC_THREADS, uint64_t heap_limit = DEFAULT_HEAP_LIMIT, uint64_t stack_words = DEFAULT_STACK_WORDS);
+
+    // Run the program's own code on a thread whose C stack is sized to the operand stack and return its value.
+    uint64_t run(NativeCode program);
+
+    // Print out value.
+    void print_val(uint64_t val, std::ostream*& output) { vm.print_val(val, output); }
+
+    // Print number of collections of each kind, the time they took and the most words found live.
+    void print_gc_stats(std::ostream*& output) { vm.print_gc_stats(output); }
+
+    // Carry out the instruction at the given location in the bytecode with values in the slots below the given index, as the interpreter would.
+    void step(uint64_t at, uint64_t sp) { vm.step(at, sp); }
+
+    // Get car (field 0) or cdr (field 1) of a pair.
+    uint64_t pair_field(uint64_t pair, uint64_t field) { return vm.pair_field(pair >> PAIR_SHIFT, field); }
+
+    // Get free of the running procedure's closure. Collections may move the closure, so it is read afresh each time.
+    uint64_t get_free(uint64_t ind) { return vm.heap[(vm.current_closure >> CLOSURE_SHIFT) + CLOSURE_LEN + ind]; }
+
+    // Call the closure in the given slot with the given number of arguments in the slots below it and return its value.
+    uint64_t call(uint64_t top, uint64_t num_args) {
+        uint64_t closure, base, val;
+
+        // The closure must take as many arguments as it is passed.
+        closure = slots[top] >> CLOSURE_SHIFT;
+        if (vm.heap[closure + 1] != num_args) throw std::runtime_error("Wrong number of arguments.\n");
+
+        // Native code returns to its caller by itself, but the collector must still find the caller's closure.
+        vm.frames.push_back({0, 0, vm.current_closure});
+        vm.current_closure = slots[top];
+
+        // The arguments stay where they were pushed and start the callee's frame, which must fit on the stack.
+        base = top - num_args;
+        if (base + vm.heap[closure + 2] > vm.stack.size()) throw std::runtime_error("Stack overflow.\n");
+
+        // Keep calling whichever closure the last call left running for as long as it ends in a tail call.
+        val = codes[vm.heap[closure]](*this, base);
+        while (val == TAIL_CALL_VALUE)
+            val = codes[vm.heap[vm.current_closure >> CLOSURE_SHIFT]](*this, base);
+
+        vm.current_closure = vm.frames.back().closure;
+        vm.frames.pop_back();
+
+        return val;
+    }
+
+    // Make the closure in the given slot the running one and move the given number of arguments below it to the start of the frame at the given base.
+    // Returns the entry point of its code, which the caller runs in place of its own.
+    uint64_t tail_call(uint64_t base, uint64_t top, uint64_t num_args) {
+        uint64_t closure;
+
+        closure = slots[top] >> CLOSURE_SHIFT;
+        if (vm.heap[closure + 1] != num_args) throw std::runtime_error("Wrong number of arguments.\n");
+        vm.current_closure = slots[top];
+
+        std::copy_n(slots + top - num_args, num_args, slots + base);
+        if (base + vm.heap[closure + 2] > vm.stack.size()) throw std::runtime_error("Stack overflow.\n");
+
+        return vm.heap[closure];
+    }
+
+private:
+    Interpreter vm;
+
+    // Native code of each procedure, indexed by the entry point of its bytecode.
+    std::vector<NativeCode> codes;
+};
+
+/*
+ * Runs a program compiled ahead of time and prints its value, taking the same options as interpret but no bytecode.
+ *
+ * Args:
+ * - argc (int): number of arguments to main()
+ * - argv (char**): array of arguments to main()
+ * - bytes (std::span<const uint8_t>): bytecode of the program
+ * - procedures (std::span<const NativeProcedure>): native code of each of the program's procedures
+ * - program (NativeCode): native code of the program's own code
+ *
+ * Returns:
+ * int: 0 for success, 1 for failure
+ *
+ */
+int native_main(int argc, char** argv, std::span<const uint8_t> bytes, std::span<const NativeProcedure> procedures, NativeCode program);
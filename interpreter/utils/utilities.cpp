@@ -8,42 +8,117 @@
  */
 
 #include "utilities.h"
+#include "arena.h"
+#include <exception>
+#include <stdexcept>
+#include <pthread.h>
+
+// Function to run on a thread and what it returned or threw, handed to and back from the thread.
+struct StackRun {
+    const std::function<uint64_t(void)>* body;
+    uint64_t val;
+    std::exception_ptr error;
+};
+
+// Run a function, catching what it throws to hand back.
+static void* run_body(void* arg) {
+    StackRun* run;
+
+    run = static_cast<StackRun*>(arg);
+    try {
+        run->val = (*run->body)();
+    }
+    catch (...) {
+        run->error = std::current_exception();
+    }
+
+    return nullptr;
+}
 
 /*
- * Parses program arguments and sets input and output.
- * Defaults to setting input to stdin and output to stdout unless input/output file(s) specified as arguments to main().
+ * Parses program arguments, names the input file and sets output.
+ * Defaults to reading stdin and writing stdout unless input/output file(s) specified as arguments to main(). The input file is opened by the caller.
+ * Optional leading "--heap-size WORDS" and "--nursery-size WORDS" set how much the old space and the nursery may hold before garbage is collected.
+ * "--gc-threads N" spreads full collections over N threads and "--gc-stats" reports how long collections took.
+ * "--heap-limit WORDS" sets how much address space is reserved for the heap up front and "--stack-size WORDS" how many words the operand stack holds.
+ * "--stack-engine" runs the program as compiled rather than translating it into register form when loaded.
+ * "--jit" compiles procedures into machine code once they have been called often enough, and "--jit-threshold CALLS" sets how often that is.
  *
  * Args:
  * - argc (int): number of arguments to main()
  * - argv (char**): array of arguments to main()
- * - ifile (std::ifstream&): reference to input file pointer
- * - input (std::istream*&): reference to pointer to input stream, set to stdin by default
+ * - infile (const char*&): reference to path of input file, set to nullptr to read stdin by default
  * - ofile (std::ofstream&): reference to output file pointer
  * - output (std::ostream*&): reference to pointer to output stream, set to stdout by default
+ * - heap_words (uint64_t&): reference to size of the old space in words, left unchanged unless --heap-size is given
+ * - nursery_words (uint64_t&): reference to size of the nursery in words, left unchanged unless --nursery-size is given
+ * - gc_threads (uint64_t&): reference to number of threads full collections use, left unchanged unless --gc-threads is given
+ * - heap_limit (uint64_t&): reference to most words either half of the heap may grow to, left unchanged unless --heap-limit is given
+ * - stack_words (uint64_t&): reference to number of words in the operand stack, left unchanged unless --stack-size is given
+ * - gc_stats (bool&): reference to whether to report collection pauses, set if --gc-stats is given
+ * - stack_engine (bool&): reference to whether to run the stack form of the program, set if --stack-engine is given
+ * - jit (bool&): reference to whether to compile hot procedures into machine code, set if --jit or --jit-threshold is given
+ * - jit_threshold (uint64_t&): reference to number of calls after which a procedure is compiled, left unchanged unless --jit-threshold is given
  *
  * Returns:
  * int: 0 for success, 1 for failure
  *
  */
-int parse_args(int argc, char** argv, std::ifstream& ifile, std::istream*& input, std::ofstream& ofile, std::ostream*& output) {
+int parse_args(int argc, char** argv, const char*& infile, std::ofstream& ofile, std::ostream*& output, uint64_t& heap_words, uint64_t& nursery_words, uint64_t& gc_threads, uint64_t& heap_limit, uint64_t& stack_words, bool& gc_stats, bool& stack_engine, bool& jit, uint64_t& jit_threshold) {
     std::string arg;
 
+    // Take options off the front of the arguments if provided.
+    while (argc >= 2 && std::string(argv[1]).substr(0, 2) == "--") {
+        arg = std::string(argv[1]);
+
+        if (arg == "--gc-stats") {
+            gc_stats = true;
+            argc -= 1;
+            argv += 1;
+            continue;
+        }
+
+        if (arg == "--stack-engine") {
+            stack_engine = true;
+            argc -= 1;
+            argv += 1;
+            continue;
+        }
+
+        if (arg == "--jit") {
+            jit = true;
+            argc -= 1;
+            argv += 1;
+            continue;
+        }
+
+        if ((arg != "--heap-size" && arg != "--nursery-size" && arg != "--gc-threads" && arg != "--heap-limit" && arg != "--stack-size" && arg != "--jit-threshold") || argc < 3 || std::string(argv[2]).empty() || std::string(argv[2]).find_first_not_of("0123456789") != std::string::npos) {
+            std::cout << "usage: ./interpret [--heap-size WORDS] [--nursery-size WORDS] [--gc-threads N] [--heap-limit WORDS] [--stack-size WORDS] [--gc-stats] [--stack-engine] [--jit] [--jit-threshold CALLS] [infile.bc] [outfile.txt]\n";
+            return 1;
+        }
+
+        if (arg == "--heap-size") heap_words = std::stoull(argv[2]);
+        else if (arg == "--nursery-size") nursery_words = std::stoull(argv[2]);
+        else if (arg == "--gc-threads") gc_threads = std::stoull(argv[2]);
+        else if (arg == "--heap-limit") heap_limit = std::stoull(argv[2]);
+        else if (arg == "--stack-size") stack_words = std::stoull(argv[2]);
+        else {
+            jit_threshold = std::stoull(argv[2]);
+            jit = true;
+        }
+        argc -= 2;
+        argv += 2;
+    }
+
     // Check arguments.
     if (argc != 1 && argc != 2 && argc != 3) {
-        std::cout << "usage: ./interpret [infile.bc] [outfile.txt]\n";
+        std::cout << "usage: ./interpret [--heap-size WORDS] [--nursery-size WORDS] [--gc-threads N] [--heap-limit WORDS] [--stack-size WORDS] [--gc-stats] [--stack-engine] [--jit] [--jit-threshold CALLS] [infile.bc] [outfile.txt]\n";
         return 1;
     }
 
-    // Open input and output files if provided.
+    // Name the input file and open the output file if provided.
     if (argc == 3) {
-        ifile.open(argv[1], std::ios::binary);
-
-        if (!ifile.is_open()) {
-            std::cerr << "Failed to open file.\n";
-            return 1;
-        }
-        
-        input = &ifile;
+        infile = argv[1];
 
         ofile.open(argv[2]);
 
@@ -56,7 +131,7 @@ int parse_args(int argc, char** argv, std::ifstream& ifile, std::istream*& input
     }
     // If no arguments are provided, use stdin and stdout.
     else if (argc == 1) {
-        input = &std::cin;
+        infile = nullptr;
         output = &std::cout;
     }
     // If two arguments are provided, determine if it was an input file or an output file.
@@ -65,14 +140,7 @@ int parse_args(int argc, char** argv, std::ifstream& ifile, std::istream*& input
 
         // This is the case if an input file was provided.
         if (arg.length() >= 3 && arg.substr(arg.length() - 3) == ".bc") {
-            ifile.open(argv[1], std::ios::binary);
-
-            if (!ifile.is_open()) {
-                std::cerr << "Failed to open file.\n";
-                return 1;
-            }
-
-            input = &ifile;
+            infile = argv[1];
             output = &std::cout;
         } 
         // THis is when an output file was provided.
@@ -84,14 +152,48 @@ int parse_args(int argc, char** argv, std::ifstream& ifile, std::istream*& input
                 return 1;
             }
 
-            input = &std::cin;
+            infile = nullptr;
             output = &ofile;
         } 
         else {
-            std::cout << "usage: ./interpret [infile.bc] [outfile.txt]\n";
+            std::cout << "usage: ./interpret [--heap-size WORDS] [--nursery-size WORDS] [--gc-threads N] [--heap-limit WORDS] [--stack-size WORDS] [--gc-stats] [--stack-engine] [--jit] [--jit-threshold CALLS] [infile.bc] [outfile.txt]\n";
             return 1;
         }
     }
 
     return 0;
 }
+
+/*
+ * Runs a function on a thread of its own whose stack holds the given number of bytes, for code that recurses on the C stack as deeply as programs nest calls.
+ * Threads of the standard library cannot be given a stack size, so a POSIX thread is used. Its stack is reserved as the heap is, so only the pages it touches are ever backed.
+ *
+ * Args:
+ * - bytes (uint64_t): size of the thread's stack in bytes
+ * - body (const std::function<uint64_t(void)>&): function to run
+ *
+ * Returns:
+ * uint64_t: value returned by the function, what it threw being rethrown instead
+ *
+ */
+uint64_t run_with_stack(uint64_t bytes, const std::function<uint64_t(void)>& body) {
+    StackRun run = {&body, 0, nullptr};
+    Arena c_stack;
+    pthread_attr_t attr;
+    pthread_t thread;
+    uint64_t words;
+
+    words = (bytes + sizeof(uint64_t) - 1) / sizeof(uint64_t);
+    c_stack = Arena(words);
+    c_stack.resize(words);
+
+    if (pthread_attr_init(&attr) != 0 || pthread_attr_setstack(&attr, c_stack.data(), words * sizeof(uint64_t)) != 0 || pthread_create(&thread, &attr, run_body, &run) != 0)
+        throw std::runtime_error("Failed to start thread.\n");
+    pthread_join(thread, nullptr);
+    pthread_attr_destroy(&attr);
+
+    // Errors are reported as they would be had the function run on this thread.
+    if (run.error) std::rethrow_exception(run.error);
+
+    return run.val;
+}
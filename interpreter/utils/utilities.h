@@ -10,22 +10,51 @@
 #pragma once
 #include <iostream>
 #include <fstream>
+#include <cstdint>
+#include <functional>
 
 /*
- * Parses program arguments and sets input and output.
- * Defaults to setting input to stdin and output to stdout unless input/output file(s) specified as arguments to main().
+ * Parses program arguments, names the input file and sets output.
+ * Defaults to reading stdin and writing stdout unless input/output file(s) specified as arguments to main(). The input file is opened by the caller.
+ * Optional leading "--heap-size WORDS" and "--nursery-size WORDS" set how much the old space and the nursery may hold before garbage is collected.
+ * "--gc-threads N" spreads full collections over N threads and "--gc-stats" reports how long collections took.
+ * "--heap-limit WORDS" sets how much address space is reserved for the heap up front and "--stack-size WORDS" how many words the operand stack holds.
+ * "--stack-engine" runs the program as compiled rather than translating it into register form when loaded.
+ * "--jit" compiles procedures into machine code once they have been called often enough, and "--jit-threshold CALLS" sets how often that is.
  *
  * Args:
  * - argc (int): number of arguments to main()
  * - argv (char**): array of arguments to main()
- * - ifile (std::ifstream&): reference to input file pointer
- * - input (std::istream*&): reference to pointer to input stream, set to stdin by default
+ * - infile (const char*&): reference to path of input file, set to nullptr to read stdin by default
  * - ofile (std::ofstream&): reference to output file pointer
  * - output (std::ostream*&): reference to pointer to output stream, set to stdout by default
+ * - heap_words (uint64_t&): reference to size of the old space in words, left unchanged unless --heap-size is given
+ * - nursery_words (uint64_t&): reference to size of the nursery in words, left unchanged unless --nursery-size is given
+ * - gc_threads (uint64_t&): reference to number of threads full collections use, left unchanged unless --gc-threads is given
+ * - heap_limit (uint64_t&): reference to most words either half of the heap may grow to, left unchanged unless --heap-limit is given
+ * - stack_words (uint64_t&): reference to number of words in the operand stack, left unchanged unless --stack-size is given
+ * - gc_stats (bool&): reference to whether to report collection pauses, set if --gc-stats is given
+ * - stack_engine (bool&): reference to whether to run the stack form of the program, set if --stack-engine is given
+ * - jit (bool&): reference to whether to compile hot procedures into machine code, set if --jit or --jit-threshold is given
+ * - jit_threshold (uint64_t&): reference to number of calls after which a procedure is compiled, left unchanged unless --jit-threshold is given
  *
  * Returns:
  * int: 0 for success, 1 for failure
  *
  */
-int parse_args(int argc, char** argv, std::ifstream& ifile, std::istream*& input, std::ofstream& ofile, std::ostream*& output);
+int parse_args(int argc, char** argv, const char*& infile, std::ofstream& ofile, std::ostream*& output, uint64_t& heap_words, uint64_t& nursery_words, uint64_t& gc_threads, uint64_t& heap_limit, uint64_t& stack_words, bool& gc_stats, bool& stack_engine, bool& jit, uint64_t& jit_threshold);
 
+
+/*
+ * Runs a function on a thread of its own whose stack holds the given number of bytes, for code that recurses on the C stack as deeply as programs nest calls.
+ * Threads of the standard library cannot be given a stack size, so a POSIX thread is used. Its stack is reserved as the heap is, so only the pages it touches are ever backed.
+ *
+ * Args:
+ * - bytes (uint64_t): size of the thread's stack in bytes
+ * - body (const std::function<uint64_t(void)>&): function to run
+ *
+ * Returns:
+ * uint64_t: value returned by the function, what it threw being rethrown instead
+ *
+ */
+uint64_t run_with_stack(uint64_t bytes, const std::function<uint64_t(void)>& body);
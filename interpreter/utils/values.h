@@ -0,0 +1,148 @@
+/*
+ * values.h - 
+ *
+ * Josh Meise
+ * 10-19-2026
+ * Description: 
+ * - Tagged representation of values and the operations on them that need nothing but the values themselves.
+ * - Shared by the interpreter, the machine code it compiles and programs compiled ahead of time into native code.
+ *
+ */
+
+#pragma once
+#include <cstdint>
+
+#define FIXNUM_SHIFT 2
+#define FIXNUM_MASK 3
+#define FIXNUM_TAG 0
+#define CHAR_SHIFT 8
+#define CHAR_MASK 255
+#define CHAR_TAG 15
+#define BOOL_SHIFT 7
+#define BOOL_MASK 127
+#define BOOL_TAG 31
+#define EMPTY_LIST_MASK 255
+#define EMPTY_LIST_TAG 47
+#define PAIR_SHIFT 3
+#define PAIR_MASK 7
+#define PAIR_TAG 1
+#define STR_SHIFT 3
+#define STR_MASK 7
+#define STR_TAG 3
+#define VEC_SHIFT 3
+#define VEC_MASK 7
+#define VEC_TAG 2
+#define CLOSURE_SHIFT 3
+#define CLOSURE_MASK 7
+#define CLOSURE_TAG 6
+#define SYMBOL_SHIFT 3
+#define SYMBOL_TAG 5
+#define SYMBOL_MASK 7
+
+// Words of a closure before its frees: its entry point, the number of arguments it takes and the stack depth its code needs.
+#define CLOSURE_LEN 3
+
+// Returned by compiled code in place of its value once it has moved the arguments of a tail call to the start of its frame and made the callee the running closure. No value has its tag.
+#define TAIL_CALL_VALUE 7
+
+// Box a truth value as a boolean.
+inline uint64_t box_bool(bool truth) {
+    if (truth) return ((1 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+
+    return ((0 << BOOL_SHIFT) & ~BOOL_MASK) | BOOL_TAG;
+}
+
+// Box the result of integer arithmetic as a fixnum.
+inline uint64_t box_fixnum(uint64_t val) {
+    return ((val << FIXNUM_SHIFT) & ~FIXNUM_MASK) | FIXNUM_TAG;
+}
+
+// Check whether a value is false. The boolean value false is the only false value.
+inline bool is_false(uint64_t val) {
+    return ((val & BOOL_MASK) == BOOL_TAG) && (val >> BOOL_SHIFT == 0);
+}
+
+// Add 1 to a value. Add 4 due to shift.
+inline uint64_t add1_value(uint64_t val) {
+    return val + 4;
+}
+
+// Subtract 1 from a value. Subtract 4 due to shift.
+inline uint64_t sub1_value(uint64_t val) {
+    return val - 4;
+}
+
+// Convert a value from integer to character by shifting and retagging.
+inline uint64_t int_to_char_value(uint64_t val) {
+    return ((val << (CHAR_SHIFT - FIXNUM_SHIFT)) & ~CHAR_MASK) | CHAR_TAG;
+}
+
+// Convert a value from character to integer by shifting and retagging.
+inline uint64_t char_to_int_value(uint64_t val) {
+    return ((val >> (CHAR_SHIFT - FIXNUM_SHIFT)) & ~FIXNUM_MASK) | FIXNUM_TAG;
+}
+
+// Check if a value is 0.
+inline uint64_t is_zero_value(uint64_t val) {
+    return box_bool(val >> FIXNUM_SHIFT == 0);
+}
+
+// Check if a value is ().
+inline uint64_t is_null_value(uint64_t val) {
+    return box_bool((val & EMPTY_LIST_MASK) == EMPTY_LIST_TAG);
+}
+
+// Convert a value to falsy if truthy and to truthy if falsy.
+inline uint64_t invert_value(uint64_t val) {
+    return box_bool(is_false(val));
+}
+
+// Check if a value is an integer.
+inline uint64_t is_int_value(uint64_t val) {
+    return box_bool((val & FIXNUM_MASK) == FIXNUM_TAG);
+}
+
+// Check if a value is a boolean.
+inline uint64_t is_bool_value(uint64_t val) {
+    return box_bool((val & BOOL_MASK) == BOOL_TAG);
+}
+
+// Add two values.
+inline uint64_t plus_value(uint64_t val_1, uint64_t val_2) {
+    return box_fixnum((val_1 >> FIXNUM_SHIFT) + (val_2 >> FIXNUM_SHIFT));
+}
+
+// Multiply two values.
+inline uint64_t times_value(uint64_t val_1, uint64_t val_2) {
+    return box_fixnum((val_1 >> FIXNUM_SHIFT) * (val_2 >> FIXNUM_SHIFT));
+}
+
+// Subtract the second value from the first.
+inline uint64_t minus_value(uint64_t val_1, uint64_t val_2) {
+    return box_fixnum((val_1 >> FIXNUM_SHIFT) - (val_2 >> FIXNUM_SHIFT));
+}
+
+// Check that the first value is less than the second.
+inline uint64_t less_than_value(uint64_t val_1, uint64_t val_2) {
+    return box_bool((val_1 >> FIXNUM_SHIFT) < (val_2 >> FIXNUM_SHIFT));
+}
+
+// Check that the first value is greater than the second.
+inline uint64_t greater_than_value(uint64_t val_1, uint64_t val_2) {
+    return box_bool((val_1 >> FIXNUM_SHIFT) > (val_2 >> FIXNUM_SHIFT));
+}
+
+// Check that the first value is at most the second.
+inline uint64_t less_than_equal_value(uint64_t val_1, uint64_t val_2) {
+    return box_bool((val_1 >> FIXNUM_SHIFT) <= (val_2 >> FIXNUM_SHIFT));
+}
+
+// Check that the first value is at least the second.
+inline uint64_t greater_than_equal_value(uint64_t val_1, uint64_t val_2) {
+    return box_bool((val_1 >> FIXNUM_SHIFT) >= (val_2 >> FIXNUM_SHIFT));
+}
+
+// Check that two values are equal.
+inline uint64_t equal_value(uint64_t val_1, uint64_t val_2) {
+    return box_bool((val_1 >> FIXNUM_SHIFT) == (val_2 >> FIXNUM_SHIFT));
+}
@@ -0,0 +1,110 @@
+# run_benchmarks.py - times the interpreter on benchmark programs
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+# - Compiles each Scheme program in benchmarks/ once and interprets it several times.
+# - Reports the best wall clock time and the peak resident memory of the interpreter for each program.
+# - Builds and cleans interpreter, optionally packing pairs into a single word with --compressed-refs.
+# - --switch-dispatch builds the interpreter to switch on each opcode instead of jumping through a table of labels, to compare the two.
+# - --stack-engine runs the bytecode as compiled rather than translated into register form.
+# - --jit compiles procedures into machine code once they have been called often enough.
+# - --native compiles each program ahead of time into C++ and times the executable g++ builds from it instead.
+#
+
+import sys
+import subprocess
+import os
+import time
+import tempfile
+
+ARGC = [1, 2, 3, 4, 5]
+RUNS = 5
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS_DIR = os.path.join(BASE_DIR, "benchmarks")
+INTERPRETER_UTILS_DIR = os.path.join(BASE_DIR, "interpreter", "utils")
+INTERPRETER_EXECS_DIR = os.path.join(BASE_DIR, "interpreter", "execs")
+INTERPRETER_LIB_DIR = os.path.join(BASE_DIR, "interpreter", "lib")
+INTERPRET = os.path.join(INTERPRETER_EXECS_DIR, "interpret")
+# Flags g++ builds programs compiled ahead of time with.
+NATIVE_FLAGS = ["-O2", "-std=c++20", "-pthread", "-I" + INTERPRETER_UTILS_DIR]
+# Build options taken on the command line and the make variables they set.
+BUILD_OPTIONS = {"--compressed-refs": "COMPRESSED_REFS=1", "--switch-dispatch": "SWITCH_DISPATCH=1"}
+# Options taken on the command line and passed on to the interpreter.
+RUN_OPTIONS = ["--stack-engine", "--jit"]
+
+def run_once(command: list) -> tuple:
+    """
+    Runs a compiled program once.
+
+    Args:
+        command (list): Interpreter with its options and the path of the compiled program, or the path of a native executable.
+
+    Returns:
+        tuple: Output of the program, wall clock time in seconds and peak resident memory in kilobytes.
+    """
+    start = time.perf_counter()
+    inter = subprocess.Popen(command, stdout = subprocess.PIPE, stderr = subprocess.DEVNULL)
+    stdout = inter.stdout.read()
+    _, status, usage = os.wait4(inter.pid, 0)
+    elapsed = time.perf_counter() - start
+    inter.returncode = os.waitstatus_to_exitcode(status)
+
+    if inter.returncode != 0:
+        raise RuntimeError("Interpretation failed.")
+
+    return stdout.decode("utf-8").strip(), elapsed, usage.ru_maxrss
+
+if __name__ == "__main__":
+    # Parse arguments.
+    args = sys.argv[1:]
+    build = []
+    flags = []
+    native = False
+    while len(args) >= 1 and ((args[0] in BUILD_OPTIONS and BUILD_OPTIONS[args[0]] not in build) or (args[0] in RUN_OPTIONS and args[0] not in flags) or (args[0] == "--native" and not native)):
+        if args[0] in BUILD_OPTIONS:
+            build.append(BUILD_OPTIONS[args[0]])
+        elif args[0] in RUN_OPTIONS:
+            flags.append(args[0])
+        else:
+            native = True
+        args = args[1:]
+
+    # Native code has no engine to choose, and only the register form is compiled into machine code.
+    if len(sys.argv) not in ARGC or len(args) > 1 or (len(args) == 1 and args[0].startswith("--")) or (native and flags) or len(flags) > 1:
+        print("usage: python3 run_benchmarks.py [ --compressed-refs ] [ --switch-dispatch ] [ --stack-engine | --jit | --native ] [ benchmark_name ]")
+        sys.exit(1)
+
+    # Build interpreter.
+    subprocess.run(["make clean; make " + " ".join(build)], cwd = INTERPRETER_UTILS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    subprocess.run(["make clean; make"], cwd = INTERPRETER_EXECS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+
+    names = sorted(name[:-4] for name in os.listdir(BENCHMARKS_DIR) if name.endswith(".scm"))
+    if len(args) == 1:
+        names = [name for name in names if name == args[0]]
+
+    print(f"{'benchmark':<24}{'best (s)':>12}{'peak (KB)':>12}  result")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            bytecode = os.path.join(tmp, f"{name}.bc")
+            source = os.path.join(tmp, f"{name}.cpp")
+            program = os.path.join(tmp, name)
+
+            # Compile once so that only the interpreter or the native executable is timed.
+            if native:
+                with open(source, "w") as f:
+                    subprocess.run(["python3", "-m", "compiler.native", os.path.join(BENCHMARKS_DIR, f"{name}.scm")], cwd = BASE_DIR, check = True, stdout = f)
+                subprocess.run(["g++"] + NATIVE_FLAGS + [source, "-L" + INTERPRETER_LIB_DIR, "-lutils", "-o", program], check = True)
+                command = [program]
+            else:
+                with open(bytecode, "wb") as f:
+                    subprocess.run(["python3", "-m", "compiler.compile", os.path.join(BENCHMARKS_DIR, f"{name}.scm")], cwd = BASE_DIR, check = True, stdout = f)
+                command = [INTERPRET] + flags + [bytecode]
+
+            runs = [run_once(command) for _ in range(RUNS)]
+            print(f"{name:<24}{min(run[1] for run in runs):>12.3f}{max(run[2] for run in runs):>12}  {runs[0][0]}")
+
+    # Clean up interpreter.
+    subprocess.run(["make clean"], cwd = INTERPRETER_UTILS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    subprocess.run(["make clean"], cwd = INTERPRETER_EXECS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
@@ -0,0 +1,75 @@
+# run_gc_benchmarks.py - times garbage collection pauses over different numbers of threads
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+# - Compiles a Scheme program in benchmarks/ once and interprets it with full collections spread over 1, 2, 4 and 8 threads.
+# - Reports the number of full collections, their total time and the longest pause, taking the best of several runs.
+# - Builds and cleans interpreter.
+#
+
+import sys
+import subprocess
+import os
+import re
+import tempfile
+
+ARGC = [1, 2]
+RUNS = 3
+THREADS = [1, 2, 4, 8]
+DEFAULT_BENCHMARK = "vector_of_lists"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS_DIR = os.path.join(BASE_DIR, "benchmarks")
+INTERPRETER_UTILS_DIR = os.path.join(BASE_DIR, "interpreter", "utils")
+INTERPRETER_EXECS_DIR = os.path.join(BASE_DIR, "interpreter", "execs")
+INTERPRET = os.path.join(INTERPRETER_EXECS_DIR, "interpret")
+FULL_STATS = re.compile(r"full collections: (\d+) total (\d+) us longest (\d+) us")
+
+def run_once(bytecode: str, threads: int) -> tuple:
+    """
+    Interprets a compiled program once and reads back its full collection statistics.
+
+    Args:
+        bytecode (str): Path of the compiled program.
+        threads (int): Number of threads full collections use.
+
+    Returns:
+        tuple: Output of the program, number of full collections, their total time and the longest pause, both in microseconds.
+    """
+    inter = subprocess.run([INTERPRET, "--gc-threads", str(threads), "--gc-stats", bytecode], capture_output = True)
+
+    if inter.returncode != 0:
+        raise RuntimeError("Interpretation failed.")
+
+    stats = FULL_STATS.search(inter.stderr.decode("utf-8"))
+
+    return inter.stdout.decode("utf-8").strip(), int(stats[1]), int(stats[2]), int(stats[3])
+
+if __name__ == "__main__":
+    # Parse arguments.
+    if len(sys.argv) not in ARGC:
+        print("usage: python3 run_gc_benchmarks.py [ benchmark_name ]")
+        sys.exit(1)
+
+    name = sys.argv[1] if len(sys.argv) == 2 else DEFAULT_BENCHMARK
+
+    # Build interpreter.
+    subprocess.run(["make clean; make"], cwd = INTERPRETER_UTILS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    subprocess.run(["make clean; make"], cwd = INTERPRETER_EXECS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+
+    print(f"{'threads':<10}{'full GCs':>10}{'total (ms)':>14}{'longest (ms)':>14}  result")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bytecode = os.path.join(tmp, f"{name}.bc")
+
+        # Compile once so that only the interpreter is timed.
+        with open(bytecode, "wb") as f:
+            subprocess.run(["python3", "-m", "compiler.compile", os.path.join(BENCHMARKS_DIR, f"{name}.scm")], cwd = BASE_DIR, check = True, stdout = f)
+
+        for threads in THREADS:
+            runs = [run_once(bytecode, threads) for _ in range(RUNS)]
+            print(f"{threads:<10}{runs[0][1]:>10}{min(run[2] for run in runs) / 1000:>14.1f}{min(run[3] for run in runs) / 1000:>14.1f}  {runs[0][0]}")
+
+    # Clean up interpreter.
+    subprocess.run(["make clean"], cwd = INTERPRETER_UTILS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    subprocess.run(["make clean"], cwd = INTERPRETER_EXECS_DIR, check = True, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
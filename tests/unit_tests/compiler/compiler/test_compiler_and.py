@@ -19,7 +19,7 @@ class AndCompileTests(unittest.TestCase):
     def _compile(self, expr: bool) -> bytes:
         """
         Compiles the provided expression.
-        Wrapper around Compile class' compile_function() and write_to_stream() functions.
+        Wrapper around Compile class' compile_function() and write_code() functions.
         Writes compiled code to provided output stream.
 
         Args:
@@ -31,7 +31,7 @@ class AndCompileTests(unittest.TestCase):
         buf = BytesIO()
         c = Compiler()
         c.compile_function(expr)
-        c.write_to_stream(buf)
+        c.write_code(buf)
         return buf.getvalue()
 
     def test_and_simple_true(self):
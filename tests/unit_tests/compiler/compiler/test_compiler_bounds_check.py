@@ -0,0 +1,154 @@
+# test_compiler_bounds_check.py - tests elimination of bounds checks on vector and string accesses
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+from compiler.parser import scheme_parse
+from compiler.bounds import elide_bounds_checks
+
+LOOP = "(let ((v (vector 1 2 3))) (letrec ((loop (lambda (i acc) (if {} (loop {} (+ acc (vector-ref v {}))) acc)))) (loop {} 0)))"
+
+class BoundsCheckCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for the elimination of bounds checks.
+    """
+
+    def _compile(self, expr: list) -> bytes:
+        """
+        Compiles the provided expression.
+        Wrapper around Compile class' compile_function() and write_code() functions.
+        Writes compiled code to provided output stream.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Return:
+            bytes: Bytes object containing compiled code.
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(expr)
+        c.write_code(buf)
+        return buf.getvalue()
+
+    def _access(self, source: str) -> str:
+        """
+        Parses the provided Scheme source code and eliminates its bounds checks.
+
+        Args:
+            source (str): Scheme source code containing a single vector access inside the first procedure.
+
+        Returns:
+            str: Name of the primitive used for the access.
+        """
+        ast = elide_bounds_checks(scheme_parse(source))
+        body = ast[1][0][1][3]
+        return body[2][2][2][0]
+
+    def test_bounds_check_constant_index(self):
+        """
+        Test (let ((v (vector 1 2 3))) (vector-ref v 2)).
+        """
+        self.assertEqual(elide_bounds_checks(scheme_parse("(let ((v (vector 1 2 3))) (vector-ref v 2))")), ["let", [("v", ["vector", 1, 2, 3])], ["unsafe-vector-ref", Local("v"), 2]])
+
+    def test_bounds_check_constant_index_out_of_range(self):
+        """
+        Test (let ((v (vector 1 2 3))) (vector-ref v 3)).
+        """
+        self.assertEqual(elide_bounds_checks(scheme_parse("(let ((v (vector 1 2 3))) (vector-ref v 3))")), ["let", [("v", ["vector", 1, 2, 3])], ["vector-ref", Local("v"), 3]])
+
+    def test_bounds_check_string_set(self):
+        """
+        Test (string-ref (string-set! (string "abc") 1 #\\z) 2).
+        """
+        self.assertEqual(elide_bounds_checks(scheme_parse("(string-ref (string-set! (string \"abc\") 1 #\\z) 2)")), ["unsafe-string-ref", ["unsafe-string-set!", ["string", "#\\a", "#\\b", "#\\c"], 1, "#\\z"], 2])
+
+    def test_bounds_check_vector_append(self):
+        """
+        Test (vector-ref (vector-append (vector 1) (vector 2)) 1).
+        """
+        self.assertEqual(elide_bounds_checks(scheme_parse("(vector-ref (vector-append (vector 1) (vector 2)) 1)")), ["unsafe-vector-ref", ["vector-append", ["vector", 1], ["vector", 2]], 1])
+
+    def test_bounds_check_loop_guard(self):
+        """
+        Test loop counting up from 0 guarded by (< i 3).
+        """
+        self.assertEqual(self._access(LOOP.format("(< i 3)", "(add1 i)", "i", "0")), "unsafe-vector-ref")
+
+    def test_bounds_check_loop_guard_too_large(self):
+        """
+        Test loop counting up from 0 guarded by (< i 4).
+        """
+        self.assertEqual(self._access(LOOP.format("(< i 4)", "(add1 i)", "i", "0")), "vector-ref")
+
+    def test_bounds_check_loop_guard_negative(self):
+        """
+        Test loop counting down from 0 guarded by (< i 3).
+        """
+        self.assertEqual(self._access(LOOP.format("(< i 3)", "(sub1 i)", "i", "0")), "vector-ref")
+
+    def test_bounds_check_loop_guard_flipped(self):
+        """
+        Test loop counting up from 0 guarded by (> 3 i).
+        """
+        self.assertEqual(self._access(LOOP.format("(> 3 i)", "(+ i 1)", "i", "0")), "unsafe-vector-ref")
+
+    def test_bounds_check_loop_count_down(self):
+        """
+        Test loop counting down from 3 guarded by (not (zero? i)).
+        """
+        self.assertEqual(self._access(LOOP.format("(not (zero? i))", "(sub1 i)", "(sub1 i)", "3")), "unsafe-vector-ref")
+
+    def test_bounds_check_loop_count_down_too_large(self):
+        """
+        Test loop counting down from 4 guarded by (not (zero? i)).
+        """
+        self.assertEqual(self._access(LOOP.format("(not (zero? i))", "(sub1 i)", "(sub1 i)", "4")), "vector-ref")
+
+    def test_bounds_check_escaping_procedure(self):
+        """
+        Test (let ((v (vector 1 2 3))) (let ((f (lambda (i) (vector-ref v i)))) (cons f (f 1)))).
+        """
+        ast = elide_bounds_checks(scheme_parse("(let ((v (vector 1 2 3))) (let ((f (lambda (i) (vector-ref v i)))) (cons f (f 1))))"))
+        self.assertEqual(ast[1][0][1][3][0], "vector-ref")
+
+    def test_bounds_check_known_procedure(self):
+        """
+        Test (let ((v (vector 1 2 3))) (let ((f (lambda (i) (vector-ref v i)))) (+ (f 1) (f 2)))).
+        """
+        ast = elide_bounds_checks(scheme_parse("(let ((v (vector 1 2 3))) (let ((f (lambda (i) (vector-ref v i)))) (+ (f 1) (f 2))))"))
+        self.assertEqual(ast[1][0][1][3][0], "unsafe-vector-ref")
+
+    def test_unsafe_vector_ref(self):
+        """
+        Test (unsafe-vector-ref (vector 1 2) 1).
+        """
+        self.assertEqual(self._compile(["unsafe-vector-ref", ["vector", 1, 2], 1]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x1F\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x32\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+    def test_unsafe_vector_set(self):
+        """
+        Test (unsafe-vector-set! (vector 1 2) 0 7).
+        """
+        self.assertEqual(self._compile(["unsafe-vector-set!", ["vector", 1, 2], 0, 7]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x1F\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x1C\x00\x00\x00\x00\x00\x00\x00\x33\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+    def test_unsafe_string_ref(self):
+        """
+        Test (unsafe-string-ref (string "hi") 1).
+        """
+        self.assertEqual(self._compile(["unsafe-string-ref", ["string", "#\\h", "#\\i"], 1]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x0F\x68\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x0F\x69\x00\x00\x00\x00\x00\x00\x1B\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x34\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+    def test_unsafe_string_set(self):
+        """
+        Test (unsafe-string-set! (string "hi") 0 #\\y).
+        """
+        self.assertEqual(self._compile(["unsafe-string-set!", ["string", "#\\h", "#\\i"], 0, "#\\y"]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x0F\x68\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x0F\x69\x00\x00\x00\x00\x00\x00\x1B\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x0F\x79\x00\x00\x00\x00\x00\x00\x35\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# test_compiler_bulk_literal.py - tests copying large string and vector literals out of the constant pool
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+
+class BulkLiteralCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for bulk string and vector literals.
+    """
+
+    def _pool(self, expr: list) -> tuple:
+        """
+        Compiles the provided expression and reports its constant pool.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Returns:
+            tuple: Code and constant pool of the compiled expression.
+        """
+        c = Compiler()
+        c.compile_function(expr)
+        return c.code, c.pool
+
+    def test_bulk_literal_string(self):
+        """
+        Test (string "abcdefgh").
+        """
+        self.assertEqual(self._pool(["string"] + [f"#\\{c}" for c in "abcdefgh"]), ([I.CLONE, 3, I.RETURN], [8, int.from_bytes(b"abcdefgh", "little")]))
+
+    def test_bulk_literal_vector(self):
+        """
+        Test (vector 1 2 3 4 5 6 7 #t).
+        """
+        self.assertEqual(self._pool(["vector", 1, 2, 3, 4, 5, 6, 7, True]), ([I.CLONE, 2, I.RETURN], [8, box_bool(True)] + [box_fixnum(i) for i in range(7, 0, -1)]))
+
+    def test_bulk_literal_short(self):
+        """
+        Test (string "abc").
+        """
+        self.assertEqual(self._pool(["string", "#\\a", "#\\b", "#\\c"]), ([I.LOAD64, box_char("#\\a"), I.LOAD64, box_char("#\\b"), I.LOAD64, box_char("#\\c"), I.STR, 3, I.RETURN], []))
+
+    def test_bulk_literal_not_constant(self):
+        """
+        Test (vector 1 2 3 4 5 6 7 (add1 7)).
+        """
+        code, pool = self._pool(["vector", 1, 2, 3, 4, 5, 6, 7, ["add1", 7]])
+        self.assertEqual(code[-3:], [I.VEC, 8, I.RETURN])
+        self.assertEqual(pool, [])
+
+    def test_bulk_literal_shared(self):
+        """
+        Test (cons (vector 1 2 3 4 5 6 7 8) (vector 1 2 3 4 5 6 7 8)).
+        """
+        expr = ["vector", 1, 2, 3, 4, 5, 6, 7, 8]
+        self.assertEqual(self._pool(["cons", expr, expr]), ([I.CLONE, 2, I.CLONE, 2, I.CONS, I.RETURN], [8] + [box_fixnum(i) for i in range(8, 0, -1)]))
+
+    def test_bulk_literal_len(self):
+        """
+        Test length of (string "abcdefgh").
+        """
+        self.assertEqual(get_len(["string"] + [f"#\\{c}" for c in "abcdefgh"]), 2)
+
+if __name__ == "__main__":
+    unittest.main()
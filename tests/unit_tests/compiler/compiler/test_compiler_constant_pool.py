@@ -0,0 +1,101 @@
+# test_compiler_constant_pool.py - tests laying out quoted constants in the constant pool
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+
+class ConstantPoolCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for the constant pool.
+    """
+
+    def _pool(self, expr: list) -> tuple:
+        """
+        Compiles the provided expression and reports its constant pool.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Returns:
+            tuple: Code and constant pool of the compiled expression.
+        """
+        c = Compiler()
+        c.compile_function(expr)
+        return c.code, c.pool
+
+    def test_constant_pool_symbol(self):
+        """
+        Test (quote ab).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["symbol", "a", "b"]])], ["constant-ref", "t0"]]), ([I.SYMBOL, 0, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], [2, 97, 98]))
+
+    def test_constant_pool_string(self):
+        """
+        Test (quote "hi").
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["string", "#\\h", "#\\i"]])], ["constant-ref", "t0"]]), ([I.LOAD64, 3, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], [2, ord("h") | ord("i") << 8]))
+
+    def test_constant_pool_packed_string(self):
+        """
+        Test (quote "abcdefghij").
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["string"] + [f"#\\{c}" for c in "abcdefghij"]])], ["constant-ref", "t0"]])[1], [10, int.from_bytes(b"abcdefgh", "little"), int.from_bytes(b"ij", "little")])
+
+    def test_constant_pool_vector(self):
+        """
+        Test (quote #(1 #t #\\a)).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["vector", 1, True, "#\\a"]])], ["constant-ref", "t0"]]), ([I.LOAD64, 2, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], [3, box_char("#\\a"), box_bool(True), box_fixnum(1)]))
+
+    def test_constant_pool_nested(self):
+        """
+        Test (quote #(1 #(2 3))).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["vector", 1, ["vector", 2, 3]]])], ["constant-ref", "t0"]]), ([I.LOAD64, 26, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], [2, 12, 8, 2, 2, 4]))
+
+    def test_constant_pool_pair(self):
+        """
+        Test (quote (1 . 2)).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["cons", 1, 2]])], ["constant-ref", "t0"]]), ([I.LOAD64, 1, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], [4, 8]))
+
+    def test_constant_pool_immediate(self):
+        """
+        Test (quote 5).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", 5])], ["constant-ref", "t0"]]), ([I.LOAD64, 20, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], []))
+
+    def test_constant_pool_deduplicated(self):
+        """
+        Test (cons (quote #(1 4)) (quote #(1 4))).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["vector", 1, 4]]), ("t1", ["constant-init", ["vector", 1, 4]])], ["cons", ["constant-ref", "t0"], ["constant-ref", "t1"]]]), ([I.LOAD64, 2, I.CONST_INIT, I.LOAD64, 2, I.CONST_INIT, I.CONST_REF, 1, I.CONST_REF, 0, I.CONS, I.RETURN], [2, 16, 4]))
+
+    def test_constant_pool_distinct(self):
+        """
+        Test (cons (quote #(1)) (quote #(#t))).
+        """
+        self.assertEqual(self._pool(["labels", [("t0", ["constant-init", ["vector", 1]]), ("t1", ["constant-init", ["vector", True]])], ["cons", ["constant-ref", "t0"], ["constant-ref", "t1"]]]), ([I.LOAD64, 2, I.CONST_INIT, I.LOAD64, 18, I.CONST_INIT, I.CONST_REF, 1, I.CONST_REF, 0, I.CONS, I.RETURN], [1, 4, 1, box_bool(True)]))
+
+    def test_constant_pool_section(self):
+        """
+        Test constant pool section of (quote ab).
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(["labels", [("t0", ["constant-init", ["symbol", "a", "b"]])], ["constant-ref", "t0"]])
+        c.write_to_stream(buf)
+        words = [int.from_bytes(buf.getvalue()[i:i + 8], "little") for i in range(0, len(buf.getvalue()), 8)]
+        entry = HEADER_LEN + SECTION_ENTRY_LEN
+        self.assertEqual(words[entry], S.CONSTANTS)
+        self.assertEqual(words[words[entry + 1] // 8:words[entry + 1] // 8 + words[entry + 2]], [2, 97, 98])
+
+if __name__ == "__main__":
+    unittest.main()
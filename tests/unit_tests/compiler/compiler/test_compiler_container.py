@@ -0,0 +1,122 @@
+# test_compiler_container.py - tests writing of bytecode containers
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+
+LAMBDA = ["labels", [("f0", ["code", ["x"], [], Bound("x")])], [["closure", "f0"], 7]]
+
+class ContainerCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for bytecode containers.
+    """
+
+    def _compile(self, expr: list, debug: bool = False) -> bytes:
+        """
+        Compiles the provided expression.
+        Wrapper around Compile class' compile_function() and write_to_stream() functions.
+        Writes compiled code to provided output stream.
+
+        Args:
+            expr (list): Expression to be compiled.
+            debug (bool): Whether to include the debug section.
+
+        Return:
+            bytes: Bytes object containing compiled code.
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(expr)
+        c.write_to_stream(buf, debug)
+        return buf.getvalue()
+
+    def _words(self, container: bytes) -> list:
+        """
+        Splits a container into its 8-byte words.
+
+        Args:
+            container (bytes): Bytecode container.
+
+        Returns:
+            list: Words of container.
+        """
+        return [int.from_bytes(container[i:i + 8], "little") for i in range(0, len(container), 8)]
+
+    def _section(self, container: bytes, kind: int) -> list:
+        """
+        Finds a section of a container through its section table.
+
+        Args:
+            container (bytes): Bytecode container.
+            kind (int): Kind of section to be found.
+
+        Returns:
+            list: Words of section, None if the container has no such section.
+        """
+        words = self._words(container)
+        for i in range(words[6]):
+            entry = HEADER_LEN + SECTION_ENTRY_LEN * i
+            if words[entry] == kind:
+                return words[words[entry + 1] // 8:words[entry + 1] // 8 + words[entry + 2]]
+
+        return None
+
+    def test_container_integer(self):
+        """
+        Test 4.
+        """
+        self.assertEqual(self._compile(4), b"\x53\x43\x48\x45\x4D\x45\x42\x43\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x80\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\xC0\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\xC0\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x10\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00")
+
+    def test_container_header(self):
+        """
+        Test header of ((lambda (x) x) 7).
+        """
+        self.assertEqual(self._words(self._compile(LAMBDA))[:HEADER_LEN], [BYTECODE_MAGIC, FORMAT_VERSION, COMPILER_VERSION, 0, 3, 0, 3])
+
+    def test_container_aligned(self):
+        """
+        Test alignment of sections of ((lambda (x) x) 7).
+        """
+        words = self._words(self._compile(LAMBDA, True))
+        for i in range(words[6]):
+            self.assertEqual(words[HEADER_LEN + SECTION_ENTRY_LEN * i + 1] % SECTION_ALIGN, 0)
+
+    def test_container_code(self):
+        """
+        Test code section of ((lambda (x) x) 7).
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(LAMBDA)
+        c.write_code(buf)
+        self.assertEqual(self._section(self._compile(LAMBDA), S.CODE), self._words(buf.getvalue()))
+
+    def test_container_procedures(self):
+        """
+        Test procedure table of ((lambda (x) x) 7).
+        """
+        self.assertEqual(self._section(self._compile(LAMBDA), S.PROCEDURES), [4, 1, 0, 4])
+
+    def test_container_no_debug(self):
+        """
+        Test ((lambda (x) x) 7) without debug info.
+        """
+        self.assertEqual(self._section(self._compile(LAMBDA), S.DEBUG), None)
+
+    def test_container_debug(self):
+        """
+        Test ((lambda (x) x) 7) with debug info.
+        """
+        container = self._compile(LAMBDA, True)
+        self.assertEqual(self._words(container)[3], FLAG_DEBUG_INFO)
+        self.assertEqual(self._section(container, S.DEBUG), [2, ord("f"), ord("0")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# test_compiler_escape.py - tests scalar replacement of non-escaping pairs, vectors and strings
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+from compiler.parser import scheme_parse
+from compiler.escape import scalar_replace
+
+class EscapeCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for escape analysis and scalar replacement.
+    """
+
+    def _compile(self, expr: list) -> bytes:
+        """
+        Compiles the provided expression.
+        Wrapper around Compile class' compile_function() and write_code() functions.
+        Writes compiled code to provided output stream.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Return:
+            bytes: Bytes object containing compiled code.
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(expr)
+        c.write_code(buf)
+        return buf.getvalue()
+
+    def test_escape_cons(self):
+        """
+        Test (let ((p (cons 1 2))) (+ (car p) (cdr p))).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((p (cons 1 2))) (+ (car p) (cdr p)))")), ["let", [("p cdr 0", 2), ("p car 0", 1)], ["+", Local("p car 0"), Local("p cdr 0")]])
+
+    def test_escape_vector(self):
+        """
+        Test (let ((v (vector 1 2 3))) (+ (vector-ref v 0) (vector-ref v 2))).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((v (vector 1 2 3))) (+ (vector-ref v 0) (vector-ref v 2)))")), ["let", [("v 0 0", 1), ("v 1 0", 2), ("v 2 0", 3)], ["+", Local("v 0 0"), Local("v 2 0")]])
+
+    def test_escape_string(self):
+        """
+        Test (let ((s (string "ab"))) (string-ref s 1)).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((s (string \"ab\"))) (string-ref s 1))")), ["let", [("s 0 0", "#\\a"), ("s 1 0", "#\\b")], Local("s 1 0")])
+
+    def test_escape_nested(self):
+        """
+        Test (let ((p (cons 1 (cons 2 3)))) (+ (car p) (car (cdr p)))).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((p (cons 1 (cons 2 3)))) (+ (car p) (car (cdr p))))")), ["let", [("p cdr 0 cdr 1", 3), ("p cdr 0 car 1", 2), ("p car 0", 1)], ["+", Local("p car 0"), Local("p cdr 0 car 1")]])
+
+    def test_escape_returned(self):
+        """
+        Test (let ((p (cons 1 2))) p).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((p (cons 1 2))) p)")), ["let", [("p", ["cons", 1, 2])], Local("p")])
+
+    def test_escape_variable_index(self):
+        """
+        Test (let ((v (vector 1 2)) (i 1)) (vector-ref v i)).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((v (vector 1 2)) (i 1)) (vector-ref v i))")), ["let", [("v", ["vector", 1, 2]), ("i", 1)], ["vector-ref", Local("v"), Local("i")]])
+
+    def test_escape_out_of_range(self):
+        """
+        Test (let ((v (vector 1 2))) (vector-ref v 2)).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((v (vector 1 2))) (vector-ref v 2))")), ["let", [("v", ["vector", 1, 2])], ["vector-ref", Local("v"), 2]])
+
+    def test_escape_mutated(self):
+        """
+        Test (let ((v (vector 1 2))) (begin (vector-set! v 0 3) (vector-ref v 0))).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((v (vector 1 2))) (begin (vector-set! v 0 3) (vector-ref v 0)))")), ["let", [("v", ["vector", 1, 2])], ["begin", ["vector-set!", Local("v"), 0, 3], ["vector-ref", Local("v"), 0]]])
+
+    def test_escape_shadowed(self):
+        """
+        Test (let ((v (vector 1 2))) (let ((v (vector (vector-ref v 1) (vector-ref v 0)))) (vector-ref v 0))).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(let ((v (vector 1 2))) (let ((v (vector (vector-ref v 1) (vector-ref v 0)))) (vector-ref v 0)))")), ["let", [("v 0 1", 1), ("v 1 1", 2)], ["let", [("v 0 0", Local("v 1 1")), ("v 1 0", Local("v 0 1"))], Local("v 0 0")]])
+
+    def test_escape_fold_car(self):
+        """
+        Test (car (cons 1 2)).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(car (cons 1 2))")), 1)
+
+    def test_escape_fold_impure(self):
+        """
+        Test (car (cons 1 (add1 2))).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(car (cons 1 (add1 2)))")), ["begin", ["add1", 2], 1])
+
+    def test_escape_fold_vector_ref(self):
+        """
+        Test (vector-ref (vector 1 2 3) 1).
+        """
+        self.assertEqual(scalar_replace(scheme_parse("(vector-ref (vector 1 2 3) 1)")), 2)
+
+    def test_escape_compiled(self):
+        """
+        Test (let ((p (cons 1 2))) (car p)).
+        """
+        self.assertEqual(self._compile(scalar_replace(scheme_parse("(let ((p (cons 1 2))) (car p))"))), self._compile(["let", [("p cdr 0", 2), ("p car 0", 1)], Local("p car 0")]))
+
+    def test_escape_nested_let_length(self):
+        """
+        Test (if #f (let* ((a 1)) a) 2).
+        """
+        self.assertEqual(self._compile(["if", False, ["let*", [("a", 1)], Local("a")], 2]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x1F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x16\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x17\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x15\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+if __name__ == "__main__":
+    unittest.main()
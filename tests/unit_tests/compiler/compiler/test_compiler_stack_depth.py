@@ -0,0 +1,118 @@
+# test_compiler_stack_depth.py - tests computation of maximum stack depths and the bytecode header
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+
+class StackDepthCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for the computation of maximum stack depths.
+    """
+
+    def _compile(self, expr: list) -> bytes:
+        """
+        Compiles the provided expression.
+        Wrapper around Compile class' compile_function() and write_code() functions.
+        Writes compiled code to provided output stream.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Return:
+            bytes: Bytes object containing compiled code.
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(expr)
+        c.write_code(buf)
+        return buf.getvalue()
+
+    def _depths(self, expr: list) -> tuple:
+        """
+        Compiles the provided expression and reports the stack depths it needs.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Returns:
+            tuple: Stack depth of the entry code and list of stack depths of the procedures.
+        """
+        c = Compiler()
+        c.compile_function(expr)
+        return c.max_stack_depth, [procedure[3] for procedure in c.procedures]
+
+    def test_stack_depth_integer(self):
+        """
+        Test 4.
+        """
+        self.assertEqual(self._depths(4), (1, []))
+
+    def test_stack_depth_nested(self):
+        """
+        Test (+ 1 (+ 2 (+ 3 4))).
+        """
+        self.assertEqual(self._depths(["+", 1, ["+", 2, ["+", 3, 4]]]), (4, []))
+
+    def test_stack_depth_left_nested(self):
+        """
+        Test (+ (+ (+ 1 2) 3) 4).
+        """
+        self.assertEqual(self._depths(["+", ["+", ["+", 1, 2], 3], 4]), (2, []))
+
+    def test_stack_depth_if(self):
+        """
+        Test (if #t (+ 1 2) 3).
+        """
+        self.assertEqual(self._depths(["if", True, ["+", 1, 2], 3]), (2, []))
+
+    def test_stack_depth_let(self):
+        """
+        Test (let ((a 1) (b 2)) (+ a b)).
+        """
+        self.assertEqual(self._depths(["let", [("a", 1), ("b", 2)], ["+", Local("a"), Local("b")]]), (4, []))
+
+    def test_stack_depth_vector(self):
+        """
+        Test (vector 1 2 3).
+        """
+        self.assertEqual(self._depths(["vector", 1, 2, 3]), (3, []))
+
+    def test_stack_depth_lambda(self):
+        """
+        Test ((lambda (x y) (+ x y)) 1 2).
+        """
+        self.assertEqual(self._depths(["labels", [("f0", ["code", ["x", "y"], [], ["+", Bound("x"), Bound("y")]])], [["closure", "f0"], 1, 2]]), (4, [6]))
+
+    def test_stack_depth_free(self):
+        """
+        Test (let ((x 5)) (lambda () x)).
+        """
+        self.assertEqual(self._depths(["labels", [("f0", ["code", [], ["x"], Free("x")])], ["let", [("x", 5)], ["closure", "f0", Local("x")]]]), (4, [3]))
+
+    def test_stack_depth_let_if(self):
+        """
+        Test (let ((a 5)) (if #t a 0)).
+        """
+        self.assertEqual(self._compile(["let", [("a", 5)], ["if", True, Local("a"), 0]]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x9F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x16\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x15\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x17\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+    def test_stack_depth_let_after_if(self):
+        """
+        Test (let ((a 5)) (+ (if #t 1 0) a)).
+        """
+        self.assertEqual(self._compile(["let", [("a", 5)], ["+", ["if", True, 1, 0], Local("a")]]), b"\x01\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x9F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x15\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x16\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x0C\x00\x00\x00\x00\x00\x00\x00\x17\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00")
+
+    def test_stack_depth_recursion(self):
+        """
+        Test (letrec ((f (lambda (n) (if (= n 0) 0 (+ 1 (f (- n 1))))))) (f 1000)).
+        """
+        self.assertEqual(self._depths(["labels", [("f0", ["code", ["n"], ["f"], ["if", ["=", Bound("n"), 0], 0, ["+", 1, [Free("f"), ["-", Bound("n"), 1]]]]])], ["letrec", [("f", ["closure", "f0", Local("f")])], [Local("f"), 1000]]]), (4, [6]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_compiler_symbol_table.py - tests interning of symbols
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+from io import BytesIO
+import unittest
+import sys
+import os
+from compiler.compiler import *
+
+class SymbolTableCompileTests(unittest.TestCase):
+    """
+    Unit testing framework for the symbol table.
+    """
+
+    def _symbols(self, expr: list) -> tuple:
+        """
+        Compiles the provided expression and reports its symbol table.
+
+        Args:
+            expr (list): Expression to be compiled.
+
+        Returns:
+            tuple: Code, constant pool and symbol table of the compiled expression.
+        """
+        c = Compiler()
+        c.compile_function(expr)
+        return c.code, c.pool, list(c.symbols)
+
+    def test_symbol_table_one(self):
+        """
+        Test (quote a).
+        """
+        self.assertEqual(self._symbols(["labels", [("t0", ["constant-init", ["symbol", "a"]])], ["constant-ref", "t0"]]), ([I.SYMBOL, 0, I.CONST_INIT, I.CONST_REF, 0, I.RETURN], [1, 97], [5]))
+
+    def test_symbol_table_shared(self):
+        """
+        Test (= (quote a) (quote a)).
+        """
+        self.assertEqual(self._symbols(["labels", [("t0", ["constant-init", ["symbol", "a"]]), ("t1", ["constant-init", ["symbol", "a"]])], ["=", ["constant-ref", "t0"], ["constant-ref", "t1"]]]), ([I.SYMBOL, 0, I.CONST_INIT, I.SYMBOL, 0, I.CONST_INIT, I.CONST_REF, 0, I.CONST_REF, 1, I.EQ, I.RETURN], [1, 97], [5]))
+
+    def test_symbol_table_distinct(self):
+        """
+        Test (cons (quote a) (quote bc)).
+        """
+        self.assertEqual(self._symbols(["labels", [("t0", ["constant-init", ["symbol", "a"]]), ("t1", ["constant-init", ["symbol", "b", "c"]])], ["cons", ["constant-ref", "t0"], ["constant-ref", "t1"]]]), ([I.SYMBOL, 0, I.CONST_INIT, I.SYMBOL, 1, I.CONST_INIT, I.CONST_REF, 1, I.CONST_REF, 0, I.CONS, I.RETURN], [1, 97, 2, 98, 99], [5, 21]))
+
+    def test_symbol_table_in_list(self):
+        """
+        Test (cons (quote (a)) (quote a)).
+        """
+        code, pool, symbols = self._symbols(["labels", [("t0", ["constant-init", ["cons", ["symbol", "a"], []]]), ("t1", ["constant-init", ["symbol", "a"]])], ["cons", ["constant-ref", "t0"], ["constant-ref", "t1"]]])
+        self.assertEqual(symbols, [5])
+        self.assertEqual(pool, [1, 97, 5, box_empty_list()])
+        self.assertEqual(code[3:5], [I.SYMBOL, 0])
+
+    def test_symbol_table_section(self):
+        """
+        Test symbol table section of (quote a).
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(["labels", [("t0", ["constant-init", ["symbol", "a"]])], ["constant-ref", "t0"]])
+        c.write_to_stream(buf)
+        words = [int.from_bytes(buf.getvalue()[i:i + 8], "little") for i in range(0, len(buf.getvalue()), 8)]
+        entry = HEADER_LEN + 3 * SECTION_ENTRY_LEN
+        self.assertEqual(words[6], 4)
+        self.assertEqual(words[entry], S.SYMBOLS)
+        self.assertEqual(words[words[entry + 1] // 8:words[entry + 1] // 8 + words[entry + 2]], [5])
+
+    def test_symbol_table_omitted(self):
+        """
+        Test number of sections of 4.
+        """
+        buf = BytesIO()
+        c = Compiler()
+        c.compile_function(4)
+        c.write_to_stream(buf)
+        self.assertEqual(int.from_bytes(buf.getvalue()[48:56], "little"), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,7 +38,7 @@ class QuoteParseTests(unittest.TestCase):
         """
         Test (quote (a b)).
         """
-        self.assertEqual(self._parse("(quote (a b))"), ["labels", [("t0", ["constant-init", ["symbol", "(", "a", "b", ")"]])], ["constant-ref", "t0"]])
+        self.assertEqual(self._parse("(quote (a b))"), ["labels", [("t0", ["constant-init", ["cons", ["symbol", "a"], ["cons", ["symbol", "b"], []]]])], ["constant-ref", "t0"]])
 
     def test_quote_one_vector(self):
         """
@@ -70,6 +70,48 @@ class QuoteParseTests(unittest.TestCase):
         """
         self.assertEqual(self._parse("(let ((f (lambda () (quote #(1 4))))) (= (f) (f)))"), ["labels", [("t1", ["constant-init", ["vector", 1, 4]]), ("f0", ["code", [], [], ["constant-ref", "t1"]])], ["let", [("f", ["closure", "f0"])], ["=", [Local("f")], [Local("f")]]]])
 
+    def test_quote_nested_list(self):
+        """
+        Test (quote (a (1 #t) #\\c)).
+        """
+        self.assertEqual(self._parse("(quote (a (1 #t) #\\c))"), ["labels", [("t0", ["constant-init", ["cons", ["symbol", "a"], ["cons", ["cons", 1, ["cons", True, []]], ["cons", "#\\c", []]]]])], ["constant-ref", "t0"]])
+
+    def test_quote_dotted_pair(self):
+        """
+        Test (quote (1 . 2)).
+        """
+        self.assertEqual(self._parse("(quote (1 . 2))"), ["labels", [("t0", ["constant-init", ["cons", 1, 2]])], ["constant-ref", "t0"]])
+
+    def test_quote_empty_list(self):
+        """
+        Test (quote ()).
+        """
+        self.assertEqual(self._parse("(quote ())"), ["labels", [("t0", ["constant-init", []])], ["constant-ref", "t0"]])
+
+    def test_quote_keyword_symbols(self):
+        """
+        Test (quote (car if)).
+        """
+        self.assertEqual(self._parse("(quote (car if))"), ["labels", [("t0", ["constant-init", ["cons", ["symbol", "c", "a", "r"], ["cons", ["symbol", "i", "f"], []]]])], ["constant-ref", "t0"]])
+
+    def test_quote_vector_of_lists(self):
+        """
+        Test (quote #((1) "a")).
+        """
+        self.assertEqual(self._parse('(quote #((1) "a"))'), ["labels", [("t0", ["constant-init", ["vector", ["cons", 1, []], ["string", "#\\a"]]])], ["constant-ref", "t0"]])
+
+    def test_quote_nested_quote(self):
+        """
+        Test '(a 'b).
+        """
+        self.assertEqual(self._parse("'(a 'b)"), ["labels", [("t0", ["constant-init", ["cons", ["symbol", "a"], ["cons", ["cons", ["symbol", "q", "u", "o", "t", "e"], ["cons", ["symbol", "b"], []]], []]]])], ["constant-ref", "t0"]])
+
+    def test_quote_unterminated(self):
+        """
+        Test (quote (1 2.
+        """
+        with self.assertRaises(RuntimeError):
+            self._parse("(quote (1 2")
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,109 @@
+# test_interpreter_jit.py - tests that procedures compiled into machine code give the same results as interpreted
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+import unittest
+import sys
+import os
+import subprocess
+from io import BytesIO
+from compiler.compile import compile_source
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INTERPRET = os.path.join(BASE_DIR, "..", "..", "..", "interpreter", "execs", "interpret")
+# Arguments interpreting the program and compiling each procedure the first time it is called.
+ENGINES = [[], ["--jit-threshold", "1"]]
+
+class JitInterpreterTests(unittest.TestCase):
+    """
+    Unit testing framework for procedures compiled into machine code once called often enough.
+    """
+    def _interpret(self, source: str, args: list) -> str:
+        """
+        Compiles a program and interprets its bytecode.
+
+        Args:
+            source (str): Scheme source code.
+            args (list): Arguments passed to the interpreter.
+
+        Returns:
+            str: Value output by interpreter.
+
+        Raises:
+            RuntimeError: Interpreter failed, with what it printed to stderr.
+        """
+        stream = BytesIO()
+        compile_source(source).write_to_stream(stream)
+
+        inter = subprocess.Popen([INTERPRET] + args, stdin = subprocess.PIPE, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+
+        stdout, stderr = inter.communicate(stream.getvalue())
+
+        if inter.returncode != 0:
+            raise RuntimeError(stderr.decode("utf-8"))
+
+        return stdout.decode("utf-8")
+
+    def test_jit_calls(self):
+        """
+        Test (letrec ((fib (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))) (fib 15)).
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(letrec ((fib (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))) (fib 15))", args), "610\n")
+
+    def test_jit_tail_calls(self):
+        """
+        Test (letrec ((tak (lambda (x y z) (if (not (< y x)) z (tak (tak (sub1 x) y z) (tak (sub1 y) z x) (tak (sub1 z) x y)))))) (tak 18 12 6)).
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(letrec ((tak (lambda (x y z) (if (not (< y x)) z (tak (tak (sub1 x) y z) (tak (sub1 y) z x) (tak (sub1 z) x y)))))) (tak 18 12 6))", args), "7\n")
+
+    def test_jit_mutual_tail_calls(self):
+        """
+        Test mutually recursive procedures calling each other in tail position.
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(letrec ((even (lambda (n) (if (zero? n) #t (odd (sub1 n))))) (odd (lambda (n) (if (zero? n) #f (even (sub1 n)))))) (even 100001))", args), "#f\n")
+
+    def test_jit_frees(self):
+        """
+        Test a loop reading variables free in it.
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(let ((k 5) (j 2)) (letrec ((loop (lambda (n acc) (if (zero? n) acc (loop (sub1 n) (+ acc (* k j))))))) (loop 100 0)))", args), "1000\n")
+
+    def test_jit_primitives(self):
+        """
+        Test characters, predicates and comparisons on values passed to a procedure.
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(let ((f (lambda (c n) (if (not (null? c)) (if (boolean? #f) (if (integer? n) (if (>= n 3) (if (<= n 3) (if (> n 2) (if (= n 3) (char->integer (integer->char (* n (- n 1)))) 0) 1) 2) 3) 4) 5) #f)))) (cons (f #\\a 3) (f '() 3)))", args), "(6 . #f)\n")
+
+    def test_jit_collections(self):
+        """
+        Test building and walking a long list with a small nursery.
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(letrec ((build (lambda (n acc) (if (zero? n) acc (build (sub1 n) (cons n acc))))) (sum (lambda (l n) (if (null? l) n (sum (cdr l) (+ n (car l))))))) (sum (build 20000 '()) 0))", ["--nursery-size", "256", "--heap-size", "1024"] + args), "200010000\n")
+
+    def test_jit_heap(self):
+        """
+        Test strings and vectors read and written by a procedure.
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret("(let ((f (lambda (s v) (begin (vector-set! v 0 (string-ref s 1)) (cons (vector-ref v 0) v))))) (f (string \"ab\") (vector 1 2 3)))", args), "(#\\b . #( #\\b 2 3 ))\n")
+
+    def test_jit_errors(self):
+        """
+        Test errors raised in compiled code, by the procedures it calls and by recursing deeper than the stack.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Wrong number of arguments"):
+                self._interpret("(let ((f (lambda (g) (g 1)))) (f (lambda (x y) x)))", args)
+            with self.assertRaisesRegex(RuntimeError, "Invalid index"):
+                self._interpret("(let ((f (lambda (v) (vector-ref v 2)))) (f (vector 1 2)))", args)
+            with self.assertRaisesRegex(RuntimeError, "Stack overflow"):
+                self._interpret("(letrec ((f (lambda (n) (if (zero? n) 0 (add1 (f (sub1 n))))))) (f 100000))", ["--stack-size", "4096"] + args)
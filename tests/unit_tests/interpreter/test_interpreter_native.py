@@ -0,0 +1,111 @@
+# test_interpreter_native.py - tests programs compiled ahead of time into native code
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+from compiler.compile import compile_source
+from compiler.native import translate_to_native
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INTERPRETER_DIR = os.path.join(BASE_DIR, "..", "..", "..", "interpreter")
+BUILD_FLAGS = ["-O1", "-std=c++20", "-pthread", "-I" + os.path.join(INTERPRETER_DIR, "utils")]
+
+class NativeInterpreterTests(unittest.TestCase):
+    """
+    Unit testing framework for programs compiled ahead of time into native code.
+    """
+    def _run_native(self, source: str, args: list = []) -> str:
+        """
+        Compiles a program into native code, builds it against the interpreter's library and runs it.
+
+        Args:
+            source (str): Scheme source code.
+            args (list): Arguments passed to the executable.
+
+        Returns:
+            str: Value output by executable.
+
+        Raises:
+            RuntimeError: Executable failed, with what it printed to stderr.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cpp = os.path.join(directory, "program.cpp")
+            program = os.path.join(directory, "program")
+
+            with open(cpp, "w") as output:
+                output.write(translate_to_native(compile_source(source)))
+
+            build = subprocess.run(["g++"] + BUILD_FLAGS + [cpp, "-L" + os.path.join(INTERPRETER_DIR, "lib"), "-lutils", "-o", program], stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+            if build.returncode != 0:
+                raise RuntimeError("Build failed.")
+
+            run = subprocess.run([program] + args, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+
+        if run.returncode != 0:
+            raise RuntimeError(run.stderr.decode("utf-8"))
+
+        return run.stdout.decode("utf-8")
+
+    def test_native_arithmetic(self):
+        """
+        Test (let ((x 5) (y 7)) (if (< x y) (* (+ x 1) (- y 2)) (sub1 x))).
+        """
+        self.assertEqual(self._run_native("(let ((x 5) (y 7)) (if (< x y) (* (+ x 1) (- y 2)) (sub1 x)))"), "30\n")
+
+    def test_native_calls(self):
+        """
+        Test (letrec ((fib (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))) (fib 15)).
+        """
+        self.assertEqual(self._run_native("(letrec ((fib (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))) (fib 15))"), "610\n")
+
+    def test_native_tail_calls(self):
+        """
+        Test mutually recursive procedures calling each other in tail position.
+        """
+        self.assertEqual(self._run_native("(letrec ((even (lambda (n) (if (zero? n) #t (odd (sub1 n))))) (odd (lambda (n) (if (zero? n) #f (even (sub1 n)))))) (even 100001))"), "#f\n")
+
+    def test_native_frees(self):
+        """
+        Test (let ((x 3) (y 4)) ((lambda (z) (+ x (* y z))) 5)).
+        """
+        self.assertEqual(self._run_native("(let ((x 3) (y 4)) ((lambda (z) (+ x (* y z))) 5))"), "23\n")
+
+    def test_native_heap(self):
+        """
+        Test strings, vectors, symbols and quoted lists.
+        """
+        self.assertEqual(self._run_native("(let ((s (string \"ab\")) (v (vector 1 2 3))) (begin (vector-set! v 0 (string-ref s 1)) (cons v (cons 'sym '(1 2)))))"), "(#( #\\b 2 3 ) . (sym . (1 . (2 . ()))))\n")
+
+    def test_native_collections(self):
+        """
+        Test building a long list with a small nursery.
+        """
+        self.assertEqual(self._run_native("(letrec ((build (lambda (n acc) (if (zero? n) acc (build (sub1 n) (cons n acc))))) (len (lambda (l n) (if (null? l) n (len (cdr l) (add1 n)))))) (len (build 20000 '()) 0))", ["--nursery-size", "256", "--heap-size", "1024"]), "20000\n")
+
+    def test_native_wrong_number_of_arguments(self):
+        """
+        Test ((lambda (x y) x) 1).
+        """
+        with self.assertRaisesRegex(RuntimeError, "Wrong number of arguments"):
+            self._run_native("((lambda (x y) x) 1)")
+
+    def test_native_invalid_index(self):
+        """
+        Test (vector-ref (vector 1 2) 2).
+        """
+        with self.assertRaisesRegex(RuntimeError, "Invalid index"):
+            self._run_native("(vector-ref (vector 1 2) 2)")
+
+    def test_native_stack_overflow(self):
+        """
+        Test recursion deeper than the stack.
+        """
+        with self.assertRaisesRegex(RuntimeError, "Stack overflow"):
+            self._run_native("(letrec ((f (lambda (n) (if (zero? n) 0 (add1 (f (sub1 n))))))) (f 100000))", ["--stack-size", "4096"])
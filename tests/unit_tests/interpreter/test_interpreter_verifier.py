@@ -0,0 +1,118 @@
+# test_interpreter_verifier.py - tests that invalid bytecode is rejected when loaded
+#
+# Josh Meise
+# 10-19-2026
+# Description:
+#
+
+import unittest
+import sys
+import os
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INTERPRET = os.path.join(BASE_DIR, "..", "..", "..", "interpreter", "execs", "interpret")
+# Arguments running the program translated into register form and as compiled.
+ENGINES = [[], ["--stack-engine"]]
+
+class VerifierInterpreterTests(unittest.TestCase):
+    """
+    Unit testing framework for the verification of bytecode when loaded.
+    """
+    def _interpret(self, source: bytes, args: list) -> str:
+        """
+        Calls interpreter and interprets byte code.
+
+        Args:
+            source (bytes): Bytecode to be interpreted.
+            args (list): Arguments passed to the interpreter.
+
+        Returns:
+            str: Value output by interpreter.
+
+        Raises:
+            RuntimeError: Interpreter failed, with what it printed to stderr.
+        """
+        inter = subprocess.Popen([INTERPRET] + args, stdin = subprocess.PIPE, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+
+        stdout, stderr = inter.communicate(source)
+
+        if inter.returncode != 0:
+            raise RuntimeError(stderr.decode("utf-8"))
+
+        return stdout.decode("utf-8")
+
+    def test_verifier_valid(self):
+        """
+        Test (if #t 10 2).
+        """
+        for args in ENGINES:
+            self.assertEqual(self._interpret(b"\x53\x43\x48\x45\x4D\x45\x42\x43\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x80\x00\x00\x00\x00\x00\x00\x00\x0B\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x9F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x28\x00\x00\x00\x00\x00\x00\x00\x15\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00", args), "10\n")
+
+    def test_verifier_jump_past_end(self):
+        """
+        Test (if #f 1 2) with a jump past the end of the code.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x01\x00\x00\x00\x00\x00\x00\x00\x1F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x32\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_jump_into_operand(self):
+        """
+        Test (if #f 2) with a jump to the operand of an instruction.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x01\x00\x00\x00\x00\x00\x00\x00\x1F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_branches_disagree(self):
+        """
+        Test (if #t 1 2) with branches leaving different numbers of values on the stack.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x01\x00\x00\x00\x00\x00\x00\x00\x9F\x00\x00\x00\x00\x00\x00\x00\x14\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x08\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_let_too_deep(self):
+        """
+        Test (let ((x 1)) x) reading a binding from below the stack.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x16\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_unknown_opcode(self):
+        """
+        Test 1 followed by an unknown opcode.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x63\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_no_return(self):
+        """
+        Test 1 without a return.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x01\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_arg_outside_procedure(self):
+        """
+        Test reading an argument outside of any procedure.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Invalid bytecode"):
+                self._interpret(b"\x26\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00", args)
+
+    def test_verifier_wrong_number_of_args(self):
+        """
+        Test ((lambda (x) x)), which is valid bytecode but calls a procedure with too few arguments.
+        """
+        for args in ENGINES:
+            with self.assertRaisesRegex(RuntimeError, "Wrong number of arguments"):
+                self._interpret(b"\x53\x43\x48\x45\x4D\x45\x42\x43\x02\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x80\x00\x00\x00\x00\x00\x00\x00\x0C\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x24\x00\x00\x00\x00\x00\x00\x00\x03\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x26\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x27\x00\x00\x00\x00\x00\x00\x00\x25\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x28\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00", args)
+
+
+if __name__ == "__main__":
+    unittest.main()